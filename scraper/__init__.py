@@ -8,7 +8,6 @@ This module provides automated data extraction from the TruckTech+ system
 __version__ = "0.1.0"
 __author__ = "Chris Therriault <chris@servicevision.net>"
 
-from .client import TruckTechPlusScraper
 from .models import VehicleData, FaultCodeData
 from .errors import (
     SyncError,
@@ -20,6 +19,8 @@ from .errors import (
 
 __all__ = [
     "TruckTechPlusScraper",
+    "DecisivAPIClient",
+    "DataSource",
     "VehicleData",
     "FaultCodeData",
     "SyncError",
@@ -28,3 +29,21 @@ __all__ = [
     "SessionExpired",
     "RateLimited",
 ]
+
+
+def __getattr__(name):
+    # Playwright is only imported when the scraper is actually used, so
+    # lightweight commands (status, generate-key) start fast.
+    if name == "TruckTechPlusScraper":
+        from .client import TruckTechPlusScraper
+
+        return TruckTechPlusScraper
+    if name == "DecisivAPIClient":
+        from .decisiv_api import DecisivAPIClient
+
+        return DecisivAPIClient
+    if name == "DataSource":
+        from .sources import DataSource
+
+        return DataSource
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
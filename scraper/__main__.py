@@ -12,65 +12,206 @@ Usage:
     # Test login only
     python -m scraper test-login
 
+    # Read faults from the fleet-level report instead of one page per VIN
+    python -m scraper sync --sweep
+
+    # Sync through the Decisiv API (no browser) with API client credentials
+    DECISIV_CLIENT_ID=... DECISIV_CLIENT_SECRET=... python -m scraper sync
+
+    # Stop after 10 minutes, highest-priority vehicles first
+    python -m scraper sync --deadline 600
+
     # Run with visible browser for debugging
     HEADLESS=false python -m scraper sync
 
-    # Check status
+    # Check status: last runs per tenant, p95 duration, tenants without a recent success
     python -m scraper status
+    python -m scraper status --ledger /var/lib/truckiq/sync_ledger.db --runs 10
+
+    # Share one fleet sweep across several worker nodes
+    python -m scraper sweep start --tenant acme-trucking      # prints sweep ID
+    python -m scraper sweep work --sweep-id SWEEP_ID          # on each worker
+    python -m scraper sweep collect --sweep-id SWEEP_ID --wait 900
+
+    # Keep fault history, then query it
+    python -m scraper sync --history history
+    python -m scraper history vin --vin 1XKYD49X0NJ123456
+    python -m scraper history spn --spn 110 --days 90
+
+    # Read the latest sync's dashboard snapshot without parsing the JSON result
+    python -m scraper snapshot summary --tenant acme-trucking
+    python -m scraper snapshot vin --tenant acme-trucking --vin 1XKYD49X0NJ123456
+    python -m scraper snapshot critical --tenant acme-trucking
+
+    # Profile slow VINs, then see where their time went
+    python -m scraper sync --profile
+    python -m scraper profile
+
+    # Print new fault change events for the "alerts" consumer
+    python -m scraper events --consumer alerts
+
+    # Fail if `status` cold-start import time exceeds its budget
+    python -m scraper bench startup --budget-ms 150
+
+    # Time health scoring of a synthetic 10k-vehicle fleet
+    python -m scraper bench health --vehicles 10000
+
+    # Encode/decode throughput of a full 10k-vehicle sync result
+    python -m scraper bench serialize --vehicles 10000
+
+    # Per-VIN vs batch offline VIN decoding of 10k synthetic VINs
+    python -m scraper bench vin --vehicles 10000
+
+    # Dashboard queries: full JSON parse vs memory-mapped snapshot, 1,000 vehicles
+    python -m scraper bench snapshot --vehicles 1000
+
+    # Fault history queries over 30 days of 15-minute snapshots of 10k trucks
+    python -m scraper bench history --vehicles 10000 --days 30
+
+    # Log in every tenant in parallel and show login latency per tenant
+    python -m scraper login-all --tenants tenants.json --workers 8
+
+    # Run as a daemon, syncing every 15 minutes with a warm browser
+    python -m scraper serve --tenants tenants.json
 """
 
 import argparse
 import json
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
-from .client import TruckTechPlusScraper
-from .credentials import get_credentials, CredentialStore
-from .models import SyncResult
+# Subsystems (Playwright, cryptography, pyotp) are imported inside the
+# commands that need them so `status` and `generate-key` start fast.
 
 
-def cmd_sync(args):
-    """Run data sync."""
+def _sync_source(args):
+    """Create the data source for `sync`, or print why it can't be created and return None."""
+    client_id = os.getenv("DECISIV_CLIENT_ID")
+    client_secret = os.getenv("DECISIV_CLIENT_SECRET")
+    use_api = args.source == "api" or (args.source == "auto" and client_id and client_secret)
+
+    if use_api:
+        if not (client_id and client_secret):
+            print("Error: --source api requires DECISIV_CLIENT_ID and DECISIV_CLIENT_SECRET")
+            return None
+        from .decisiv_api import DecisivAPIClient
+
+        print(f"TruckTech+ Sync - {datetime.now().isoformat()}")
+        print(f"Source: Decisiv API (client {client_id})")
+        print("-" * 50)
+        return DecisivAPIClient(client_id, client_secret)
+
+    from .client import TruckTechPlusScraper
+    from .credentials import get_credentials
+    from .layout import LayoutCache
+
     # Get credentials
     if args.username and args.password:
         username, password, totp_secret = args.username, args.password, None
     else:
         try:
-            username, password, totp_secret = get_credentials()
+            username, password, totp_secret = get_credentials(args.tenant)
         except ValueError as e:
             print(f"Error: {e}")
-            return 1
+            return None
 
     print(f"TruckTech+ Sync - {datetime.now().isoformat()}")
     print(f"Username: {username}")
     print(f"Headless: {os.getenv('HEADLESS', 'true')}")
     print("-" * 50)
 
-    with TruckTechPlusScraper(username, password, totp_secret) as scraper:
+    layout = LayoutCache().for_tenant(args.tenant or "default")
+    return TruckTechPlusScraper(username, password, totp_secret, layout=layout)
+
+
+def _record_run(result, ledger_file: str):
+    """Add a sync result to the sync ledger."""
+    from .ledger import SyncLedger
+
+    try:
+        SyncLedger(Path(ledger_file)).record(result)
+    except Exception as e:
+        print(f"Could not record run in ledger: {e}")
+
+
+def _publish_snapshot(result, snapshot_dir: str):
+    """Publish a successful sync as the tenant's dashboard snapshot."""
+    from .snapshot import publish_snapshot
+
+    if not result.success:
+        return
+    try:
+        path = publish_snapshot(result, Path(snapshot_dir))
+        print(f"Snapshot published to: {path}")
+    except Exception as e:
+        print(f"Could not publish snapshot: {e}")
+
+
+def cmd_sync(args):
+    """Run data sync."""
+    from .memory import MemoryWatchdog
+    from .profiling import OutlierProfiler
+    from .serialization import write_result
+
+    source = _sync_source(args)
+    if source is None:
+        return 1
+
+    with source as scraper:
         if not scraper.login():
             print("Login failed!")
             return 1
 
-        result = scraper.export_all_data(tenant_id=args.tenant or "default")
-
-        # Save result to file
+        deadline = None
+        if args.deadline:
+            deadline = datetime.now() + timedelta(seconds=args.deadline)
+
+        result = scraper.export_all_data(
+            tenant_id=args.tenant or "default",
+            deadline=deadline,
+            watchdog=MemoryWatchdog(
+                soft_limit_mb=args.memory_soft_mb,
+                hard_limit_mb=args.memory_hard_mb,
+                trace_heap=args.memory_heap,
+            ),
+            profiler=(
+                OutlierProfiler(Path(args.profile), trace_sample=args.profile_trace_sample)
+                if args.profile
+                else None
+            ),
+            sweep=args.sweep or None,
+        )
+
+        # Save full result (vehicles and faults included) to file
         output_file = Path(args.output or "sync_result.json")
-        with open(output_file, "w") as f:
-            json.dump(result.to_dict(), f, indent=2, default=str)
+        write_result(result, output_file)
         print(f"\nResults saved to: {output_file}")
+        _record_run(result, args.ledger)
+        _publish_snapshot(result, args.snapshots)
+
+        if args.history:
+            from .history import HistoryStore
+
+            store = HistoryStore(Path(args.history))
+            store.append(result)
+            store.compact(result.tenant_id)
+            print(f"History appended to: {store.root}")
 
         return 0 if result.success else 1
 
 
 def cmd_test_login(args):
     """Test login credentials."""
+    from .client import TruckTechPlusScraper
+    from .credentials import get_credentials
+
     if args.username and args.password:
         username, password, totp_secret = args.username, args.password, None
     else:
         try:
-            username, password, totp_secret = get_credentials()
+            username, password, totp_secret = get_credentials(args.tenant)
         except ValueError as e:
             print(f"Error: {e}")
             return 1
@@ -86,6 +227,43 @@ def cmd_test_login(args):
             return 1
 
 
+def cmd_login_all(args):
+    """Log in every tenant in parallel and report login latency."""
+    from .daemon import load_tenants, tenants_from_repository
+    from .login_pipeline import LoginPipeline
+
+    try:
+        if args.tenants:
+            tenants = load_tenants(Path(args.tenants))
+        else:
+            from .credentials import TenantCredentialRepository
+
+            tenants = tenants_from_repository(
+                TenantCredentialRepository(Path(args.credentials) if args.credentials else None)
+            )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    pipeline = LoginPipeline(max_workers=args.workers, session_dir=Path(args.output_dir))
+    outcomes = pipeline.run(tenants)
+
+    print(f"\n{'Tenant':<24} {'Result':<8} {'Time':>7} {'p50':>7} {'p95':>7} {'Fails':>6}")
+    for outcome in outcomes:
+        summary = pipeline.stats.summary(outcome.tenant_id)
+        result = "reused" if outcome.session_reused else ("ok" if outcome.success else "FAILED")
+
+        def fmt(value):
+            return f"{value:.1f}s" if value is not None else "-"
+
+        print(
+            f"{outcome.tenant_id:<24} {result:<8} {fmt(outcome.seconds):>7} "
+            f"{fmt(summary['p50']):>7} {fmt(summary['p95']):>7} {summary['failures']:>6}"
+        )
+
+    return 0 if all(o.success for o in outcomes) else 1
+
+
 def cmd_status(args):
     """Check sync status."""
     session_file = Path("session_storage.json")
@@ -105,8 +283,9 @@ def cmd_status(args):
     # Check last sync result
     result_file = Path("sync_result.json")
     if result_file.exists():
-        with open(result_file) as f:
-            result = json.load(f)
+        from .serialization import read_summary
+
+        result = read_summary(result_file)
         print(f"\nLast sync result: {result_file}")
         print(f"  Started: {result.get('started_at')}")
         print(f"  Duration: {result.get('duration_seconds', 0):.1f}s")
@@ -116,6 +295,13 @@ def cmd_status(args):
     else:
         print("\nLast sync: No results found")
 
+    # Run history across tenants
+    ledger_file = Path(args.ledger)
+    if ledger_file.exists():
+        _print_ledger(ledger_file, args)
+    else:
+        print(f"\nSync ledger: {ledger_file} not found")
+
     # Check credentials
     print("\nCredentials:")
     if os.getenv("TRUCKTECH_USERNAME"):
@@ -128,8 +314,331 @@ def cmd_status(args):
     return 0
 
 
+def _print_ledger(ledger_file: Path, args):
+    """Print recent runs, the weekly p95 duration and stale tenants from the sync ledger."""
+    from .ledger import SyncLedger
+
+    ledger = SyncLedger(ledger_file)
+    week_ago = datetime.now() - timedelta(days=7)
+    print(f"\nSync ledger: {ledger_file} ({ledger.count()} runs)")
+
+    p95, runs = ledger.duration_percentile(95, since=week_ago, tenant_id=args.tenant)
+    if p95 is not None:
+        print(f"  p95 duration (7 days): {p95:.1f}s over {runs} runs")
+
+    errors = ledger.error_classes(since=week_ago)
+    if errors:
+        print("  Errors (7 days): " + ", ".join(f"{name} {count}" for name, count in errors.items()))
+
+    stale = ledger.stale_tenants(hours=args.stale_hours)
+    if stale:
+        print(f"  No successful sync in {args.stale_hours:g}h:")
+        for tenant_id, last_success in stale:
+            last = last_success.isoformat(timespec="minutes") if last_success else "never"
+            print(f"    {tenant_id:<24} last success: {last}")
+
+    for tenant_id, tenant_runs in ledger.recent_runs(args.tenant, limit=args.runs).items():
+        print(f"\n  {tenant_id}")
+        for run in tenant_runs:
+            duration = f"{run['duration_seconds']:.1f}s" if run["duration_seconds"] is not None else "-"
+            outcome = "ok" if run["success"] else "FAILED"
+            errors = ", ".join(f"{name} {count}" for name, count in run["error_classes"].items())
+            print(
+                f"    {run['started_at']:%Y-%m-%d %H:%M}  {outcome:<6} {duration:>8}  "
+                f"{run['vehicles_synced'] or 0}/{run['vehicles_found'] or 0} vehicles  "
+                f"{run['faults_found'] or 0} faults"
+                + (f"  errors: {errors}" if errors else "")
+            )
+
+
+def cmd_serve(args):
+    """Run the long-running sync daemon."""
+    from .credentials import get_credentials
+    from .daemon import SyncDaemon, TenantConfig, load_tenants, tenants_from_repository
+
+    if args.tenants:
+        try:
+            tenants = load_tenants(Path(args.tenants))
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+    elif args.credentials:
+        from .credentials import TenantCredentialRepository
+
+        try:
+            repo = TenantCredentialRepository(Path(args.credentials))
+            tenants = tenants_from_repository(repo, interval=args.interval, jitter=args.jitter)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+    else:
+        try:
+            username, password, totp_secret = get_credentials(args.tenant)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        tenants = [
+            TenantConfig(
+                tenant_id=args.tenant or "default",
+                username=username,
+                password=password,
+                totp_secret=totp_secret,
+                interval=args.interval,
+                jitter=args.jitter,
+            )
+        ]
+
+    daemon = SyncDaemon(
+        tenants,
+        output_dir=Path(args.output_dir),
+        health_host=args.health_host,
+        health_port=args.health_port or None,
+        history_dir=Path(args.history) if args.history else None,
+        sweep=args.sweep,
+        memory_soft_mb=args.memory_soft_mb,
+        memory_hard_mb=args.memory_hard_mb,
+        memory_heap=args.memory_heap,
+    )
+    daemon.run()
+    return 0
+
+
+def cmd_sweep(args):
+    """Coordinate or work on a multi-node fleet sweep."""
+    from .serialization import write_result
+    from .workqueue import SQLiteWorkQueue, SweepCoordinator, SweepWorker
+
+    queue = SQLiteWorkQueue(Path(args.queue))
+    coordinator = SweepCoordinator(queue)
+
+    if args.action == "collect":
+        if not args.sweep_id:
+            print("Error: --sweep-id is required")
+            return 1
+        if args.wait and not coordinator.wait(args.sweep_id, timeout=args.wait):
+            print("Timed out waiting for workers, assembling partial result")
+        result = coordinator.assemble(args.sweep_id)
+
+        output_file = Path(args.output or "sync_result.json")
+        write_result(result, output_file)
+        print(f"Results saved to: {output_file}")
+        _record_run(result, args.ledger)
+        _publish_snapshot(result, args.snapshots)
+        return 0 if result.success else 1
+
+    if args.action == "work" and not args.sweep_id:
+        print("Error: --sweep-id is required")
+        return 1
+
+    from .client import TruckTechPlusScraper
+    from .credentials import get_credentials
+    from .layout import LayoutCache
+
+    tenant_id = args.tenant or "default"
+    if args.action == "work":
+        tenant_id = queue.sweep_info(args.sweep_id)[0]
+
+    try:
+        username, password, totp_secret = get_credentials(tenant_id)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    layout = LayoutCache().for_tenant(tenant_id)
+
+    with TruckTechPlusScraper(username, password, totp_secret, layout=layout) as scraper:
+        if not scraper.login():
+            print("Login failed!")
+            return 1
+
+        if args.action == "start":
+            sweep_id = coordinator.start(scraper, tenant_id=tenant_id)
+            print(sweep_id)
+        else:
+            SweepWorker(queue, scraper, worker_id=args.worker_id, lease_seconds=args.lease).run(
+                args.sweep_id
+            )
+    return 0
+
+
+def cmd_events(args):
+    """Read fault change events for a consumer."""
+    from .events import EventQueue
+
+    queue = EventQueue(Path(args.queue) if args.queue else None)
+    batch = queue.read(args.consumer, limit=args.limit)
+
+    for event in batch.events:
+        print(json.dumps(event.to_dict()))
+
+    if not args.peek:
+        queue.ack(args.consumer, batch)
+    return 0
+
+
+def cmd_history(args):
+    """Query or compact the fault history store."""
+    from .history import HistoryStore
+
+    store = HistoryStore(Path(args.dir))
+
+    if args.query == "compact":
+        print(f"Compacted {store.compact(args.tenant)} partition(s)")
+        return 0
+
+    if args.query == "vin":
+        if not args.vin:
+            print("Error: --vin is required")
+            return 1
+        table = store.vin_history(args.vin, tenant_id=args.tenant)
+    elif args.query == "spn":
+        if args.spn is None:
+            print("Error: --spn is required")
+            return 1
+        table = store.spn_occurrences(args.spn, days=args.days, tenant_id=args.tenant)
+    else:
+        since = datetime.now().date() - timedelta(days=args.days)
+        table = store.daily_fault_counts(tenant_id=args.tenant, since=since)
+
+    for row in table.to_pylist():
+        print(json.dumps(row, default=str))
+    return 0
+
+
+def cmd_snapshot(args):
+    """Query a tenant's latest dashboard snapshot."""
+    from .snapshot import SnapshotReader
+
+    reader = SnapshotReader(Path(args.dir))
+    snapshot = reader.current(args.tenant)
+    if snapshot is None:
+        print(f"No snapshot for {args.tenant} in {args.dir}")
+        return 1
+
+    if args.query == "summary":
+        print(json.dumps(snapshot.fleet_summary(), indent=2))
+    elif args.query == "vin":
+        if not args.vin:
+            print("Error: --vin is required")
+            return 1
+        vehicle = snapshot.vehicle(args.vin)
+        if vehicle is None:
+            print(f"{args.vin} is not in the snapshot")
+            return 1
+        print(json.dumps(vehicle.to_dict(), indent=2))
+    else:
+        for vehicle in snapshot.critical_vehicles():
+            print(json.dumps(vehicle.to_dict()))
+    return 0
+
+
+def cmd_profile(args):
+    """Summarise the slowest profiled VINs."""
+    from .profiling import load_runs
+
+    runs = load_runs(Path(args.dir), args.tenant)
+    outliers = [
+        dict(
+            outlier,
+            tenant_id=run["tenant_id"],
+            run_dir=run["run_dir"],
+            threshold_seconds=run["threshold_seconds"],
+            p50_seconds=run["p50_seconds"],
+        )
+        for run in runs
+        for outlier in run["outliers"]
+    ]
+    if not outliers:
+        print(f"No profiled outliers in {args.dir} (run sync with --profile)")
+        return 0
+
+    outliers.sort(key=lambda o: o["seconds"], reverse=True)
+    print(f"{len(outliers)} outlier VINs in {len(runs)} run(s), slowest first\n")
+
+    for outlier in outliers[: args.limit]:
+        print(
+            f"{outlier['vin']}  {outlier['seconds']:.1f}s  "
+            f"(p50 {outlier['p50_seconds']:.1f}s, threshold {outlier['threshold_seconds']:.1f}s)  "
+            f"[{outlier['tenant_id']}]"
+        )
+        phases = sorted(outlier["phases"].items(), key=lambda item: item[1], reverse=True)
+        if phases:
+            print("  Phases:    " + ", ".join(f"{name} {value:.1f}s" for name, value in phases))
+        for function in outlier["top_functions"][:3]:
+            print(f"  Python:    {function['function']} {function['own_seconds']:.2f}s own")
+        if outlier["trace"]:
+            print(f"  Trace:     playwright show-trace {Path(outlier['run_dir']) / outlier['trace']}")
+        print(f"  Profile:   python -m pstats {Path(outlier['run_dir']) / outlier['profile']}")
+
+    print("\nProfiler overhead:")
+    for run in runs:
+        if "overhead_ms_per_vin" in run:
+            print(
+                f"  {run['run_dir']}: {run['overhead_ms_per_vin']:.1f}ms per VIN, "
+                f"{run['vins_traced']}/{run['vins_measured']} VINs traced"
+            )
+
+    # Where the time of all outliers went
+    totals: dict[str, float] = {}
+    for outlier in outliers:
+        for name, value in outlier["phases"].items():
+            totals[name] = totals.get(name, 0.0) + value
+    total = sum(totals.values())
+    if total:
+        print("\nTime across all outliers:")
+        for name, value in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {name:<16} {value:8.1f}s  {100 * value / total:5.1f}%")
+    return 0
+
+
+def cmd_bench(args):
+    """Run performance benchmarks."""
+    from . import bench
+
+    if args.benchmark == "startup":
+        return 0 if bench.bench_startup(budget_ms=args.budget_ms, runs=args.runs) else 1
+    if args.benchmark == "health":
+        return 0 if bench.bench_health(vehicles=args.vehicles) else 1
+    if args.benchmark == "serialize":
+        return 0 if bench.bench_serialize(vehicles=args.vehicles, runs=args.runs) else 1
+    if args.benchmark == "vin":
+        return 0 if bench.bench_vin(vehicles=args.vehicles, runs=args.runs) else 1
+    if args.benchmark == "snapshot":
+        return 0 if bench.bench_snapshot(vehicles=args.vehicles, runs=args.runs) else 1
+    if args.benchmark == "history":
+        return 0 if bench.bench_history(vehicles=args.vehicles, days=args.days, runs=args.runs) else 1
+    return 1
+
+
+def cmd_credentials(args):
+    """Manage encrypted per-tenant credentials."""
+    from .credentials import TenantCredentialRepository
+
+    try:
+        repo = TenantCredentialRepository(Path(args.file) if args.file else None)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.action == "add":
+        if not (args.tenant and args.username and args.password):
+            print("Error: --tenant, --username and --password are required")
+            return 1
+        repo.save(args.tenant, args.username, args.password, args.totp_secret)
+        print(f"Saved credentials for {args.tenant}")
+    elif args.action == "rotate":
+        count = repo.rotate()
+        print(f"Re-encrypted credentials for {count} tenant(s) with the newest key")
+    else:
+        for tenant_id in repo.tenant_ids():
+            print(tenant_id)
+    return 0
+
+
 def cmd_generate_key(args):
     """Generate encryption key."""
+    from .credentials import CredentialStore
+
     key = CredentialStore.generate_key()
     print("Generated encryption key (add to ENCRYPTION_KEY env var):")
     print(key)
@@ -149,18 +658,210 @@ def main():
     sync_parser.add_argument("--password", "-p", help="Portal password")
     sync_parser.add_argument("--tenant", "-t", help="Tenant identifier")
     sync_parser.add_argument("--output", "-o", help="Output file path")
+    sync_parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Stop fetching faults after this many seconds and save a partial result",
+    )
+    sync_parser.add_argument(
+        "--memory-soft-mb",
+        type=float,
+        help="Recreate the browser context when browser + Python RSS exceeds this",
+    )
+    sync_parser.add_argument(
+        "--memory-hard-mb",
+        type=float,
+        help="Stop and save a partial result when browser + Python RSS exceeds this",
+    )
+    sync_parser.add_argument(
+        "--memory-heap",
+        action="store_true",
+        help="Also trace the Python heap with tracemalloc (slower) and report its peak",
+    )
+    sync_parser.add_argument("--history", help="Append the result to this fault history directory")
+    sync_parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Read faults from a fleet-level report first; visit only uncovered VINs",
+    )
+    sync_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profiles",
+        help="Keep cProfile samples and Playwright traces for slow VINs (default dir: profiles)",
+    )
+    sync_parser.add_argument(
+        "--profile-trace-sample",
+        type=float,
+        default=0.0,
+        help="With --profile, also trace this fraction of VIN fetches at random (default: only after a slow one)",
+    )
+    sync_parser.add_argument(
+        "--source",
+        choices=["auto", "portal", "api"],
+        default="auto",
+        help="Data source; auto uses the Decisiv API when DECISIV_CLIENT_ID/SECRET are set",
+    )
+    sync_parser.add_argument(
+        "--ledger", default="sync_ledger.db", help="Sync ledger to record the run in"
+    )
+    sync_parser.add_argument(
+        "--snapshots", default="snapshots", help="Directory to publish the dashboard snapshot to"
+    )
     sync_parser.set_defaults(func=cmd_sync)
 
     # test-login command
     login_parser = subparsers.add_parser("test-login", help="Test login credentials")
     login_parser.add_argument("--username", "-u", help="Portal username")
     login_parser.add_argument("--password", "-p", help="Portal password")
+    login_parser.add_argument("--tenant", "-t", help="Tenant identifier")
     login_parser.set_defaults(func=cmd_test_login)
 
+    # login-all command
+    login_all_parser = subparsers.add_parser(
+        "login-all", help="Log in all tenants in parallel and refresh their sessions"
+    )
+    login_all_parser.add_argument("--tenants", help="JSON tenants file (as for serve)")
+    login_all_parser.add_argument(
+        "--credentials", help="Encrypted tenant credentials file (default: tenant_credentials.json)"
+    )
+    login_all_parser.add_argument("--workers", type=int, default=4, help="Concurrent logins")
+    login_all_parser.add_argument("--output-dir", default=".", help="Directory for session files")
+    login_all_parser.set_defaults(func=cmd_login_all)
+
     # status command
     status_parser = subparsers.add_parser("status", help="Check sync status")
+    status_parser.add_argument("--ledger", default="sync_ledger.db", help="Sync ledger database")
+    status_parser.add_argument("--tenant", "-t", help="Only show this tenant's runs")
+    status_parser.add_argument("--runs", type=int, default=5, help="Recent runs per tenant (default: 5)")
+    status_parser.add_argument(
+        "--stale-hours", type=float, default=24, help="Flag tenants without a success for this long"
+    )
     status_parser.set_defaults(func=cmd_status)
 
+    # serve command
+    serve_parser = subparsers.add_parser("serve", help="Run the sync daemon")
+    serve_parser.add_argument("--tenants", help="JSON file with per-tenant credentials and intervals")
+    serve_parser.add_argument(
+        "--credentials", help="Encrypted tenant credentials file; syncs every tenant in it"
+    )
+    serve_parser.add_argument("--tenant", "-t", help="Tenant identifier (single tenant)")
+    serve_parser.add_argument(
+        "--interval", type=float, default=900, help="Seconds between syncs (default: 900)"
+    )
+    serve_parser.add_argument(
+        "--jitter", type=float, default=60, help="Random +/- seconds per interval (default: 60)"
+    )
+    serve_parser.add_argument("--output-dir", default=".", help="Directory for results and sessions")
+    serve_parser.add_argument("--health-host", default="127.0.0.1", help="Health endpoint host")
+    serve_parser.add_argument(
+        "--health-port", type=int, default=8765, help="Health endpoint port, 0 to disable"
+    )
+    serve_parser.add_argument("--history", help="Append every result to this fault history directory")
+    serve_parser.add_argument(
+        "--sweep", action="store_true", help="Use the fleet-level fault sweep for every cycle"
+    )
+    serve_parser.add_argument(
+        "--memory-soft-mb",
+        type=float,
+        help="Recreate a tenant's browser context when browser + Python RSS exceeds this",
+    )
+    serve_parser.add_argument(
+        "--memory-hard-mb",
+        type=float,
+        help="End a cycle with a partial result when browser + Python RSS exceeds this",
+    )
+    serve_parser.add_argument(
+        "--memory-heap",
+        action="store_true",
+        help="Also trace the Python heap with tracemalloc (slower) and report its peak",
+    )
+    serve_parser.set_defaults(func=cmd_serve)
+
+    # sweep command
+    sweep_parser = subparsers.add_parser("sweep", help="Multi-node fleet sweep")
+    sweep_parser.add_argument(
+        "action", choices=["start", "work", "collect"], help="Coordinator or worker step"
+    )
+    sweep_parser.add_argument("--queue", default="sweeps.db", help="Work queue database")
+    sweep_parser.add_argument("--sweep-id", help="Sweep to work on or collect")
+    sweep_parser.add_argument("--tenant", "-t", help="Tenant identifier (start)")
+    sweep_parser.add_argument("--worker-id", help="Worker identifier (default: host:pid)")
+    sweep_parser.add_argument(
+        "--lease", type=float, default=120, help="Lease length in seconds (default: 120)"
+    )
+    sweep_parser.add_argument("--wait", type=float, help="Seconds to wait for workers (collect)")
+    sweep_parser.add_argument("--output", "-o", help="Output file path (collect)")
+    sweep_parser.add_argument(
+        "--ledger", default="sync_ledger.db", help="Sync ledger to record the run in (collect)"
+    )
+    sweep_parser.add_argument(
+        "--snapshots", default="snapshots", help="Directory to publish the dashboard snapshot to (collect)"
+    )
+    sweep_parser.set_defaults(func=cmd_sweep)
+
+    # events command
+    events_parser = subparsers.add_parser("events", help="Read fault change events")
+    events_parser.add_argument("--consumer", "-c", default="default", help="Consumer cursor name")
+    events_parser.add_argument("--queue", help="Event queue file (default: fault_events.jsonl)")
+    events_parser.add_argument("--limit", type=int, default=100, help="Maximum events to read")
+    events_parser.add_argument("--peek", action="store_true", help="Do not advance the cursor")
+    events_parser.set_defaults(func=cmd_events)
+
+    # history command
+    history_parser = subparsers.add_parser("history", help="Query the fault history store")
+    history_parser.add_argument(
+        "query", choices=["vin", "spn", "daily", "compact"], help="Query to run"
+    )
+    history_parser.add_argument("--dir", default="history", help="History directory")
+    history_parser.add_argument("--tenant", "-t", help="Restrict to one tenant")
+    history_parser.add_argument("--vin", help="Vehicle VIN (vin)")
+    history_parser.add_argument("--spn", type=int, help="Suspect Parameter Number (spn)")
+    history_parser.add_argument(
+        "--days", type=int, default=90, help="Look-back window in days (spn, daily)"
+    )
+    history_parser.set_defaults(func=cmd_history)
+
+    # snapshot command
+    snapshot_parser = subparsers.add_parser("snapshot", help="Query the latest dashboard snapshot")
+    snapshot_parser.add_argument(
+        "query", choices=["summary", "vin", "critical"], help="Query to run"
+    )
+    snapshot_parser.add_argument("--dir", default="snapshots", help="Snapshot directory")
+    snapshot_parser.add_argument("--tenant", "-t", default="default", help="Tenant identifier")
+    snapshot_parser.add_argument("--vin", help="Vehicle VIN (vin)")
+    snapshot_parser.set_defaults(func=cmd_snapshot)
+
+    # profile command
+    profile_parser = subparsers.add_parser("profile", help="Summarise slow VIN profiles")
+    profile_parser.add_argument("--dir", default="profiles", help="Profile directory")
+    profile_parser.add_argument("--tenant", "-t", help="Restrict to one tenant")
+    profile_parser.add_argument("--limit", type=int, default=10, help="VINs to show")
+    profile_parser.set_defaults(func=cmd_profile)
+
+    # bench command
+    bench_parser = subparsers.add_parser("bench", help="Run performance benchmarks")
+    bench_parser.add_argument("benchmark", choices=["startup", "health", "serialize", "vin", "snapshot", "history"], help="Benchmark to run")
+    bench_parser.add_argument(
+        "--budget-ms", type=float, default=150.0, help="Fail above this import time (startup)"
+    )
+    bench_parser.add_argument("--runs", type=int, default=5, help="Number of samples")
+    bench_parser.add_argument(
+        "--vehicles", type=int, default=10000, help="Synthetic fleet size (health, serialize, vin, snapshot, history)"
+    )
+    bench_parser.add_argument("--days", type=int, default=30, help="Days of synthetic history (history)")
+    bench_parser.set_defaults(func=cmd_bench)
+
+    # credentials command
+    creds_parser = subparsers.add_parser("credentials", help="Manage encrypted tenant credentials")
+    creds_parser.add_argument("action", choices=["add", "list", "rotate"], help="Action")
+    creds_parser.add_argument("--file", help="Credentials file (default: tenant_credentials.json)")
+    creds_parser.add_argument("--tenant", "-t", help="Tenant identifier (add)")
+    creds_parser.add_argument("--username", "-u", help="Portal username (add)")
+    creds_parser.add_argument("--password", "-p", help="Portal password (add)")
+    creds_parser.add_argument("--totp-secret", help="TOTP secret (add)")
+    creds_parser.set_defaults(func=cmd_credentials)
+
     # generate-key command
     key_parser = subparsers.add_parser("generate-key", help="Generate encryption key")
     key_parser.set_defaults(func=cmd_generate_key)
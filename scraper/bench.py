@@ -0,0 +1,596 @@
+"""
+Performance benchmarks for the scraper CLI.
+
+Usage:
+    # Cold-start import time of `status`, failing above the budget
+    python -m scraper bench startup --budget-ms 150
+
+    # Health scoring of a synthetic 10k-vehicle fleet
+    python -m scraper bench health --vehicles 10000
+
+    # Encode/decode throughput of a full 10k-vehicle sync result
+    python -m scraper bench serialize --vehicles 10000
+
+    # Per-VIN vs batch decoding of 10k synthetic VINs
+    python -m scraper bench vin --vehicles 10000
+
+    # Dashboard queries from the JSON result vs the memory-mapped snapshot
+    python -m scraper bench snapshot --vehicles 1000
+
+    # History queries over 30 days of 15-minute snapshots of 10k trucks
+    python -m scraper bench history --vehicles 10000 --days 30
+"""
+
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+# Modules that must never be imported by lightweight commands
+HEAVY_MODULES = ("playwright", "cryptography", "pyotp")
+
+DEFAULT_STARTUP_BUDGET_MS = 150.0
+
+
+@dataclass
+class ImportProfile:
+    """Import-time profile of one CLI invocation."""
+
+    total_ms: float = 0.0
+    modules: dict[str, float] = field(default_factory=dict)  # top-level import -> cumulative ms
+    imported: set[str] = field(default_factory=set)  # every module, including nested imports
+
+    @property
+    def heavy_modules(self) -> list[str]:
+        """Heavy subsystems that were imported."""
+        return sorted(name for name in self.imported if name.split(".")[0] in HEAVY_MODULES)
+
+
+def parse_importtime(stderr: str) -> ImportProfile:
+    """
+    Parse `python -X importtime` output.
+
+    Only top-level imports (no leading indentation) are summed so nested
+    imports are not counted twice.
+
+    Args:
+        stderr: Captured stderr of the profiled process.
+
+    Returns:
+        ImportProfile with total and per-module cumulative times.
+    """
+    profile = ImportProfile()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+
+        name = parts[2]
+        module = name.strip()
+        profile.imported.add(module)
+        if name.startswith(" ") and not name.startswith("  "):
+            profile.modules[module] = cumulative_us / 1000
+            profile.total_ms += cumulative_us / 1000
+    return profile
+
+
+def profile_command(command: list[str], runs: int = 5) -> ImportProfile:
+    """
+    Profile the import time of `python -m scraper <command>`.
+
+    Args:
+        command: CLI arguments, e.g. ["status"].
+        runs: Number of cold starts; the fastest is reported to reduce noise.
+
+    Returns:
+        ImportProfile of the fastest run.
+    """
+    package_root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "scraper", *command],
+            cwd=package_root,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        profile = parse_importtime(proc.stderr)
+        if best is None or profile.total_ms < best.total_ms:
+            best = profile
+    return best
+
+
+def bench_startup(budget_ms: float = DEFAULT_STARTUP_BUDGET_MS, runs: int = 5) -> bool:
+    """
+    Check `status` cold-start import time against a budget.
+
+    Args:
+        budget_ms: Maximum allowed import time in milliseconds.
+        runs: Number of cold starts to sample.
+
+    Returns:
+        True if within budget and no heavy subsystem was imported.
+    """
+    profile = profile_command(["status"], runs=runs)
+
+    print(f"status import time: {profile.total_ms:.1f}ms (budget {budget_ms:.0f}ms)")
+    slowest = sorted(profile.modules.items(), key=lambda item: item[1], reverse=True)[:5]
+    for name, ms in slowest:
+        print(f"  {name:<30} {ms:8.1f}ms")
+
+    ok = profile.total_ms <= budget_ms
+    if not ok:
+        print("FAIL: startup budget exceeded")
+    if profile.heavy_modules:
+        print(f"FAIL: heavy modules imported: {', '.join(profile.heavy_modules)}")
+        ok = False
+    return ok
+
+
+def synthetic_fleet(vehicles: int, faults_per_vehicle: float = 3.0, seed: int = 0) -> list:
+    """
+    Build a random fleet for benchmarks.
+
+    Args:
+        vehicles: Number of vehicles.
+        faults_per_vehicle: Average faults per vehicle.
+        seed: Random seed, for repeatable runs.
+
+    Returns:
+        List of VehicleData with faults.
+    """
+    from datetime import datetime, timedelta
+
+    from .models import FaultCodeData, VehicleData
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    severities = ["critical", "major", "minor", "info", "unknown"]
+    spns = [110, 100, 190, 1569, 3363, 3364, 4364, 5246, 520, 94, 102, 175]
+
+    fleet = []
+    for i in range(vehicles):
+        vin = f"1XKYD49X{i:09d}"
+        faults = [
+            FaultCodeData(
+                vin=vin,
+                spn=rng.choice(spns),
+                fmi=rng.randint(0, 31),
+                severity=rng.choice(severities),
+                is_active=rng.random() < 0.6,
+                last_seen=now - timedelta(days=rng.uniform(0, 120)),
+                occurrence_count=rng.randint(1, 20),
+            )
+            for _ in range(rng.randint(0, int(faults_per_vehicle * 2)))
+        ]
+        fleet.append(VehicleData(vin=vin, unit_number=str(i), faults=faults))
+    return fleet
+
+
+def bench_health(vehicles: int = 10000, changed_fraction: float = 0.01) -> bool:
+    """
+    Time health scoring of a synthetic fleet.
+
+    Compares the per-vehicle reference loop with the vectorized batch and
+    times an incremental update where only some vehicles raised fault
+    events.
+
+    Args:
+        vehicles: Fleet size.
+        changed_fraction: Share of vehicles whose faults change before the incremental update.
+
+    Returns:
+        True if the batch scores match the reference implementation and the
+        incremental scores match a fresh batch.
+    """
+    from datetime import datetime
+
+    from .events import diff_faults, snapshot_faults
+    from .health import HealthScorer, score_fleet, score_vehicle
+
+    fleet = synthetic_fleet(vehicles)
+    faults = sum(len(v.faults) for v in fleet)
+    now = datetime.now()
+    print(f"Fleet: {vehicles} vehicles, {faults} faults")
+
+    started = time.perf_counter()
+    reference = [score_vehicle(v, now) for v in fleet]
+    loop_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    batch = score_fleet(fleet, now)
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    scorer = HealthScorer()
+    started = time.perf_counter()
+    scorer.update(fleet, now)
+    full_ms = (time.perf_counter() - started) * 1000
+
+    # Toggle faults on some vehicles; the events they raise drive the update
+    snapshots = {v.vin: snapshot_faults(v.faults) for v in fleet}
+    for vehicle in fleet[: max(1, int(vehicles * changed_fraction))]:
+        for fault in vehicle.faults:
+            fault.is_active = not fault.is_active
+    changed = {v.vin for v in fleet if diff_faults("bench", v.vin, snapshots[v.vin], v.faults)}
+    started = time.perf_counter()
+    rescored = scorer.update(fleet, now, changed=changed)
+    incremental_ms = (time.perf_counter() - started) * 1000
+
+    print(f"  Per-vehicle loop:    {loop_ms:8.1f}ms")
+    print(f"  Vectorized batch:    {batch_ms:8.1f}ms")
+    print(f"  HealthScorer (full): {full_ms:8.1f}ms")
+    print(f"  Incremental update:  {incremental_ms:8.1f}ms ({rescored} rescored)")
+
+    ok = True
+    mismatches = sum(1 for a, b in zip(reference, batch["scores"]) if abs(a - int(b)) > 1)
+    if mismatches:
+        print(f"FAIL: {mismatches} scores differ from the reference implementation")
+        ok = False
+
+    fresh = score_fleet(fleet, now)
+    stale = sum(1 for v, score in zip(fleet, fresh["scores"]) if v.health_score != int(score))
+    if stale:
+        print(f"FAIL: {stale} incremental scores differ from a fresh batch")
+        ok = False
+    summary = scorer.summary()
+    scorer = HealthScorer()
+    scorer.update(fleet, now)
+    if summary != scorer.summary():
+        print("FAIL: incremental fleet summary differs from a fresh one")
+        ok = False
+    return ok
+
+
+def bench_serialize(vehicles: int = 10000, runs: int = 5) -> bool:
+    """
+    Time encoding and decoding of a full SyncResult.
+
+    Every available backend is measured (orjson if installed, and the
+    standard library), and the round trip is checked for equality.
+
+    Args:
+        vehicles: Fleet size of the synthetic result.
+        runs: Repetitions; the fastest is reported.
+
+    Returns:
+        True if every backend round-trips the result and they produce the same document.
+    """
+    from datetime import datetime
+
+    from . import serialization
+    from .models import SyncResult
+
+    fleet = synthetic_fleet(vehicles)
+    result = SyncResult(
+        tenant_id="bench",
+        started_at=datetime.now(),
+        completed_at=datetime.now(),
+        vehicles_found=vehicles,
+        vehicles_synced=vehicles,
+        faults_found=sum(len(v.faults) for v in fleet),
+        vehicles=fleet,
+        success=True,
+    )
+
+    backends = [False]
+    if serialization.orjson:
+        backends.insert(0, True)
+
+    ok = True
+    documents = []
+    print(f"Payload: {vehicles} vehicles, {result.faults_found} faults")
+    for fast in backends:
+        encode_s = decode_s = float("inf")
+        for _ in range(runs):
+            started = time.perf_counter()
+            data = serialization.encode_result(result, fast=fast)
+            encode_s = min(encode_s, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            decoded = serialization.decode_result(data, fast=fast)
+            decode_s = min(decode_s, time.perf_counter() - started)
+
+        size_mb = len(data) / (1024 * 1024)
+        name = "orjson" if fast else "json"
+        print(
+            f"  {name:<7} {size_mb:6.1f}MB  encode {encode_s * 1000:7.1f}ms "
+            f"({size_mb / encode_s:6.0f}MB/s)  decode {decode_s * 1000:7.1f}ms "
+            f"({size_mb / decode_s:6.0f}MB/s)"
+        )
+        if decoded != result:
+            print(f"FAIL: {name} round trip does not match")
+            ok = False
+        documents.append(serialization.loads(data, fast=False))
+
+    if len(documents) > 1 and documents[0] != documents[1]:
+        print("FAIL: backends produce different documents")
+        ok = False
+    return ok
+
+
+def synthetic_vins(count: int, seed: int = 42) -> list[str]:
+    """Generate VINs with known WMIs and valid check digits."""
+    from .vin import VIN_ALPHABET, WMI_MAKES, YEAR_CODES, check_digit
+
+    rng = random.Random(seed)
+    wmis = sorted(WMI_MAKES)
+    year_codes = sorted(YEAR_CODES)
+    vins = []
+    for _ in range(count):
+        chars = [
+            rng.choice(wmis),
+            "".join(rng.choices(VIN_ALPHABET, k=5)),
+            "0",
+            rng.choice(year_codes),
+            rng.choice(VIN_ALPHABET),
+            f"{rng.randrange(1_000_000):06d}",
+        ]
+        vin = "".join(chars)
+        vins.append(vin[:8] + check_digit(vin) + vin[9:])
+    return vins
+
+
+def bench_vin(vehicles: int = 10000, runs: int = 5) -> bool:
+    """
+    Time offline VIN decoding.
+
+    Compares the per-VIN decoder with the vectorized batch used by syncs.
+
+    Args:
+        vehicles: Number of synthetic VINs.
+        runs: Repetitions; the fastest is reported.
+
+    Returns:
+        True if the batch agrees with the per-VIN decoder.
+    """
+    from .vin import VinDecoder
+
+    started = time.perf_counter()
+    decoder = VinDecoder.shared()
+    load_ms = (time.perf_counter() - started) * 1000
+    vins = synthetic_vins(vehicles)
+
+    loop_s = batch_s = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        reference = [decoder.decode(vin) for vin in vins]
+        loop_s = min(loop_s, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        batch = decoder.decode_batch(vins)
+        batch_s = min(batch_s, time.perf_counter() - started)
+
+    print(f"VINs: {vehicles} (table {decoder.table_file})")
+    print(f"  Table load:       {load_ms:8.2f}ms")
+    print(f"  Per-VIN decode:   {loop_s * 1000:8.1f}ms ({loop_s * 1e6 / vehicles:6.2f}us/VIN)")
+    print(f"  Vectorized batch: {batch_s * 1000:8.1f}ms ({batch_s * 1e6 / vehicles:6.2f}us/VIN)")
+
+    mismatches = 0
+    for row, decoded in enumerate(reference):
+        make = decoder.makes[batch["make_id"][row]] or None
+        if (
+            decoded is None
+            or not batch["valid"][row]
+            or not batch["check_digit_valid"][row]
+            or decoded.make != make
+            or decoded.model_year != int(batch["model_year"][row])
+            or decoded.year_ambiguous != bool(batch["year_ambiguous"][row])
+        ):
+            mismatches += 1
+    if mismatches:
+        print(f"FAIL: {mismatches} VINs decode differently in the batch")
+    return mismatches == 0
+
+
+def bench_snapshot(vehicles: int = 1000, runs: int = 5) -> bool:
+    """
+    Time the dashboard's queries against the JSON result and the snapshot.
+
+    Each pass starts from the file on disk, as a dashboard request would:
+    fleet summary, one vehicle by VIN and the vehicles with critical faults.
+
+    Args:
+        vehicles: Fleet size of the synthetic result.
+        runs: Repetitions; the fastest is reported.
+
+    Returns:
+        True if both paths return the same answers.
+    """
+    import tempfile
+    from datetime import datetime
+
+    from .health import HealthScorer
+    from .models import SyncResult
+    from .serialization import read_result, write_result
+    from .snapshot import Snapshot, publish_snapshot
+
+    fleet = synthetic_fleet(vehicles)
+    HealthScorer().update(fleet)
+    result = SyncResult(
+        tenant_id="bench",
+        started_at=datetime.now(),
+        completed_at=datetime.now(),
+        vehicles_found=vehicles,
+        vehicles_synced=vehicles,
+        faults_found=sum(len(v.faults) for v in fleet),
+        vehicles=fleet,
+        success=True,
+    )
+    vin = fleet[len(fleet) // 2].vin
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_file = Path(directory) / "bench_sync.json"
+        write_result(result, json_file)
+        started = time.perf_counter()
+        snapshot_file = publish_snapshot(result, Path(directory))
+        publish_ms = (time.perf_counter() - started) * 1000
+
+        json_s = open_s = summary_s = vin_s = critical_s = float("inf")
+        for _ in range(runs):
+            started = time.perf_counter()
+            loaded = read_result(json_file)
+            by_vin = {v.vin: v for v in loaded.vehicles}
+            json_vehicle = by_vin[vin]
+            json_critical = [v for v in loaded.vehicles if any(f.is_active and f.is_critical for f in v.faults)]
+            json_s = min(json_s, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            snapshot = Snapshot(snapshot_file)
+            open_s = min(open_s, time.perf_counter() - started)
+            started = time.perf_counter()
+            snapshot.fleet_summary()
+            summary_s = min(summary_s, time.perf_counter() - started)
+            started = time.perf_counter()
+            snapshot_vehicle = snapshot.vehicle(vin)
+            vin_s = min(vin_s, time.perf_counter() - started)
+            started = time.perf_counter()
+            snapshot_critical = snapshot.critical_vehicles()
+            critical_s = min(critical_s, time.perf_counter() - started)
+
+        json_mb = json_file.stat().st_size / (1024 * 1024)
+        snapshot_mb = snapshot_file.stat().st_size / (1024 * 1024)
+
+    print(f"Fleet: {vehicles} vehicles, {result.faults_found} faults")
+    print(f"  JSON result ({json_mb:.1f}MB), parse + index: {json_s * 1000:8.2f}ms")
+    print(f"  Snapshot ({snapshot_mb:.1f}MB), published in {publish_ms:.1f}ms")
+    print(f"    open:                 {open_s * 1000:8.2f}ms")
+    print(f"    fleet summary:        {summary_s * 1000:8.2f}ms")
+    print(f"    vehicle by VIN:       {vin_s * 1000:8.2f}ms")
+    print(f"    critical vehicles:    {critical_s * 1000:8.2f}ms ({len(snapshot_critical)} vehicles)")
+
+    ok = True
+    if snapshot_vehicle.to_dict() != json_vehicle.to_dict():
+        print(f"FAIL: {vin} differs between the JSON result and the snapshot")
+        ok = False
+    if sorted(v.vin for v in snapshot_critical) != sorted(v.vin for v in json_critical):
+        print("FAIL: critical vehicles differ between the JSON result and the snapshot")
+        ok = False
+    return ok
+
+
+HISTORY_SNAPSHOTS_PER_DAY = 96  # every 15 minutes
+HISTORY_FAULTS_PER_VEHICLE = 0.3  # distinct fault codes per vehicle and day
+
+
+def bench_history(vehicles: int = 10000, days: int = 30, runs: int = 3, seed: int = 42) -> bool:
+    """
+    Time fault history queries over synthetic 15-minute snapshots.
+
+    Closed days are written as one part each (the same rows as 96 syncs)
+    and compacted; today stays open, as it would between syncs.
+
+    Args:
+        vehicles: Fleet size.
+        days: Days of history, including today.
+        runs: Repetitions; the fastest is reported.
+        seed: Random seed, for repeatable runs.
+
+    Returns:
+        True if the daily counts match the generated distinct fault codes.
+    """
+    import tempfile
+    from datetime import date, datetime, timedelta
+
+    import numpy as np
+
+    from .history import FAULTS, HistoryStore
+
+    rng = np.random.default_rng(seed)
+    spns = np.array([110, 100, 190, 1569, 3363, 3364, 4364, 5246, 520, 94, 102, 175], dtype=np.int32)
+    critical_spns = np.array([1569, 3363, 3364, 4364, 5246], dtype=np.int32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = HistoryStore(Path(directory))
+        pa = store.pa
+        vins = pa.array([f"1XKYD49X{i:09d}" for i in range(vehicles)])
+        expected = {}
+        rows = 0
+
+        started = time.perf_counter()
+        for offset in range(days - 1, -1, -1):
+            day = date.today() - timedelta(days=offset)
+            # The day's distinct codes, each present in every snapshot
+            codes = int(vehicles * HISTORY_FAULTS_PER_VEHICLE)
+            vehicle = rng.integers(0, vehicles, codes)
+            spn = rng.choice(spns, codes)
+            fmi = rng.integers(0, 32, codes).astype(np.int16)
+            _, unique = np.unique(np.stack([vehicle, spn, fmi]), axis=1, return_index=True)
+            vehicle, spn, fmi = vehicle[unique], spn[unique], fmi[unique]
+            critical = np.isin(spn, critical_spns)
+            expected[day] = (len(unique), int(critical.sum()), len(np.unique(vehicle)))
+
+            snapshots = 4 if offset == 0 else HISTORY_SNAPSHOTS_PER_DAY
+            midnight = datetime.combine(day, datetime.min.time())
+            snapshot_at = np.repeat(
+                np.array([midnight + timedelta(minutes=15 * i) for i in range(snapshots)], dtype="datetime64[us]"),
+                len(unique),
+            )
+            count = len(snapshot_at)
+            table = pa.table(
+                {
+                    "snapshot_at": snapshot_at,
+                    "vin": vins.take(pa.array(np.tile(vehicle, snapshots))),
+                    "spn": np.tile(spn, snapshots),
+                    "fmi": np.tile(fmi, snapshots),
+                    "source_address": np.zeros(count, dtype=np.int16),
+                    "severity": pa.array(["major"] * count),
+                    "is_active": np.ones(count, dtype=bool),
+                    "is_critical": np.tile(critical, snapshots),
+                    "description": pa.array([""] * count),
+                    "occurrence_count": np.ones(count, dtype=np.int32),
+                },
+                schema=store.schemas[FAULTS],
+            )
+            partition = store._partition_dir(FAULTS, "bench", day)
+            partition.mkdir(parents=True, exist_ok=True)
+            store._write(table, partition / f"part-{day:%Y%m%d}.parquet")
+            rows += count
+        write_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store.compact()
+        compact_s = time.perf_counter() - started
+
+        vin = vins[0].as_py()
+        timings = {}
+        for name, query in (
+            ("VIN history (all days)", lambda: store.vin_history(vin)),
+            ("SPN 110, last 90 days", lambda: store.spn_occurrences(110, days=90)),
+            ("Daily counts (all days)", lambda: store.daily_fault_counts()),
+        ):
+            best = float("inf")
+            for _ in range(runs):
+                started = time.perf_counter()
+                result = query()
+                best = min(best, time.perf_counter() - started)
+            timings[name] = (best, result.num_rows)
+        counts = store.daily_fault_counts()
+
+    print(f"History: {vehicles} vehicles, {days} days, {rows:,} fault rows")
+    print(f"  Write parts:  {write_s:8.1f}s")
+    print(f"  Compaction:   {compact_s:8.1f}s")
+    for name, (seconds, result_rows) in timings.items():
+        print(f"  {name:<26} {seconds * 1000:8.1f}ms ({result_rows} rows)")
+
+    actual = {
+        row["date"]: (row["faults"], row["critical_faults"], row["vehicles"])
+        for row in counts.to_pylist()
+    }
+    if actual != expected:
+        mismatched = sorted(day for day in expected if actual.get(day) != expected[day])
+        print(f"FAIL: daily counts differ from the generated codes on {len(mismatched)} day(s)")
+        return False
+    return True
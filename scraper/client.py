@@ -7,9 +7,10 @@ Automated data extraction from PACCAR Solutions portal (Decisiv SRM).
 import json
 import os
 import re
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
+from urllib.parse import urlparse
 
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
 
@@ -18,12 +19,26 @@ from .errors import (
     MFARequired,
     SessionExpired,
     ExtractionError,
+    RateLimited,
 )
-from .models import VehicleData, FaultCodeData, SyncResult
+from .models import VehicleData, FaultCodeData
 from .mfa.totp import TOTPHandler
+from .governor import RateGovernor
+from .sources import DataSource, sweep_fault_feed
+from .layout import (
+    MFA_NONE,
+    VEHICLES_CARDS,
+    VEHICLES_TABLE,
+    TenantLayout,
+    detect_portal_version,
+)
+
+
+# 17 characters, no I, O or Q
+VIN_PATTERN = re.compile(r"\b[A-HJ-NPR-Z0-9]{17}\b")
 
 
-class TruckTechPlusScraper:
+class TruckTechPlusScraper(DataSource):
     """
     Scrape TruckTech+ data from PACCAR Solutions portal.
 
@@ -49,6 +64,63 @@ class TruckTechPlusScraper:
     LOGIN_URL = "https://paccar.decisiv.net/login"
     BASE_URL = "https://paccar.decisiv.net"
     SESSION_FILE = Path("session_storage.json")
+    USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    MFA_ATTEMPTS = 3
+    TOTP_MIN_REMAINING = 5  # seconds a TOTP code must stay valid when submitted
+
+    # Vehicle list layouts in probe order: name -> (wait selector, extractor method)
+    VEHICLE_LAYOUTS = {
+        VEHICLES_TABLE: ("table tbody tr", "_extract_vehicle_table"),
+        VEHICLES_CARDS: (".asset-card, .vehicle-card", "_extract_vehicle_cards"),
+    }
+
+    # Fault row selectors in probe order
+    FAULT_ROW_SELECTORS = (".fault-row", ".dtc-row", "table tbody tr", ".fault-item")
+
+    # Collects label/value pairs (dl, two-cell rows, .label siblings, data-*
+    # attributes) from the diagnostics page in one round trip
+    DETAILS_SCRIPT = """() => {
+        const fields = {};
+        const add = (label, value) => {
+            label = (label || "").trim().replace(/[:\\s]+$/, "").toLowerCase();
+            value = (value || "").trim();
+            if (label && value && !(label in fields)) fields[label] = value;
+        };
+        document.querySelectorAll("dt").forEach(dt => {
+            const dd = dt.nextElementSibling;
+            if (dd && dd.tagName === "DD") add(dt.textContent, dd.textContent);
+        });
+        document.querySelectorAll("tr").forEach(tr => {
+            const cells = tr.querySelectorAll("th, td");
+            if (cells.length === 2) add(cells[0].textContent, cells[1].textContent);
+        });
+        document.querySelectorAll(".label").forEach(label => {
+            if (label.nextElementSibling) add(label.textContent, label.nextElementSibling.textContent);
+        });
+        for (const name of ["odometer", "engine-hours", "engine-make", "engine-model", "lat", "lng"]) {
+            const el = document.querySelector(`[data-${name}]`);
+            if (el) add(name, el.getAttribute(`data-${name}`));
+        }
+        return fields;
+    }"""
+
+    # Fleet-level fault sources tried by sweep_faults(), JSON feeds first
+    FLEET_FAULT_FEEDS = ("/api/v1/faults", "/api/v1/fault_codes", "/api/faults")
+    FLEET_FAULT_PAGES = ("/faults", "/reports/faults", "/reports/fault-codes")
+    FLEET_PAGE_SIZE = 500
+    MAX_FLEET_PAGES = 200
+
+    # Text and class of every fault row on a fleet report page, in one round trip
+    FLEET_ROWS_SCRIPT = """() => Array.from(
+        document.querySelectorAll("table tbody tr, .fault-row, .dtc-row"),
+        row => ({text: row.innerText, cls: row.className || ""})
+    )"""
+
+    MFA_INDICATORS = {
+        'totp': ['input[name="code"]', 'input[placeholder*="authenticator"]'],
+        'sms': ['text="text message"', 'text="SMS"'],
+        'email': ['text="email"', 'text="verification code"'],
+    }
 
     def __init__(
         self,
@@ -57,6 +129,10 @@ class TruckTechPlusScraper:
         totp_secret: Optional[str] = None,
         headless: Optional[bool] = None,
         session_file: Optional[Path] = None,
+        browser: Optional[Browser] = None,
+        layout: Optional[TenantLayout] = None,
+        governor: Optional[RateGovernor] = None,
+        credentials_source: Optional[Callable[[], tuple[str, str, Optional[str]]]] = None,
     ):
         """
         Initialize scraper.
@@ -67,9 +143,20 @@ class TruckTechPlusScraper:
             totp_secret: Optional TOTP secret for MFA (future-proofing).
             headless: Run browser in headless mode. Defaults to HEADLESS env var or True.
             session_file: Path to store session cookies. Defaults to session_storage.json.
+            browser: Already-running browser to share (e.g. from the sync daemon).
+                     A shared browser is not closed by close().
+            layout: Cached portal layout for this tenant. Without it, every
+                    layout variant is probed on each page.
+            governor: Rate governor for portal navigations. Defaults to the
+                      node-wide governor for the portal host.
+            credentials_source: Called on each fresh login for (username,
+                      password, totp_secret), e.g. from a credential
+                      repository's cache, instead of keeping them on the
+                      scraper. Overrides the credential arguments.
         """
         self.username = username
         self.password = password
+        self._credentials_source = credentials_source
         self.totp_handler = TOTPHandler(totp_secret) if totp_secret else None
 
         # Headless mode from env or param
@@ -81,22 +168,62 @@ class TruckTechPlusScraper:
             self.SESSION_FILE = session_file
 
         self._playwright = None
-        self.browser: Optional[Browser] = None
+        self.browser: Optional[Browser] = browser
+        self._owns_browser = browser is None
+        self.layout = layout
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        super().__init__(governor or RateGovernor.for_host(urlparse(self.BASE_URL).hostname))
 
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+        # Details of the last login() call
+        self.session_reused = False
+        self.mfa_attempts = 0
 
     def _start_browser(self):
         """Initialize Playwright and browser."""
-        if not self._playwright:
+        if not self._playwright and not self.browser:
             self._playwright = sync_playwright().start()
             self.browser = self._playwright.chromium.launch(headless=self.headless)
 
+    def _governed(self, request):
+        """
+        Run one portal request through the rate governor.
+
+        Args:
+            request: Callable making the request and returning a Playwright
+                     Response/APIResponse (or None).
+
+        Raises:
+            RateLimited: The portal answered 429.
+        """
+        slot = self.governor.acquire()
+        started = time.monotonic()
+        status = None
+        retry_after = None
+        try:
+            response = request()
+            if response is not None:
+                status = response.status
+                if status == 429:
+                    try:
+                        retry_after = int(response.headers.get("retry-after", ""))
+                    except ValueError:
+                        retry_after = RateLimited().retry_after
+        finally:
+            self.governor.release(slot, time.monotonic() - started, status, retry_after)
+
+        if status == 429:
+            raise RateLimited(retry_after)
+        return response
+
+    def _goto(self, url: str, **kwargs):
+        """Navigate the page through the rate governor."""
+        return self._governed(lambda: self.page.goto(url, **kwargs))
+
+    def _fetch(self, url: str, params: Optional[dict] = None):
+        """GET a URL with the session's cookies (no page load) through the rate governor."""
+        return self._governed(lambda: self.context.request.get(url, params=params))
+
     def _load_session(self) -> bool:
         """
         Try to reuse existing session.
@@ -114,12 +241,13 @@ class TruckTechPlusScraper:
             self.page = self.context.new_page()
 
             # Navigate to dashboard to test session
-            self.page.goto(f"{self.BASE_URL}/dashboard")
+            self._goto(f"{self.BASE_URL}/dashboard")
             self.page.wait_for_load_state("networkidle", timeout=10000)
 
             # Check if we're actually logged in (not redirected to login)
             if "/login" not in self.page.url:
                 print("  Reused existing session")
+                self._detect_portal_version()
                 return True
 
         except Exception as e:
@@ -133,7 +261,7 @@ class TruckTechPlusScraper:
 
         return False
 
-    def _save_session(self):
+    def save_session(self):
         """Save session for reuse."""
         if self.context:
             self.context.storage_state(path=str(self.SESSION_FILE))
@@ -143,7 +271,7 @@ class TruckTechPlusScraper:
         """Create a fresh browser context."""
         self.context = self.browser.new_context(
             viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            user_agent=self.USER_AGENT,
         )
         self.page = self.context.new_page()
 
@@ -151,25 +279,68 @@ class TruckTechPlusScraper:
         """
         Check if MFA prompt appeared.
 
+        With a cached fingerprint, a login that already landed on the
+        dashboard skips the probes entirely, and a known MFA type is
+        checked first.
+
         Returns:
             MFA type ('totp', 'sms', 'email') or None.
         """
-        mfa_indicators = {
-            'totp': ['input[name="code"]', 'input[placeholder*="authenticator"]'],
-            'sms': ['text="text message"', 'text="SMS"'],
-            'email': ['text="email"', 'text="verification code"'],
-        }
-
-        for mfa_type, selectors in mfa_indicators.items():
-            for selector in selectors:
+        cached_type = self.layout.get("mfa_type") if self.layout else None
+        on_dashboard = "/dashboard" in self.page.url or "/home" in self.page.url
+        if cached_type == MFA_NONE and on_dashboard:
+            return None
+
+        mfa_types = list(self.MFA_INDICATORS)
+        if cached_type in self.MFA_INDICATORS:
+            mfa_types.remove(cached_type)
+            mfa_types.insert(0, cached_type)
+
+        for mfa_type in mfa_types:
+            for selector in self.MFA_INDICATORS[mfa_type]:
                 try:
                     if self.page.query_selector(selector):
+                        if self.layout:
+                            self.layout.remember("mfa_type", mfa_type)
                         return mfa_type
                 except Exception:
                     pass
 
+        if self.layout and on_dashboard:
+            self.layout.remember("mfa_type", MFA_NONE)
         return None
 
+    def _detect_portal_version(self):
+        """Key the layout cache on the portal version shown in the page."""
+        if not self.layout:
+            return
+        try:
+            version = detect_portal_version(self.page.content())
+        except Exception:
+            version = None
+        if version:
+            self.layout.set_portal_version(version)
+
+    def _wait_for_mfa_result(self, timeout: float = 10.0) -> bool:
+        """
+        Wait for the MFA submission outcome.
+
+        Returns as soon as the dashboard loads or an error message appears,
+        instead of always waiting for the full timeout on a rejected code.
+
+        Returns:
+            True if the dashboard loaded.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if "/dashboard" in self.page.url:
+                return True
+            error = self.page.query_selector(".error, .alert-danger, .error-message, [role=alert]")
+            if error and error.is_visible():
+                return False
+            self.page.wait_for_timeout(250)
+        return False
+
     def _handle_mfa(self, mfa_type: str) -> bool:
         """
         Handle MFA challenge.
@@ -186,36 +357,90 @@ class TruckTechPlusScraper:
         print(f"  MFA detected: {mfa_type}")
 
         if mfa_type == "totp" and self.totp_handler:
-            code = self.totp_handler.get_code()
-            print(f"  Entering TOTP code...")
+            code = None
+            for attempt in range(1, self.MFA_ATTEMPTS + 1):
+                # Never submit a code that rotates before the portal checks it,
+                # and never resubmit a code that was just rejected
+                code = self.totp_handler.get_fresh_code(
+                    min_remaining=self.TOTP_MIN_REMAINING, exclude=code
+                )
+                print(f"  Entering TOTP code (attempt {attempt})...")
 
-            # Find and fill code input
-            code_input = self.page.query_selector(
-                'input[name="code"], input[placeholder*="code"]'
-            )
-            if code_input:
+                # Find and fill code input
+                code_input = self.page.query_selector(
+                    'input[name="code"], input[placeholder*="code"]'
+                )
+                if not code_input:
+                    break
+
+                self.mfa_attempts = attempt
                 code_input.fill(code)
                 self.page.click('button[type="submit"]')
 
-                try:
-                    self.page.wait_for_url("**/dashboard**", timeout=10000)
+                if self._wait_for_mfa_result():
                     return True
-                except Exception:
-                    print("  TOTP code rejected")
-                    return False
+                print("  TOTP code rejected")
+            return False
 
         # No automatic handler available
         if not self.headless:
             print(f"  Complete MFA manually in browser (5 min timeout)...")
             try:
                 self.page.wait_for_url("**/dashboard**", timeout=300000)
-                self._save_session()
+                self.save_session()
                 return True
             except Exception:
                 return False
 
         raise MFARequired(mfa_type)
 
+    def recycle_context(self):
+        """
+        Close the browser context and recreate it from its storage state.
+
+        Frees memory accumulated by the renderer during long sweeps without
+        logging in again.
+        """
+        if not self.context:
+            return
+
+        state = self.context.storage_state()
+        self.context.close()
+        self.context = self.browser.new_context(
+            storage_state=state,
+            viewport={"width": 1920, "height": 1080},
+            user_agent=self.USER_AGENT,
+        )
+        self.page = self.context.new_page()
+
+    def reset_session(self):
+        """Drop the current browser context so the next login re-validates it."""
+        if self.context:
+            try:
+                self.context.close()
+            except Exception:
+                pass
+        self.context = None
+        self.page = None
+
+    def ensure_logged_in(self) -> bool:
+        """
+        Login only if there is no live page.
+
+        Lets long-running callers keep a warm context between syncs instead
+        of re-validating the session every cycle.
+
+        Returns:
+            True if a logged-in page is available.
+
+        Raises:
+            LoginError: If login fails.
+        """
+        if self.page and not self.page.is_closed():
+            return True
+        self.reset_session()
+        return self.login()
+
     def login(self) -> bool:
         """
         Login to PACCAR Solutions portal.
@@ -233,10 +458,13 @@ class TruckTechPlusScraper:
             LoginError: If login fails.
         """
         self._start_browser()
+        self.session_reused = False
+        self.mfa_attempts = 0
 
         # Try existing session first
         print("Checking existing session...")
         if self._load_session():
+            self.session_reused = True
             return True
 
         # Fresh login needed
@@ -244,13 +472,18 @@ class TruckTechPlusScraper:
         self._new_context()
 
         print(f"  Navigating to {self.LOGIN_URL}...")
-        self.page.goto(self.LOGIN_URL)
+        self._goto(self.LOGIN_URL)
         self.page.wait_for_load_state("networkidle")
+        self._detect_portal_version()
 
         # Fill login form
         print("  Entering credentials...")
-        self.page.fill("#auth_key", self.username)
-        self.page.fill('input[type="password"]', self.password)
+        username, password = self.username, self.password
+        if self._credentials_source:
+            username, password, totp_secret = self._credentials_source()
+            self.totp_handler = TOTPHandler(totp_secret) if totp_secret else None
+        self.page.fill("#auth_key", username)
+        self.page.fill('input[type="password"]', password)
 
         # Click login button
         self.page.click('button[type="submit"]')
@@ -269,7 +502,7 @@ class TruckTechPlusScraper:
             # Check if we're on dashboard
             if "/dashboard" in self.page.url or "/home" in self.page.url:
                 print("  Login successful")
-                self._save_session()
+                self.save_session()
                 return True
 
             # Check for error message
@@ -284,18 +517,25 @@ class TruckTechPlusScraper:
 
             # Unknown state but not login page - might be OK
             print(f"  Unexpected URL after login: {self.page.url}")
-            self._save_session()
+            self.save_session()
             return True
 
         except LoginError:
             raise
         except Exception as e:
             raise LoginError(f"Login failed: {e}")
+        finally:
+            if self._credentials_source:
+                self.totp_handler = None
 
     def get_vehicles(self) -> list[VehicleData]:
         """
         Extract vehicle list from portal.
 
+        With a cached layout, only that layout's selectors are used; if it
+        yields no vehicles, the cache entry is dropped and every layout is
+        probed again.
+
         Returns:
             List of VehicleData objects.
 
@@ -307,65 +547,91 @@ class TruckTechPlusScraper:
             raise SessionExpired("Not logged in")
 
         print("Fetching vehicle list...")
-        self.page.goto(f"{self.BASE_URL}/assets")
-
-        try:
-            self.page.wait_for_selector(
-                "table tbody tr, .asset-list, .vehicle-list, .no-data",
-                timeout=30000,
-            )
-        except Exception:
-            # Check if redirected to login
-            if "/login" in self.page.url:
-                raise SessionExpired("Session expired")
-            raise ExtractionError(self.page.url, "Timeout waiting for vehicle list")
+        self._goto(f"{self.BASE_URL}/assets")
 
         vehicles = []
+        cached_layout = self.layout.get("vehicles_layout") if self.layout else None
+        if cached_layout in self.VEHICLE_LAYOUTS:
+            selector, extractor = self.VEHICLE_LAYOUTS[cached_layout]
+            try:
+                self.page.wait_for_selector(f"{selector}, .no-data", timeout=30000)
+                vehicles = getattr(self, extractor)()
+            except Exception:
+                if "/login" in self.page.url:
+                    raise SessionExpired("Session expired")
+            if not vehicles:
+                self.layout.invalidate("vehicles_layout")
 
-        # Try table format first
-        rows = self.page.query_selector_all("table tbody tr")
-        if rows:
-            for row in rows:
-                cells = row.query_selector_all("td")
-                if len(cells) >= 4:
-                    vehicles.append(
-                        VehicleData.from_table_row(
-                            {
-                                "vin": cells[0].inner_text().strip(),
-                                "unit_number": cells[1].inner_text().strip(),
-                                "year_make_model": cells[2].inner_text().strip(),
-                                "status": cells[3].inner_text().strip(),
-                            }
-                        )
-                    )
-
-        # Try card/list format
         if not vehicles:
-            cards = self.page.query_selector_all(".asset-card, .vehicle-card")
-            for card in cards:
-                vin_el = card.query_selector(".vin, [data-vin]")
-                unit_el = card.query_selector(".unit-number, .unit")
-                ymm_el = card.query_selector(".year-make-model, .vehicle-info")
-                status_el = card.query_selector(".status")
+            try:
+                self.page.wait_for_selector(
+                    "table tbody tr, .asset-list, .vehicle-list, .no-data",
+                    timeout=30000,
+                )
+            except Exception:
+                # Check if redirected to login
+                if "/login" in self.page.url:
+                    raise SessionExpired("Session expired")
+                raise ExtractionError(self.page.url, "Timeout waiting for vehicle list")
+
+            # Try table format first, then card/list format
+            for layout_name, (_, extractor) in self.VEHICLE_LAYOUTS.items():
+                vehicles = getattr(self, extractor)()
+                if vehicles:
+                    if self.layout:
+                        self.layout.remember("vehicles_layout", layout_name)
+                    break
 
+        print(f"  Found {len(vehicles)} vehicles")
+        return vehicles
+
+    def _extract_vehicle_table(self) -> list[VehicleData]:
+        """Extract vehicles from the table layout."""
+        vehicles = []
+        for row in self.page.query_selector_all("table tbody tr"):
+            cells = row.query_selector_all("td")
+            if len(cells) >= 4:
                 vehicles.append(
                     VehicleData.from_table_row(
                         {
-                            "vin": vin_el.inner_text().strip() if vin_el else "",
-                            "unit_number": unit_el.inner_text().strip() if unit_el else "",
-                            "year_make_model": ymm_el.inner_text().strip() if ymm_el else "",
-                            "status": status_el.inner_text().strip() if status_el else "",
+                            "vin": cells[0].inner_text().strip(),
+                            "unit_number": cells[1].inner_text().strip(),
+                            "year_make_model": cells[2].inner_text().strip(),
+                            "status": cells[3].inner_text().strip(),
                         }
                     )
                 )
+        return vehicles
 
-        print(f"  Found {len(vehicles)} vehicles")
+    def _extract_vehicle_cards(self) -> list[VehicleData]:
+        """Extract vehicles from the card/list layout."""
+        vehicles = []
+        for card in self.page.query_selector_all(".asset-card, .vehicle-card"):
+            vin_el = card.query_selector(".vin, [data-vin]")
+            unit_el = card.query_selector(".unit-number, .unit")
+            ymm_el = card.query_selector(".year-make-model, .vehicle-info")
+            status_el = card.query_selector(".status")
+
+            vehicles.append(
+                VehicleData.from_table_row(
+                    {
+                        "vin": vin_el.inner_text().strip() if vin_el else "",
+                        "unit_number": unit_el.inner_text().strip() if unit_el else "",
+                        "year_make_model": ymm_el.inner_text().strip() if ymm_el else "",
+                        "status": status_el.inner_text().strip() if status_el else "",
+                    }
+                )
+            )
         return vehicles
 
     def get_faults(self, vin: str) -> list[FaultCodeData]:
         """
         Extract fault codes for a specific vehicle.
 
+        With a cached fault row selector, only that selector is waited for
+        and queried. If the page shows neither rows nor a "no faults"
+        message, the cache entry is dropped and the full probe runs.
+
         Args:
             vin: Vehicle VIN.
 
@@ -375,7 +641,71 @@ class TruckTechPlusScraper:
         if not self.page:
             raise SessionExpired("Not logged in")
 
-        self.page.goto(f"{self.BASE_URL}/assets/{vin}/diagnostics")
+        self._goto(f"{self.BASE_URL}/assets/{vin}/diagnostics")
+        return self._extract_faults(vin)
+
+    def get_diagnostics(self, vehicle: VehicleData) -> VehicleData:
+        """
+        Fetch faults and vehicle details in a single diagnostics page visit.
+
+        Besides faults, fills odometer, engine hours, engine make/model and
+        last location from whatever the page shows, using one DOM query.
+        Time spent on the details is added to `enrichment_seconds`.
+
+        Args:
+            vehicle: Vehicle to update in place.
+
+        Returns:
+            The same vehicle, with faults and details filled.
+        """
+        if not self.page:
+            raise SessionExpired("Not logged in")
+
+        started = time.monotonic()
+        governor_wait = self.governor.wait_seconds
+        self._goto(f"{self.BASE_URL}/assets/{vehicle.vin}/diagnostics")
+        navigated = time.monotonic()
+        vehicle.faults = self._extract_faults(vehicle.vin)
+
+        extracted = time.monotonic()
+        try:
+            vehicle.apply_details(self.page.evaluate(self.DETAILS_SCRIPT))
+        except Exception as e:
+            print(f"  Could not read details for {vehicle.vin}: {e}")
+        finished = time.monotonic()
+        self.enrichment_seconds += finished - extracted
+
+        queued = self.governor.wait_seconds - governor_wait
+        self.diagnostics_timings = {
+            "rate_limit_wait": queued,
+            "navigate": navigated - started - queued,
+            "faults": extracted - navigated,
+            "details": finished - extracted,
+        }
+        return vehicle
+
+    @property
+    def tracing(self):
+        """Playwright Tracing of the current browser context, or None before login."""
+        return self.context.tracing if self.context else None
+
+    def _extract_faults(self, vin: str) -> list[FaultCodeData]:
+        """Extract fault codes from the loaded diagnostics page."""
+        cached_selector = self.layout.get("faults_selector") if self.layout else None
+        if cached_selector:
+            try:
+                self.page.wait_for_selector(
+                    f"{cached_selector}, .no-faults, .no-data", timeout=30000
+                )
+                if self._has_no_faults_message():
+                    return []
+                rows = self.page.query_selector_all(cached_selector)
+                if rows:
+                    return self._parse_fault_rows(vin, rows)
+            except Exception:
+                if "/login" in self.page.url:
+                    raise SessionExpired("Session expired")
+            self.layout.invalidate("faults_selector")
 
         try:
             self.page.wait_for_selector(
@@ -388,113 +718,220 @@ class TruckTechPlusScraper:
             # No faults or page structure unknown
             return []
 
-        faults = []
-
         # Check for "no faults" message
-        no_faults = self.page.query_selector(".no-faults, .no-data")
-        if no_faults and "no" in no_faults.inner_text().lower():
+        if self._has_no_faults_message():
             return []
 
         # Extract from table or list
-        rows = self.page.query_selector_all(
-            ".fault-row, .dtc-row, table tbody tr, .fault-item"
-        )
+        for selector in self.FAULT_ROW_SELECTORS:
+            rows = self.page.query_selector_all(selector)
+            if rows:
+                if self.layout:
+                    self.layout.remember("faults_selector", selector)
+                return self._parse_fault_rows(vin, rows)
 
-        for row in rows:
-            raw_text = row.inner_text()
-
-            # Parse SPN/FMI from text
-            # Patterns: "SPN 123 FMI 4", "SPN:123 FMI:4", "123/4"
-            match = re.search(
-                r"SPN[:\s]*(\d+).*?FMI[:\s]*(\d+)",
-                raw_text,
-                re.IGNORECASE,
-            )
-            if not match:
-                # Try alternate format: "123/4"
-                match = re.search(r"(\d{3,5})/(\d{1,2})", raw_text)
-
-            if match:
-                spn = int(match.group(1))
-                fmi = int(match.group(2))
-
-                # Determine if active
-                is_active = True
-                row_class = row.get_attribute("class") or ""
-                if "inactive" in row_class.lower() or "historical" in row_class.lower():
-                    is_active = False
-
-                # Try to get severity
-                severity = "unknown"
-                if "critical" in row_class.lower() or "red" in row_class.lower():
-                    severity = "critical"
-                elif "warning" in row_class.lower() or "yellow" in row_class.lower():
-                    severity = "major"
-                elif "info" in row_class.lower() or "blue" in row_class.lower():
-                    severity = "minor"
-
-                faults.append(
-                    FaultCodeData(
-                        vin=vin,
-                        spn=spn,
-                        fmi=fmi,
-                        is_active=is_active,
-                        severity=severity,
-                        description=raw_text[:500],  # Truncate long descriptions
-                        raw_text=raw_text,
-                    )
-                )
+        return []
+
+    def _has_no_faults_message(self) -> bool:
+        """Check for the portal's "no faults" message."""
+        no_faults = self.page.query_selector(".no-faults, .no-data")
+        return bool(no_faults and "no" in no_faults.inner_text().lower())
 
+    def _parse_fault_rows(self, vin: str, rows: list) -> list[FaultCodeData]:
+        """Parse fault rows into FaultCodeData objects."""
+        faults = []
+        for row in rows:
+            fault = self._parse_fault_text(vin, row.inner_text(), row.get_attribute("class") or "")
+            if fault:
+                faults.append(fault)
         return faults
 
-    def export_all_data(self, tenant_id: str = "default") -> SyncResult:
+    @staticmethod
+    def _parse_fault_text(vin: str, raw_text: str, row_class: str = "") -> Optional[FaultCodeData]:
+        """Parse one fault row's text and CSS class, or None if it has no SPN/FMI."""
+        # Parse SPN/FMI from text
+        # Patterns: "SPN 123 FMI 4", "SPN:123 FMI:4", "123/4"
+        match = re.search(
+            r"SPN[:\s]*(\d+).*?FMI[:\s]*(\d+)",
+            raw_text,
+            re.IGNORECASE,
+        )
+        if not match:
+            # Try alternate format: "123/4"
+            match = re.search(r"(\d{3,5})/(\d{1,2})", raw_text)
+        if not match:
+            return None
+
+        spn = int(match.group(1))
+        fmi = int(match.group(2))
+
+        # Determine if active
+        row_class = row_class.lower()
+        is_active = not ("inactive" in row_class or "historical" in row_class)
+
+        # Try to get severity
+        severity = "unknown"
+        if "critical" in row_class or "red" in row_class:
+            severity = "critical"
+        elif "warning" in row_class or "yellow" in row_class:
+            severity = "major"
+        elif "info" in row_class or "blue" in row_class:
+            severity = "minor"
+
+        return FaultCodeData(
+            vin=vin,
+            spn=spn,
+            fmi=fmi,
+            is_active=is_active,
+            severity=severity,
+            description=raw_text[:500],  # Truncate long descriptions
+            raw_text=raw_text,
+        )
+
+    def sweep_faults(self, vehicles: list[VehicleData]) -> tuple[dict[str, list[FaultCodeData]], int]:
         """
-        Export all vehicle and fault data.
+        Collect faults for many VINs from a fleet-level source in a few requests.
+
+        Tries the portal's JSON fault feeds, then its fleet fault report
+        pages, and caches whichever works in the layout cache. Rows are
+        mapped back to VINs. Only if pagination proves the source was read
+        to the end is every VIN of the fleet covered (VINs without rows have
+        no faults); otherwise only VINs whose rows were all read are, and
+        the rest are fetched per VIN.
 
         Args:
-            tenant_id: Identifier for this sync operation.
+            vehicles: The fleet.
 
         Returns:
-            SyncResult with all extracted data.
+            (faults per covered VIN, number of requests made). VINs missing
+            from the mapping must be fetched per VIN.
         """
-        result = SyncResult(tenant_id=tenant_id, started_at=datetime.now())
-
-        try:
-            vehicles = self.get_vehicles()
-            result.vehicles_found = len(vehicles)
+        fleet_vins = {v.vin for v in vehicles}
+        cached = self.layout.get("fleet_faults_source") if self.layout else None
+        sources = [f"feed:{path}" for path in self.FLEET_FAULT_FEEDS]
+        sources += [f"page:{path}" for path in self.FLEET_FAULT_PAGES]
+        if cached in sources:
+            sources.remove(cached)
+            sources.insert(0, cached)
+
+        requests = 0
+        for source in sources:
+            kind, path = source.split(":", 1)
+            sweep = self._sweep_feed if kind == "feed" else self._sweep_pages
+            try:
+                found, complete, last_vin, made = sweep(path, fleet_vins)
+            except (SessionExpired, RateLimited):
+                raise
+            except Exception as e:
+                print(f"  Fleet fault source {path} failed: {e}")
+                continue
+            requests += made
+
+            if found is None:
+                if source == cached:
+                    self.layout.invalidate("fleet_faults_source")
+                continue
+            if self.layout:
+                self.layout.remember("fleet_faults_source", source)
+
+            if complete:
+                return {vin: found.get(vin, []) for vin in fleet_vins}, requests
+            # The last VIN's rows may continue on the page that wasn't read
+            found.pop(last_vin, None)
+            return found, requests
+
+        print("  No fleet-level fault source available, fetching per VIN")
+        return {}, requests
+
+    def _sweep_feed(self, path: str, fleet_vins: set[str]) -> tuple:
+        """
+        Page through a JSON fault feed (see sweep_fault_feed()).
 
-            for vehicle in vehicles:
-                try:
-                    vehicle.faults = self.get_faults(vehicle.vin)
-                    result.faults_found += len(vehicle.faults)
-                    result.critical_faults += sum(
-                        1 for f in vehicle.faults if f.is_critical
-                    )
-                except Exception as e:
-                    result.errors.append(f"Failed to get faults for {vehicle.vin}: {e}")
+        Returns:
+            (faults by VIN or None if the feed doesn't exist, complete, last VIN, requests).
+        """
+        return sweep_fault_feed(
+            self._fetch,
+            f"{self.BASE_URL}{path}",
+            fleet_vins,
+            page_size=self.FLEET_PAGE_SIZE,
+            max_pages=self.MAX_FLEET_PAGES,
+        )
 
-            result.success = True
+    def _sweep_pages(self, path: str, fleet_vins: set[str]) -> tuple:
+        """
+        Page through a fleet fault report view in the browser.
 
-        except Exception as e:
-            result.errors.append(f"Sync failed: {e}")
-            result.success = False
+        The view only counts as read to the end on an empty page or a
+        disabled "next" control. Without either, the next page number is
+        tried; a page showing the same rows as the previous one ends the
+        sweep as incomplete.
 
-        result.completed_at = datetime.now()
+        Returns:
+            (faults by VIN or None if the view doesn't exist, complete, last VIN, requests).
+        """
+        found: dict[str, list[FaultCodeData]] = {}
+        last_vin = None
+        requests = 0
+        previous = None
+
+        for page_number in range(1, self.MAX_FLEET_PAGES + 1):
+            response = self._goto(
+                f"{self.BASE_URL}{path}?page={page_number}&per_page={self.FLEET_PAGE_SIZE}"
+            )
+            requests += 1
+            if "/login" in self.page.url:
+                raise SessionExpired("Session expired")
+            if response is not None and not response.ok:
+                if page_number == 1:
+                    return None, False, None, requests
+                return found, False, last_vin, requests
 
-        # Log summary
-        print(f"\nSync completed in {result.duration_seconds:.1f}s")
-        print(f"  Vehicles: {result.vehicles_found}")
-        print(f"  Faults: {result.faults_found} ({result.critical_faults} critical)")
-        if result.errors:
-            print(f"  Errors: {len(result.errors)}")
+            try:
+                self.page.wait_for_selector(
+                    "table tbody tr, .fault-row, .dtc-row, .no-faults, .no-data", timeout=15000
+                )
+            except Exception:
+                if page_number == 1:
+                    return None, False, None, requests
+                return found, False, last_vin, requests
+
+            rows = self.page.evaluate(self.FLEET_ROWS_SCRIPT)
+            if not rows:
+                return found, True, last_vin, requests
+            if rows == previous:
+                return found, False, last_vin, requests
+            previous = rows
+            matched = 0
+            for row in rows:
+                vin_match = VIN_PATTERN.search(row["text"].upper())
+                if not vin_match:
+                    continue
+                matched += 1
+                vin = vin_match.group(0)
+                fault = self._parse_fault_text(vin, row["text"], row["cls"])
+                if fault and vin in fleet_vins:
+                    found.setdefault(vin, []).append(fault)
+                    last_vin = vin
+
+            # Rows without VINs: this is not a fleet-level view
+            if page_number == 1 and rows and not matched:
+                return None, False, None, requests
+
+            is_last = self.page.query_selector(
+                ".pagination .next.disabled, .pagination-next.disabled, "
+                "a[rel='next'][aria-disabled='true']"
+            )
+            if is_last:
+                return found, True, last_vin, requests
 
-        return result
+        return found, False, last_vin, requests
 
     def close(self):
         """Clean up browser resources."""
         if self.context:
             self.context.close()
-        if self.browser:
+        if self.browser and self._owns_browser:
             self.browser.close()
         if self._playwright:
             self._playwright.stop()
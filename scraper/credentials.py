@@ -1,10 +1,21 @@
 """Secure credential storage and retrieval."""
 
+import json
 import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
-from cryptography.fernet import Fernet
+
+def _keys_from_env() -> list[str]:
+    """Read encryption keys, newest first, from ENCRYPTION_KEYS or ENCRYPTION_KEY."""
+    keys = os.getenv("ENCRYPTION_KEYS")
+    if keys:
+        return [k.strip() for k in keys.split(",") if k.strip()]
+    key = os.getenv("ENCRYPTION_KEY")
+    return [key] if key else []
 
 
 class CredentialStore:
@@ -14,30 +25,41 @@ class CredentialStore:
     Credentials are encrypted at rest using Fernet symmetric encryption.
     The encryption key should be stored in ENCRYPTION_KEY env variable.
 
+    For key rotation, set ENCRYPTION_KEYS to a comma-separated list, newest
+    first: values are encrypted with the first key and decrypted with any of
+    them (MultiFernet), so old ciphertexts keep working until rotated.
+
     Usage:
         store = CredentialStore()
         encrypted = store.encrypt("my_password")
         decrypted = store.decrypt(encrypted)
     """
 
-    def __init__(self, key: Optional[str] = None):
+    def __init__(self, key: Optional[str] = None, keys: Optional[list[str]] = None):
         """
         Initialize credential store.
 
         Args:
             key: Fernet encryption key. If not provided, reads from
                  ENCRYPTION_KEY environment variable.
+            keys: Several Fernet keys, newest first. If neither key nor keys
+                  is provided, reads ENCRYPTION_KEYS, then ENCRYPTION_KEY.
 
         Raises:
             ValueError: If no encryption key is available.
         """
-        key = key or os.getenv("ENCRYPTION_KEY")
-        if not key:
+        if not keys:
+            keys = [key] if key else _keys_from_env()
+        if not keys:
             raise ValueError(
                 "ENCRYPTION_KEY not set. Generate one with: "
                 "python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'"
             )
-        self.fernet = Fernet(key.encode() if isinstance(key, str) else key)
+        from cryptography.fernet import Fernet, MultiFernet
+
+        self.fernet = MultiFernet(
+            [Fernet(k.encode() if isinstance(k, str) else k) for k in keys]
+        )
 
     def encrypt(self, value: str) -> str:
         """
@@ -63,6 +85,30 @@ class CredentialStore:
         """
         return self.fernet.decrypt(encrypted.encode()).decode()
 
+    def decrypt_many(self, encrypted: list[str]) -> list[bytearray]:
+        """
+        Decrypt several values in one pass.
+
+        Args:
+            encrypted: Base64-encoded encrypted strings.
+
+        Returns:
+            Plain values as mutable buffers, so callers can wipe them.
+        """
+        return [bytearray(self.fernet.decrypt(value.encode())) for value in encrypted]
+
+    def rotate(self, encrypted: str) -> str:
+        """
+        Re-encrypt a value with the newest key.
+
+        Args:
+            encrypted: Value encrypted with any configured key.
+
+        Returns:
+            Value encrypted with the first (newest) key.
+        """
+        return self.fernet.rotate(encrypted.encode()).decode()
+
     @staticmethod
     def generate_key() -> str:
         """
@@ -71,6 +117,8 @@ class CredentialStore:
         Returns:
             Base64-encoded key string.
         """
+        from cryptography.fernet import Fernet
+
         return Fernet.generate_key().decode()
 
 
@@ -143,13 +191,259 @@ class FileCredentials:
         self.file_path.chmod(0o600)
 
 
-def get_credentials() -> tuple[str, str, Optional[str]]:
+@dataclass
+class TenantCredentials:
+    """Decrypted credentials for one tenant."""
+
+    tenant_id: str
+    username: str
+    password: str
+    totp_secret: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"TenantCredentials(tenant_id={self.tenant_id!r}, username={self.username!r}, has_totp={bool(self.totp_secret)})"
+
+
+class SecretCache:
+    """
+    Thread-safe, TTL-bounded cache of decrypted secrets.
+
+    Secrets are held as bytearrays and overwritten with zeros when they
+    expire, are replaced or the cache is cleared. Strings handed out by
+    get() are copies Python cannot wipe, so callers should not keep them
+    longer than needed.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """
+        Initialize cache.
+
+        Args:
+            ttl: Seconds a decrypted secret stays in memory.
+        """
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, dict[str, Optional[bytearray]]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _zeroize(secrets: dict[str, Optional[bytearray]]):
+        for value in secrets.values():
+            if value is not None:
+                value[:] = bytes(len(value))
+
+    def put(self, key: str, secrets: dict[str, Optional[bytearray]]):
+        """Store secrets for a key, wiping any previous entry."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._zeroize(previous[1])
+            self._entries[key] = (time.monotonic() + self.ttl, secrets)
+
+    def get(self, key: str) -> Optional[dict[str, Optional[str]]]:
+        """Get decoded secrets for a key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, secrets = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._zeroize(secrets)
+                return None
+            return {
+                name: value.decode() if value is not None else None
+                for name, value in secrets.items()
+            }
+
+    def evict(self, key: str):
+        """Wipe and drop one entry."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._zeroize(entry[1])
+
+    def evict_expired(self):
+        """Wipe and drop every expired entry."""
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._entries.items() if now >= expires_at]:
+                self._zeroize(self._entries.pop(key)[1])
+
+    def clear(self):
+        """Wipe and drop every entry."""
+        with self._lock:
+            for _, secrets in self._entries.values():
+                self._zeroize(secrets)
+            self._entries.clear()
+
+
+class TenantCredentialRepository:
+    """
+    Encrypted credentials for every tenant, loaded and decrypted in one pass.
+
+    One repository (and its cache) is meant to be shared by all workers in a
+    process. A cache miss reloads the whole file, so a cycle over hundreds of
+    tenants reads and decrypts it at most once per TTL.
+
+    File format (password and totp_secret are Fernet tokens):
+    {
+        "tenants": {
+            "acme-trucking": {
+                "username": "...",
+                "password": "gAAAA...",
+                "totp_secret": "gAAAA..."  // Optional
+            }
+        }
+    }
+
+    Usage:
+        repo = TenantCredentialRepository()
+        creds = repo.get("acme-trucking")
+
+        # Or the process-wide repository for DEFAULT_FILE
+        creds = TenantCredentialRepository.shared().get("acme-trucking")
+    """
+
+    DEFAULT_FILE = Path("tenant_credentials.json")
+    _shared: Optional["TenantCredentialRepository"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        file_path: Optional[Path] = None,
+        store: Optional[CredentialStore] = None,
+        ttl: float = 300.0,
+    ):
+        """
+        Initialize repository.
+
+        Args:
+            file_path: Encrypted credentials file. Defaults to tenant_credentials.json.
+            store: Credential store. Defaults to keys from the environment.
+            ttl: Seconds decrypted secrets stay cached.
+        """
+        self.file_path = Path(file_path or self.DEFAULT_FILE)
+        self.store = store or CredentialStore()
+        self.cache = SecretCache(ttl=ttl)
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "TenantCredentialRepository":
+        """Get the process-wide repository for DEFAULT_FILE, creating it on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _read(self) -> dict:
+        if not self.file_path.exists():
+            return {}
+        with open(self.file_path) as f:
+            return json.load(f).get("tenants", {})
+
+    def _write(self, tenants: dict):
+        tmp_file = self.file_path.with_suffix(self.file_path.suffix + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"tenants": tenants}, f, indent=2)
+        tmp_file.chmod(0o600)
+        tmp_file.replace(self.file_path)
+
+    def load_all(self) -> list[str]:
+        """
+        Read and decrypt every tenant's credentials into the cache.
+
+        Returns:
+            Tenant IDs loaded.
+        """
+        with self._load_lock:
+            tenants = self._read()
+
+            # Decrypt all tokens with a single MultiFernet in one pass
+            tokens = []
+            for entry in tenants.values():
+                tokens.append(entry["password"])
+                if entry.get("totp_secret"):
+                    tokens.append(entry["totp_secret"])
+            plain = iter(self.store.decrypt_many(tokens))
+
+            for tenant_id, entry in tenants.items():
+                self.cache.put(
+                    tenant_id,
+                    {
+                        "username": bytearray(entry["username"].encode()),
+                        "password": next(plain),
+                        "totp_secret": next(plain) if entry.get("totp_secret") else None,
+                    },
+                )
+            return list(tenants)
+
+    def get(self, tenant_id: str) -> TenantCredentials:
+        """
+        Get decrypted credentials for a tenant.
+
+        Args:
+            tenant_id: Tenant identifier.
+
+        Returns:
+            TenantCredentials.
+
+        Raises:
+            KeyError: If the tenant has no stored credentials.
+        """
+        secrets = self.cache.get(tenant_id)
+        if secrets is None:
+            self.load_all()
+            secrets = self.cache.get(tenant_id)
+        if secrets is None:
+            raise KeyError(f"No stored credentials for tenant {tenant_id!r}")
+        return TenantCredentials(tenant_id=tenant_id, **secrets)
+
+    def tenant_ids(self) -> list[str]:
+        """List tenants in the file without decrypting anything."""
+        return list(self._read())
+
+    def save(self, tenant_id: str, username: str, password: str, totp_secret: Optional[str] = None):
+        """Encrypt and store credentials for a tenant."""
+        with self._load_lock:
+            tenants = self._read()
+            tenants[tenant_id] = {
+                "username": username,
+                "password": self.store.encrypt(password),
+                "totp_secret": self.store.encrypt(totp_secret) if totp_secret else None,
+            }
+            self._write(tenants)
+        self.cache.evict(tenant_id)
+
+    def rotate(self) -> int:
+        """
+        Re-encrypt every stored value with the newest key.
+
+        Once this has run, the old keys can be removed from ENCRYPTION_KEYS.
+
+        Returns:
+            Number of tenants rotated.
+        """
+        with self._load_lock:
+            tenants = self._read()
+            for entry in tenants.values():
+                entry["password"] = self.store.rotate(entry["password"])
+                if entry.get("totp_secret"):
+                    entry["totp_secret"] = self.store.rotate(entry["totp_secret"])
+            self._write(tenants)
+        return len(tenants)
+
+
+def get_credentials(tenant_id: Optional[str] = None) -> tuple[str, str, Optional[str]]:
     """
     Get credentials from available sources.
 
     Checks in order:
     1. Environment variables
     2. Credentials file
+    3. Encrypted tenant credentials file (only when tenant_id is given)
+
+    Args:
+        tenant_id: Optional tenant to look up in tenant_credentials.json.
 
     Returns:
         Tuple of (username, password, totp_secret or None)
@@ -167,6 +461,14 @@ def get_credentials() -> tuple[str, str, Optional[str]]:
     if file_creds.validate():
         return file_creds.username, file_creds.password, file_creds.totp_secret
 
+    # Try encrypted per-tenant file
+    if tenant_id and TenantCredentialRepository.DEFAULT_FILE.exists():
+        try:
+            creds = TenantCredentialRepository.shared().get(tenant_id)
+            return creds.username, creds.password, creds.totp_secret
+        except KeyError:
+            pass
+
     raise ValueError(
         "No credentials found. Set TRUCKTECH_USERNAME and TRUCKTECH_PASSWORD "
         "environment variables, or create .trucktech_credentials.json file."
@@ -0,0 +1,563 @@
+"""
+Long-running sync daemon.
+
+Keeps one Chromium instance and a logged-in context per tenant warm between
+cycles, so a steady-state cycle only pays for the data fetch itself. Tenants
+with Decisiv API credentials are synced through the API client instead and
+never start the browser.
+"""
+
+import heapq
+import json
+import os
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from .credentials import TenantCredentialRepository
+from .errors import LoginError, SessionExpired
+from .events import FaultEventStream
+from .health import HealthScorer
+from .layout import LayoutCache
+from .ledger import SyncLedger
+from .memory import MemoryWatchdog
+from .models import SyncResult
+from .scheduler import SyncScheduler
+from .serialization import write_result
+from .snapshot import publish_snapshot
+from .sources import DataSource
+
+
+@dataclass
+class TenantConfig:
+    """
+    Credentials and schedule for one tenant.
+
+    Tenants from the encrypted credential repository keep only their ID and a
+    reference to the repository; their credentials are fetched from its cache
+    at login time (see login_credentials()).
+    """
+
+    tenant_id: str
+    username: str = ""
+    password: str = ""
+    totp_secret: Optional[str] = None
+    interval: float = 900.0  # seconds between cycle starts
+    jitter: float = 60.0  # +/- seconds added to each interval
+    api_client_id: Optional[str] = None  # Decisiv API credentials; skip the browser when set
+    api_client_secret: Optional[str] = None
+    repository: Optional[TenantCredentialRepository] = None  # portal credentials live here when set
+
+    @property
+    def uses_api(self) -> bool:
+        """Whether this tenant is synced through the Decisiv API."""
+        return bool(self.api_client_id and self.api_client_secret)
+
+    def login_credentials(self) -> tuple[str, str, Optional[str]]:
+        """
+        Get portal credentials for a login.
+
+        Returns:
+            (username, password, totp_secret), from the repository's cache if
+            the tenant has one.
+
+        Raises:
+            KeyError: If the repository has no credentials for the tenant.
+        """
+        if self.repository is None:
+            return self.username, self.password, self.totp_secret
+        creds = self.repository.get(self.tenant_id)
+        return creds.username, creds.password, creds.totp_secret
+
+    def scraper_options(self) -> dict:
+        """Keyword arguments that give a portal scraper this tenant's credentials."""
+        if self.repository is None:
+            return {"username": self.username, "password": self.password, "totp_secret": self.totp_secret}
+        return {"username": "", "password": "", "credentials_source": self.login_credentials}
+
+
+def _session_suspect(result: SyncResult) -> bool:
+    """
+    Whether a cycle's result points at a broken session.
+
+    That is the case if the sync failed as a whole, the session expired or a
+    login failed along the way, or no VIN synced although some were tried.
+    Errors on single VINs alone don't count.
+    """
+    if not result.success:
+        return True
+    if result.error_classes.get(SessionExpired.__name__) or result.error_classes.get(LoginError.__name__):
+        return True
+    attempted = result.vehicles_found - result.vehicles_skipped
+    return attempted > 0 and result.vehicles_synced == 0
+
+
+@dataclass
+class TenantStatus:
+    """Runtime status of one tenant, reported by the health endpoint."""
+
+    tenant_id: str
+    next_run: Optional[datetime] = None
+    last_started: Optional[datetime] = None
+    last_completed: Optional[datetime] = None
+    last_success: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+    rate_limit_wait_seconds: float = 0.0  # total time spent waiting on the rate governor
+    runs: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {
+            "tenant_id": self.tenant_id,
+            "next_run": iso(self.next_run),
+            "last_started": iso(self.last_started),
+            "last_completed": iso(self.last_completed),
+            "last_success": iso(self.last_success),
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 1),
+            "runs": self.runs,
+            "failures": self.failures,
+        }
+
+
+def load_tenants(file_path: Path) -> list[TenantConfig]:
+    """
+    Load tenant configuration from a JSON file.
+
+    File format:
+    [
+        {
+            "tenant_id": "acme-trucking",
+            "username": "...",
+            "password": "...",
+            "totp_secret": "...",  // Optional
+            "interval": 900,       // Optional, seconds
+            "jitter": 60,          // Optional, seconds
+            "api_client_id": "...",     // Optional, sync through the Decisiv API
+            "api_client_secret": "..."  // (username/password not needed then)
+        }
+    ]
+
+    Args:
+        file_path: Path to the tenants file.
+
+    Returns:
+        List of TenantConfig objects.
+
+    Raises:
+        ValueError: If an entry is missing required fields.
+    """
+    with open(file_path) as f:
+        entries = json.load(f)
+
+    tenants = []
+    for entry in entries:
+        required = ["tenant_id"]
+        if not (entry.get("api_client_id") and entry.get("api_client_secret")):
+            required += ["username", "password"]
+        missing = [k for k in required if not entry.get(k)]
+        if missing:
+            raise ValueError(f"Tenant entry missing {', '.join(missing)}: {entry.get('tenant_id')}")
+        tenants.append(
+            TenantConfig(
+                tenant_id=entry["tenant_id"],
+                username=entry.get("username", ""),
+                password=entry.get("password", ""),
+                totp_secret=entry.get("totp_secret"),
+                interval=float(entry.get("interval", 900)),
+                jitter=float(entry.get("jitter", 60)),
+                api_client_id=entry.get("api_client_id"),
+                api_client_secret=entry.get("api_client_secret"),
+            )
+        )
+    return tenants
+
+
+def tenants_from_repository(
+    repo: TenantCredentialRepository,
+    interval: float = 900.0,
+    jitter: float = 60.0,
+) -> list[TenantConfig]:
+    """
+    Build tenant configuration from the encrypted credential repository.
+
+    Nothing is decrypted here: every tenant keeps a reference to the one
+    repository and gets its credentials from the repository's TTL-bounded
+    cache when it logs in.
+
+    Args:
+        repo: Tenant credential repository, shared by all tenants.
+        interval: Seconds between syncs for every tenant.
+        jitter: Random +/- seconds per interval.
+
+    Returns:
+        List of TenantConfig objects.
+    """
+    return [
+        TenantConfig(tenant_id=tenant_id, interval=interval, jitter=jitter, repository=repo)
+        for tenant_id in repo.tenant_ids()
+    ]
+
+
+class SyncDaemon:
+    """
+    Run each tenant's sync on its own interval in a single process.
+
+    All browser tenants share one browser; each tenant keeps its own context
+    and session file. API tenants keep their own pooled HTTP client, and
+    Playwright is only imported once a browser tenant needs it. Cycles run
+    sequentially on the main thread (Playwright's sync API is not
+    thread-safe); the health endpoint runs on a background thread.
+
+    Usage:
+        daemon = SyncDaemon(load_tenants(Path("tenants.json")))
+        daemon.run()  # Blocks until SIGTERM/SIGINT
+    """
+
+    def __init__(
+        self,
+        tenants: list[TenantConfig],
+        output_dir: Path = Path("."),
+        health_host: str = "127.0.0.1",
+        health_port: Optional[int] = 8765,
+        headless: Optional[bool] = None,
+        login_workers: int = 4,
+        history_dir: Optional[Path] = None,
+        sweep: bool = False,
+        memory_soft_mb: Optional[float] = None,
+        memory_hard_mb: Optional[float] = None,
+        memory_heap: bool = False,
+    ):
+        """
+        Initialize daemon.
+
+        Args:
+            tenants: Tenants to schedule.
+            output_dir: Directory for sync results, session and scheduler files.
+                        Dashboard snapshots are published to its "snapshots" subdirectory.
+            health_host: Interface for the health endpoint.
+            health_port: Port for the health endpoint, or None to disable it.
+            headless: Run browser in headless mode. Defaults to HEADLESS env var or True.
+            login_workers: Parallel logins used to warm sessions at startup, 0 to disable.
+            history_dir: Fault history directory to append every result to, or None.
+            sweep: Collect faults with the fleet-level sweep each cycle.
+            memory_soft_mb: Recycle a tenant's browser context above this total RSS.
+            memory_hard_mb: Stop a cycle with a partial result above this total RSS.
+            memory_heap: Trace the Python heap with tracemalloc and report its peak.
+        """
+        if not tenants:
+            raise ValueError("No tenants configured")
+
+        self.tenants = {t.tenant_id: t for t in tenants}
+        self.output_dir = Path(output_dir)
+        self.snapshot_dir = self.output_dir / "snapshots"
+        self.health_host = health_host
+        self.health_port = health_port
+        self.headless = headless
+        self.login_workers = login_workers
+        self.history_dir = Path(history_dir) if history_dir else None
+        self.sweep = sweep
+        self.memory_soft_mb = memory_soft_mb
+        self.memory_hard_mb = memory_hard_mb
+        self.memory_heap = memory_heap
+
+        self.status = {t.tenant_id: TenantStatus(t.tenant_id) for t in tenants}
+        self.started_at: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._scrapers: dict[str, DataSource] = {}
+        self._schedulers: dict[str, SyncScheduler] = {}
+        self._event_streams: dict[str, FaultEventStream] = {}
+        self._health: dict[str, HealthScorer] = {}
+        self._layout_cache = LayoutCache(self.output_dir / LayoutCache.DEFAULT_FILE.name)
+        self._ledger: Optional[SyncLedger] = None
+        self._playwright = None
+        self._browser = None
+        self._health_server: Optional[ThreadingHTTPServer] = None
+
+    def stop(self, *_):
+        """Request a graceful shutdown (also the SIGTERM/SIGINT handler)."""
+        if not self._stop.is_set():
+            print("Shutdown requested, finishing current vehicle...")
+        self._stop.set()
+
+    def run(self):
+        """Run until stop() is called or SIGTERM/SIGINT is received."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.started_at = datetime.now()
+        self._ledger = SyncLedger.for_directory(self.output_dir)
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        self._start_health_server()
+        self._warm_sessions()
+
+        # Spread first runs across the jitter window so tenants don't start together
+        queue = []
+        now = time.time()
+        for tenant in self.tenants.values():
+            due = now + random.uniform(0, tenant.jitter)
+            heapq.heappush(queue, (due, tenant.tenant_id))
+            self._set_next_run(tenant.tenant_id, due)
+
+        print(f"Sync daemon started with {len(self.tenants)} tenant(s)")
+
+        try:
+            while not self._stop.is_set():
+                due, tenant_id = queue[0]
+                if self._stop.wait(max(0.0, due - time.time())):
+                    break
+
+                heapq.heappop(queue)
+                tenant = self.tenants[tenant_id]
+                cycle_start = time.time()
+                self._run_cycle(tenant)
+
+                delay = tenant.interval + random.uniform(-tenant.jitter, tenant.jitter)
+                due = max(cycle_start + delay, time.time() + 1.0)
+                heapq.heappush(queue, (due, tenant_id))
+                self._set_next_run(tenant_id, due)
+        finally:
+            self._shutdown()
+
+        print("Sync daemon stopped")
+
+    def _warm_sessions(self):
+        """Log all browser tenants in in parallel so first cycles reuse fresh sessions."""
+        tenants = [t for t in self.tenants.values() if not t.uses_api]
+        if self.login_workers <= 0 or len(tenants) < 2:
+            return
+
+        from .login_pipeline import LoginPipeline
+
+        print(f"Warming sessions for {len(tenants)} tenants...")
+        pipeline = LoginPipeline(
+            max_workers=self.login_workers,
+            session_dir=self.output_dir,
+            headless=self.headless,
+            layout_cache=self._layout_cache,
+        )
+        for outcome in pipeline.run(tenants):
+            if not outcome.success:
+                print(f"  [{outcome.tenant_id}] Login failed: {outcome.error}")
+
+    def _set_next_run(self, tenant_id: str, timestamp: float):
+        with self._lock:
+            self.status[tenant_id].next_run = datetime.fromtimestamp(timestamp)
+
+    def _start_browser(self):
+        """Launch the shared browser once."""
+        if self._browser:
+            return
+
+        from playwright.sync_api import sync_playwright
+
+        headless = self.headless
+        if headless is None:
+            headless = os.getenv("HEADLESS", "true").lower() == "true"
+
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=headless)
+
+    def _scraper_for(self, tenant: TenantConfig) -> DataSource:
+        """Get the warm scraper (or API client) for a tenant, creating it on first use."""
+        scraper = self._scrapers.get(tenant.tenant_id)
+        if scraper is None:
+            if tenant.uses_api:
+                from .decisiv_api import DecisivAPIClient
+
+                scraper = DecisivAPIClient(tenant.api_client_id, tenant.api_client_secret)
+            else:
+                from .client import TruckTechPlusScraper
+
+                self._start_browser()
+                scraper = TruckTechPlusScraper(
+                    **tenant.scraper_options(),
+                    session_file=self.output_dir / f"session_{tenant.tenant_id}.json",
+                    browser=self._browser,
+                    layout=self._layout_cache.for_tenant(tenant.tenant_id),
+                )
+            self._scrapers[tenant.tenant_id] = scraper
+            self._schedulers[tenant.tenant_id] = SyncScheduler.for_tenant(
+                tenant.tenant_id, self.output_dir
+            )
+            self._event_streams[tenant.tenant_id] = FaultEventStream.for_tenant(
+                tenant.tenant_id, self.output_dir
+            )
+            self._health[tenant.tenant_id] = HealthScorer()
+        return scraper
+
+    def _append_history(self, result):
+        """Add a result to the fault history, compacting finished days."""
+        from .history import HistoryStore
+
+        try:
+            store = HistoryStore(self.history_dir)
+            store.append(result)
+            store.compact(result.tenant_id)
+        except Exception as e:
+            print(f"[{result.tenant_id}] Could not append history: {e}")
+
+    def _record_run(self, result: SyncResult):
+        """Add a cycle's result to the sync ledger."""
+        try:
+            self._ledger.record(result)
+        except Exception as e:
+            print(f"[{result.tenant_id}] Could not record run in ledger: {e}")
+
+    def _publish_snapshot(self, result: SyncResult):
+        """Replace the tenant's dashboard snapshot with a cycle's result."""
+        try:
+            publish_snapshot(result, self.snapshot_dir)
+        except Exception as e:
+            print(f"[{result.tenant_id}] Could not publish snapshot: {e}")
+
+    def _run_cycle(self, tenant: TenantConfig):
+        """Run one sync for a tenant and record its outcome."""
+        status = self.status[tenant.tenant_id]
+        with self._lock:
+            status.last_started = datetime.now()
+            status.runs += 1
+
+        print(f"\n[{tenant.tenant_id}] Sync cycle {status.runs} - {status.last_started.isoformat()}")
+
+        error = None
+        success = False
+        result = None
+        try:
+            scraper = self._scraper_for(tenant)
+            scraper.ensure_logged_in()
+
+            # Never let one cycle run into the next one
+            result = scraper.export_all_data(
+                tenant_id=tenant.tenant_id,
+                deadline=datetime.now() + timedelta(seconds=tenant.interval),
+                scheduler=self._schedulers[tenant.tenant_id],
+                events=self._event_streams[tenant.tenant_id],
+                health=self._health[tenant.tenant_id],
+                stop_event=self._stop,
+                watchdog=MemoryWatchdog(
+                    soft_limit_mb=self.memory_soft_mb,
+                    hard_limit_mb=self.memory_hard_mb,
+                    trace_heap=self.memory_heap,
+                ),
+                # Without --sweep, each source decides (the API client always sweeps)
+                sweep=self.sweep or None,
+            )
+
+            write_result(result, self.output_dir / f"{tenant.tenant_id}_sync.json")
+            self._record_run(result)
+            if result.success:
+                self._publish_snapshot(result)
+            with self._lock:
+                status.rate_limit_wait_seconds += result.rate_limit_wait_seconds
+
+            if self.history_dir:
+                self._append_history(result)
+
+            # Per-VIN errors are recorded but keep the cycle and its session
+            error = result.errors[0] if result.errors else None
+            success = not _session_suspect(result)
+            if not success:
+                error = error or "Sync failed"
+                # Re-validate the session next cycle instead of trusting the warm page
+                scraper.reset_session()
+            else:
+                scraper.save_session()
+
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[{tenant.tenant_id}] Cycle failed: {error}")
+            failed = SyncResult(
+                tenant_id=tenant.tenant_id,
+                started_at=status.last_started,
+                completed_at=datetime.now(),
+            )
+            failed.add_error(error, e)
+            self._record_run(failed)
+            scraper = self._scrapers.get(tenant.tenant_id)
+            # A failure after the sync (e.g. writing the result) says nothing about the session
+            if scraper and (result is None or isinstance(e, (SessionExpired, LoginError))):
+                scraper.reset_session()
+
+        with self._lock:
+            status.last_completed = datetime.now()
+            status.last_duration = (status.last_completed - status.last_started).total_seconds()
+            status.last_error = error
+            if success:
+                status.last_success = status.last_completed
+            else:
+                status.failures += 1
+
+    def health(self) -> dict:
+        """Get daemon health as a JSON-serializable dictionary."""
+        with self._lock:
+            return {
+                "status": "stopping" if self._stop.is_set() else "ok",
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "tenants": [s.to_dict() for s in self.status.values()],
+            }
+
+    def _start_health_server(self):
+        """Serve GET /health on a background thread."""
+        if self.health_port is None:
+            return
+
+        daemon = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/health"):
+                    self.send_error(404)
+                    return
+                health = daemon.health()
+                body = json.dumps(health).encode()
+                self.send_response(200 if health["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._health_server = ThreadingHTTPServer((self.health_host, self.health_port), HealthHandler)
+        thread = threading.Thread(target=self._health_server.serve_forever, daemon=True)
+        thread.start()
+        print(f"Health endpoint: http://{self.health_host}:{self._health_server.server_port}/health")
+
+    def _shutdown(self):
+        """Close scrapers, the shared browser and the health endpoint."""
+        for scraper in self._scrapers.values():
+            try:
+                scraper.close()
+            except Exception as e:
+                print(f"  Error closing scraper: {e}")
+        self._scrapers.clear()
+
+        if self._browser:
+            self._browser.close()
+            self._browser = None
+        if self._playwright:
+            self._playwright.stop()
+            self._playwright = None
+
+        if self._health_server:
+            self._health_server.shutdown()
+            self._health_server.server_close()
+            self._health_server = None
@@ -0,0 +1,424 @@
+"""
+Decisiv SRM API backend.
+
+Tenants with API credentials are synced over HTTPS instead of through the
+portal, so no browser is started:
+
+    - one pooled requests.Session (keep-alive, pool sized to the workers)
+    - OAuth client-credentials tokens, refreshed before they expire
+    - server-side pagination (links.next, meta.total_pages or short pages)
+    - conditional GETs: the ETag/Last-Modified of recent pages is kept and
+      sent back, and a 304 reuses the cached body; the cache is an LRU
+      sized to the fleet
+    - per-asset fault requests run on a bounded thread pool, and every
+      request goes through the node-wide rate governor for the API host
+
+Requires requests, which is imported only when the client is created.
+
+Usage:
+    with DecisivAPIClient(client_id, client_secret) as source:
+        source.login()
+        result = source.export_all_data(tenant_id="acme-trucking")
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+from .errors import ExtractionError, LoginError, RateLimited, SessionExpired
+from .governor import RateGovernor
+from .models import FaultCodeData, VehicleData
+from .sources import DataSource
+
+
+DEFAULT_BASE_URL = "https://api.decisiv.net/v1"
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE = 10.0  # requests per second
+
+PAGE_SIZE = 100
+MAX_PAGES = 1000
+
+# Cached pages before the fleet size is known, and beyond one per asset
+MIN_CACHE_ENTRIES = 256
+
+# Refresh tokens this long before they expire
+TOKEN_MARGIN_SECONDS = 60.0
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (10, 60)
+
+
+def _requests():
+    """Import requests on first use."""
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+    except ImportError as e:
+        raise ImportError("The Decisiv API backend requires requests: pip install requests") from e
+    return requests, HTTPAdapter, Retry
+
+
+def _items(data) -> list:
+    """Records of a list response: a bare list, or under data/items/results."""
+    if isinstance(data, list):
+        return data
+    for key in ("data", "items", "results"):
+        if isinstance(data.get(key), list):
+            return data[key]
+    return []
+
+
+class DecisivAPIClient(DataSource):
+    """
+    Read vehicles and faults from the Decisiv SRM API.
+
+    Produces the same VehicleData/FaultCodeData as the portal scraper. Faults
+    for the whole fleet are fetched concurrently by sweep_faults(), which
+    export_all_data() runs by default for this source.
+    """
+
+    SWEEP_BY_DEFAULT = True
+
+    TOKEN_PATH = "/oauth/token"
+    ASSETS_PATH = "/assets"
+    ASSET_FAULTS_PATH = "/assets/{asset_id}/faults"
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        base_url: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        governor: Optional[RateGovernor] = None,
+        cache_entries: Optional[int] = None,
+    ):
+        """
+        Initialize client.
+
+        Args:
+            client_id: API client ID.
+            client_secret: API client secret.
+            base_url: API root. Defaults to DECISIV_API_URL env var or DEFAULT_BASE_URL.
+            max_workers: Concurrent fault requests (and pooled connections).
+            governor: Rate governor for API requests. Defaults to the
+                      node-wide governor for the API host, limited by the
+                      DECISIV_API_RATE_LIMIT env var.
+            cache_entries: Pages kept for conditional requests. Defaults to
+                           one per asset plus MIN_CACHE_ENTRIES, resized by
+                           each get_vehicles().
+        """
+        self.requests, HTTPAdapter, Retry = _requests()
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = (base_url or os.getenv("DECISIV_API_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.max_workers = max(1, max_workers)
+
+        if governor is None:
+            governor = RateGovernor.for_host(
+                urlparse(self.base_url).netloc,
+                rate=float(os.getenv("DECISIV_API_RATE_LIMIT", DEFAULT_RATE)),
+                max_concurrent=self.max_workers,
+            )
+        super().__init__(governor)
+
+        # 429s are left to the governor; only transient server errors are retried here
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retry)
+        self.session = self.requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = threading.RLock()
+
+        # URL -> (validators, body) for conditional requests, least recently used first
+        self._cache: OrderedDict[str, tuple[dict, object]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._fixed_cache_size = cache_entries is not None
+        self.cache_entries = cache_entries if cache_entries is not None else MIN_CACHE_ENTRIES
+
+        # VIN -> API asset ID, from the last get_vehicles()
+        self.asset_ids: dict[str, str] = {}
+
+        # Requests answered 304 by the server since the client was created
+        self.not_modified = 0
+
+    def _url(self, path: str) -> str:
+        return path if "://" in path else f"{self.base_url}{path}"
+
+    def login(self) -> bool:
+        """
+        Get an access token with the client credentials.
+
+        Returns:
+            True if a token was issued.
+
+        Raises:
+            LoginError: If the credentials are rejected.
+        """
+        with self._token_lock:
+            try:
+                response = self.session.post(
+                    self._url(self.TOKEN_PATH),
+                    data={"grant_type": "client_credentials"},
+                    auth=(self.client_id, self.client_secret),
+                    timeout=TIMEOUT,
+                )
+            except self.requests.RequestException as e:
+                raise LoginError(f"Token request failed: {e}")
+            if response.status_code in (400, 401, 403):
+                raise LoginError(f"API credentials rejected ({response.status_code})")
+            if not response.ok:
+                raise LoginError(f"Token request failed ({response.status_code})")
+
+            token = response.json()
+            self._token = token["access_token"]
+            self._token_expires = time.time() + float(token.get("expires_in", 3600))
+            return True
+
+    def ensure_logged_in(self) -> bool:
+        """Get a new token only if the current one is missing or about to expire."""
+        with self._token_lock:
+            if self._token and time.time() < self._token_expires - TOKEN_MARGIN_SECONDS:
+                return True
+            return self.login()
+
+    def reset_session(self):
+        """Drop the token so the next cycle authenticates again."""
+        self._token = None
+        self._token_expires = 0.0
+
+    def _get(self, path: str, params: Optional[dict] = None):
+        """
+        GET a JSON document through the rate governor, conditionally if cached.
+
+        Args:
+            path: API path or absolute URL (e.g. a links.next URL).
+            params: Query parameters.
+
+        Returns:
+            Decoded JSON body (the cached body on 304).
+
+        Raises:
+            RateLimited: The API answered 429.
+            SessionExpired: The token was rejected twice.
+            ExtractionError: Any other error response.
+        """
+        url = self._url(path)
+        key = self.requests.Request("GET", url, params=params).prepare().url
+        token_renewed = False
+        refetch = False  # A 304 came back with nothing cached to reuse
+
+        while True:
+            self.ensure_logged_in()
+            headers = {"Authorization": f"Bearer {self._token}"}
+            cached = None
+            if refetch:
+                headers["Cache-Control"] = "no-cache"
+            else:
+                with self._cache_lock:
+                    cached = self._cache.get(key)
+                    if cached:
+                        self._cache.move_to_end(key)
+            if cached:
+                headers.update(cached[0])
+
+            slot = self.governor.acquire()
+            started = time.monotonic()
+            status = None
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=TIMEOUT)
+                status = response.status_code
+                if status == 429:
+                    try:
+                        retry_after = int(response.headers.get("Retry-After", ""))
+                    except ValueError:
+                        retry_after = RateLimited().retry_after
+            finally:
+                self.governor.release(slot, time.monotonic() - started, status, retry_after)
+
+            if status == 429:
+                raise RateLimited(retry_after)
+            if status == 401:
+                if token_renewed:
+                    raise SessionExpired("API token rejected")
+                token_renewed = True
+                self.reset_session()
+                continue
+            if status == 304:
+                if cached:
+                    self.not_modified += 1
+                    return cached[1]
+                if refetch:
+                    raise ExtractionError(url, "HTTP 304 without a cached body")
+                # A cache miss: ask again, without validators
+                refetch = True
+                continue
+            if not response.ok:
+                raise ExtractionError(url, f"HTTP {status}")
+
+            body = response.json()
+            validators = {}
+            if response.headers.get("ETag"):
+                validators["If-None-Match"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                validators["If-Modified-Since"] = response.headers["Last-Modified"]
+            if validators:
+                with self._cache_lock:
+                    self._cache[key] = (validators, body)
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_entries:
+                        self._cache.popitem(last=False)
+            return body
+
+    def _get_all(self, path: str, params: Optional[dict] = None) -> tuple[list, int]:
+        """
+        Read every page of a list endpoint.
+
+        Follows links.next when the server sends it, otherwise requests
+        page numbers up to meta.total_pages, or until a short page.
+
+        Returns:
+            (records, number of requests made).
+        """
+        records = []
+        page_number = 1
+        next_link = None
+
+        for requests in range(1, MAX_PAGES + 1):
+            if next_link:
+                # The next link carries its own query string
+                data = self._get(urljoin(self._url(path), next_link))
+            else:
+                data = self._get(path, {**(params or {}), "page": page_number, "per_page": PAGE_SIZE})
+            page = _items(data)
+            records.extend(page)
+
+            links = data.get("links") if isinstance(data, dict) else None
+            meta = data.get("meta") if isinstance(data, dict) else None
+            if isinstance(links, dict) and "next" in links:
+                next_link = links["next"]
+                if not next_link:
+                    return records, requests
+            elif isinstance(meta, dict) and meta.get("total_pages") is not None:
+                if page_number >= int(meta["total_pages"]):
+                    return records, requests
+            elif len(page) < PAGE_SIZE:
+                return records, requests
+            page_number += 1
+
+        print(f"  Stopped paging {path} after {MAX_PAGES} pages")
+        return records, MAX_PAGES
+
+    def get_vehicles(self) -> list[VehicleData]:
+        """
+        List the tenant's assets, with their details.
+
+        Returns:
+            List of VehicleData objects.
+        """
+        print("Fetching vehicle list...")
+        records, _ = self._get_all(self.ASSETS_PATH)
+
+        vehicles = []
+        self.asset_ids = {}
+        for record in records:
+            vehicle = VehicleData.from_api_record(record)
+            if vehicle:
+                vehicles.append(vehicle)
+                self.asset_ids[vehicle.vin] = str(record.get("id") or vehicle.vin)
+
+        if not self._fixed_cache_size:
+            # One fault list per asset, plus the asset pages and some headroom
+            self.cache_entries = len(vehicles) + MIN_CACHE_ENTRIES
+
+        print(f"  Found {len(vehicles)} vehicles")
+        return vehicles
+
+    def _asset_faults(self, vin: str) -> tuple[list[FaultCodeData], int]:
+        """Fetch one asset's faults; returns (faults, requests made)."""
+        path = self.ASSET_FAULTS_PATH.format(asset_id=self.asset_ids.get(vin, vin))
+        records, requests = self._get_all(path)
+        faults = []
+        for record in records:
+            # Per-asset records usually omit the VIN
+            fault = FaultCodeData.from_feed_record({"vin": vin, **record})
+            if fault:
+                faults.append(fault)
+        return faults, requests
+
+    def get_diagnostics(self, vehicle: VehicleData) -> VehicleData:
+        """
+        Fetch a vehicle's faults.
+
+        Details come with the asset list, so no extra request is made for them.
+
+        Args:
+            vehicle: Vehicle to update in place.
+
+        Returns:
+            The same vehicle, with faults filled.
+        """
+        started = time.monotonic()
+        governor_wait = self.governor.wait_seconds
+        vehicle.faults, _ = self._asset_faults(vehicle.vin)
+        queued = self.governor.wait_seconds - governor_wait
+        self.diagnostics_timings = {
+            "rate_limit_wait": queued,
+            "request": time.monotonic() - started - queued,
+        }
+        return vehicle
+
+    def sweep_faults(self, vehicles: list[VehicleData]) -> tuple[dict[str, list[FaultCodeData]], int]:
+        """
+        Fetch every vehicle's faults on a bounded thread pool.
+
+        VINs whose requests failed are left out of the mapping, so
+        export_all_data() retries them one by one with get_diagnostics().
+
+        Args:
+            vehicles: The fleet.
+
+        Returns:
+            (faults per fetched VIN, number of requests made).
+
+        Raises:
+            RateLimited: The API answered 429; outstanding requests are cancelled.
+        """
+        found: dict[str, list[FaultCodeData]] = {}
+        requests = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._asset_faults, v.vin): v.vin for v in vehicles}
+            try:
+                for future in as_completed(futures):
+                    vin = futures[future]
+                    try:
+                        found[vin], made = future.result()
+                        requests += made
+                    except RateLimited:
+                        raise
+                    except Exception as e:
+                        print(f"  Faults for {vin} failed: {e}")
+            except RateLimited:
+                for future in futures:
+                    future.cancel()
+                raise
+        return found, requests
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
@@ -0,0 +1,354 @@
+"""
+Fault change events.
+
+Each VIN's faults are compared with the previous snapshot as soon as the VIN
+is scraped, and the differences are appended to a durable local queue that
+alerting consumers read with their own cursor.
+
+Usage:
+    # Producer (done by export_all_data)
+    stream = FaultEventStream.for_tenant("acme-trucking")
+    stream.process("acme-trucking", vehicle)
+    stream.save()
+
+    # Consumer
+    queue = EventQueue()
+    batch = queue.read("alerts")
+    for event in batch.events:
+        ...
+    queue.ack("alerts", batch)
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer only
+    fcntl = None
+
+from .models import FaultCodeData, VehicleData
+
+
+# Event types
+FAULT_APPEARED = "fault_appeared"
+FAULT_CLEARED = "fault_cleared"
+SEVERITY_ESCALATED = "severity_escalated"
+FAULT_INACTIVE = "fault_inactive"
+
+SEVERITY_RANK = {"unknown": 0, "info": 1, "minor": 2, "major": 3, "critical": 4}
+
+
+@dataclass
+class FaultEvent:
+    """A change in one fault code on one vehicle."""
+
+    event_type: str
+    tenant_id: str
+    vin: str
+    spn: int
+    fmi: int
+    severity: str = "unknown"
+    previous_severity: Optional[str] = None
+    is_critical: bool = False
+    description: str = ""
+    occurred_at: datetime = field(default_factory=datetime.now)
+    offset: Optional[int] = None  # Byte offset in the queue, set when read back
+
+    @property
+    def code_identifier(self) -> str:
+        """Get unique identifier for the fault code."""
+        return f"SPN{self.spn}-FMI{self.fmi}"
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "event_type": self.event_type,
+            "tenant_id": self.tenant_id,
+            "vin": self.vin,
+            "spn": self.spn,
+            "fmi": self.fmi,
+            "severity": self.severity,
+            "previous_severity": self.previous_severity,
+            "is_critical": self.is_critical,
+            "description": self.description,
+            "occurred_at": self.occurred_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, offset: Optional[int] = None) -> "FaultEvent":
+        """Create FaultEvent from its JSON representation."""
+        return cls(
+            event_type=data["event_type"],
+            tenant_id=data["tenant_id"],
+            vin=data["vin"],
+            spn=data["spn"],
+            fmi=data["fmi"],
+            severity=data.get("severity", "unknown"),
+            previous_severity=data.get("previous_severity"),
+            is_critical=data.get("is_critical", False),
+            description=data.get("description", ""),
+            occurred_at=datetime.fromisoformat(data["occurred_at"]),
+            offset=offset,
+        )
+
+
+def snapshot_faults(faults: list[FaultCodeData]) -> dict[str, dict]:
+    """
+    Reduce a VIN's faults to the state needed for diffing.
+
+    Duplicate rows for the same code are merged: highest severity wins and
+    the code counts as active if any row is active.
+
+    Args:
+        faults: Faults scraped for one VIN.
+
+    Returns:
+        Mapping of code identifier to {spn, fmi, severity, is_active, is_critical}.
+    """
+    snapshot: dict[str, dict] = {}
+    for fault in faults:
+        entry = snapshot.get(fault.code_identifier)
+        if entry is None:
+            snapshot[fault.code_identifier] = {
+                "spn": fault.spn,
+                "fmi": fault.fmi,
+                "severity": fault.severity,
+                "is_active": fault.is_active,
+                "is_critical": fault.is_critical,
+            }
+            continue
+        if SEVERITY_RANK.get(fault.severity, 0) > SEVERITY_RANK.get(entry["severity"], 0):
+            entry["severity"] = fault.severity
+        entry["is_active"] = entry["is_active"] or fault.is_active
+        entry["is_critical"] = entry["is_critical"] or fault.is_critical
+    return snapshot
+
+
+def diff_faults(
+    tenant_id: str,
+    vin: str,
+    previous: dict[str, dict],
+    faults: list[FaultCodeData],
+) -> list[FaultEvent]:
+    """
+    Compare a VIN's current faults with its previous snapshot.
+
+    Args:
+        tenant_id: Tenant the VIN belongs to.
+        vin: Vehicle VIN.
+        previous: Previous snapshot from snapshot_faults().
+        faults: Faults just scraped for the VIN.
+
+    Returns:
+        Change events, in a stable order.
+    """
+    current = snapshot_faults(faults)
+    descriptions = {f.code_identifier: f.description for f in faults}
+    events = []
+
+    def event(event_type: str, code: str, entry: dict, previous_severity=None) -> FaultEvent:
+        return FaultEvent(
+            event_type=event_type,
+            tenant_id=tenant_id,
+            vin=vin,
+            spn=entry["spn"],
+            fmi=entry["fmi"],
+            severity=entry["severity"],
+            previous_severity=previous_severity,
+            is_critical=entry["is_critical"],
+            description=descriptions.get(code, ""),
+        )
+
+    for code, entry in current.items():
+        before = previous.get(code)
+
+        if before is None or not before["is_active"]:
+            # New, or historical code that became active again
+            if entry["is_active"]:
+                events.append(event(FAULT_APPEARED, code, entry))
+            continue
+
+        if not entry["is_active"]:
+            events.append(event(FAULT_INACTIVE, code, entry, before["severity"]))
+        elif SEVERITY_RANK.get(entry["severity"], 0) > SEVERITY_RANK.get(before["severity"], 0):
+            events.append(event(SEVERITY_ESCALATED, code, entry, before["severity"]))
+
+    for code, before in previous.items():
+        if code not in current:
+            events.append(event(FAULT_CLEARED, code, before, before["severity"]))
+
+    return events
+
+
+@dataclass
+class EventBatch:
+    """Events read for a consumer, plus the cursor to ack once handled."""
+
+    events: list[FaultEvent]
+    next_offset: int
+
+
+class EventQueue:
+    """
+    Durable append-only event queue backed by a JSON-lines file.
+
+    Appends are flushed and fsync'd before returning. Each consumer has its
+    own cursor (a byte offset) stored next to the queue file, so consumers
+    get at-least-once delivery: events are re-read until acked.
+    """
+
+    DEFAULT_FILE = Path("fault_events.jsonl")
+
+    def __init__(self, file_path: Optional[Path] = None):
+        """
+        Initialize queue.
+
+        Args:
+            file_path: Queue file. Defaults to fault_events.jsonl.
+        """
+        self.file_path = Path(file_path or self.DEFAULT_FILE)
+
+    def append(self, events: list[FaultEvent]):
+        """
+        Append events durably.
+
+        Args:
+            events: Events to append, written in a single locked write.
+        """
+        if not events:
+            return
+
+        data = "".join(json.dumps(e.to_dict()) + "\n" for e in events).encode()
+        with open(self.file_path, "ab") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _cursor_file(self, consumer: str) -> Path:
+        return self.file_path.with_name(f"{self.file_path.name}.{consumer}.cursor")
+
+    def cursor(self, consumer: str) -> int:
+        """Get a consumer's committed byte offset (0 if new)."""
+        try:
+            return int(self._cursor_file(consumer).read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def read(self, consumer: str, limit: int = 100) -> EventBatch:
+        """
+        Read events after a consumer's cursor without moving it.
+
+        A partially written trailing line is never returned.
+
+        Args:
+            consumer: Consumer name.
+            limit: Maximum number of events.
+
+        Returns:
+            EventBatch to pass to ack() once the events are handled.
+        """
+        offset = self.cursor(consumer)
+        events = []
+
+        if not self.file_path.exists():
+            return EventBatch(events, offset)
+
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            while len(events) < limit:
+                line = f.readline()
+                if not line or not line.endswith(b"\n"):
+                    break
+                try:
+                    events.append(FaultEvent.from_dict(json.loads(line), offset=offset))
+                except (ValueError, KeyError) as e:
+                    print(f"  Skipping malformed event at offset {offset}: {e}")
+                offset += len(line)
+
+        return EventBatch(events, offset)
+
+    def ack(self, consumer: str, batch: EventBatch):
+        """Move a consumer's cursor past a handled batch."""
+        cursor_file = self._cursor_file(consumer)
+        tmp_file = cursor_file.with_suffix(".tmp")
+        tmp_file.write_text(str(batch.next_offset))
+        tmp_file.replace(cursor_file)
+
+
+class FaultEventStream:
+    """
+    Diff each scraped VIN against its previous snapshot and emit events.
+
+    The first sync of a tenant only records a baseline; otherwise every
+    existing fault would be reported as new.
+    """
+
+    def __init__(self, snapshot_file: Path, queue: Optional[EventQueue] = None):
+        """
+        Initialize stream.
+
+        Args:
+            snapshot_file: JSON file holding the last fault snapshot per VIN.
+            queue: Event queue. Defaults to fault_events.jsonl next to the snapshot.
+        """
+        self.snapshot_file = Path(snapshot_file)
+        self.queue = queue or EventQueue(self.snapshot_file.with_name(EventQueue.DEFAULT_FILE.name))
+        self.snapshots: dict[str, dict[str, dict]] = {}
+        self.has_baseline = False
+        self.load()
+
+    @classmethod
+    def for_tenant(cls, tenant_id: str, directory: Path = Path(".")) -> "FaultEventStream":
+        """Create a stream using the default snapshot file for a tenant."""
+        return cls(Path(directory) / f"fault_snapshot_{tenant_id}.json")
+
+    def load(self):
+        """Load the previous snapshot, ignoring a missing or corrupt file."""
+        if not self.snapshot_file.exists():
+            return
+
+        try:
+            with open(self.snapshot_file) as f:
+                self.snapshots = json.load(f).get("vins", {})
+            self.has_baseline = True
+        except (OSError, ValueError) as e:
+            print(f"  Ignoring unreadable fault snapshot: {e}")
+            self.snapshots = {}
+
+    def save(self):
+        """Persist the snapshot atomically."""
+        tmp_file = self.snapshot_file.with_suffix(self.snapshot_file.suffix + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"vins": self.snapshots}, f)
+        tmp_file.replace(self.snapshot_file)
+        self.has_baseline = True
+
+    def process(self, tenant_id: str, vehicle: VehicleData) -> list[FaultEvent]:
+        """
+        Diff a freshly scraped vehicle and append its events to the queue.
+
+        Args:
+            tenant_id: Tenant the vehicle belongs to.
+            vehicle: Vehicle with freshly fetched faults.
+
+        Returns:
+            Events emitted for the vehicle.
+        """
+        previous = self.snapshots.get(vehicle.vin, {})
+        events = []
+        if self.has_baseline:
+            events = diff_faults(tenant_id, vehicle.vin, previous, vehicle.faults)
+            self.queue.append(events)
+        self.snapshots[vehicle.vin] = snapshot_faults(vehicle.faults)
+        return events
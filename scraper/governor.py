@@ -0,0 +1,240 @@
+"""
+Cross-process rate governor for portal navigations.
+
+All scrapers on a node (daemon tenants, login pipeline threads, sweep
+workers in other processes) share one token bucket per portal host, kept in
+a small JSON state file under a file lock. Besides the request rate, the
+number of concurrent navigations is capped.
+
+The rate adapts (AIMD): it is halved on HTTP 429 or a slow response, and
+increased step by step while responses are fast, up to the configured rate.
+A 429 also pauses every process until its Retry-After has passed.
+
+Usage:
+    governor = RateGovernor.for_host("paccar.decisiv.net")
+    slot = governor.acquire()
+    try:
+        response = page.goto(url)
+    finally:
+        governor.release(slot, latency, response.status)
+"""
+
+import json
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: governs a single process only
+    fcntl = None
+
+
+DEFAULT_RATE = 2.0  # navigations per second
+DEFAULT_BURST = 4
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_STATE_DIR = Path(tempfile.gettempdir()) / "trucktech-governor"
+
+# Responses slower than this halve the rate; faster than HEALTHY ramp it up
+SLOW_RESPONSE_SECONDS = 10.0
+HEALTHY_RESPONSE_SECONDS = 3.0
+
+MIN_RATE = 0.1
+RAMP_STEP = 0.1  # navigations per second added per healthy response
+
+# In-flight slots older than this are assumed abandoned
+SLOT_TIMEOUT_SECONDS = 300.0
+
+POLL_SECONDS = 0.5
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RateGovernor:
+    """
+    Token bucket with a concurrency cap, shared through a locked state file.
+
+    State file format:
+    {
+        "rate": 2.0,                # current (adaptive) rate
+        "tokens": 3.5,
+        "updated_at": 1768991400.0,
+        "blocked_until": 0.0,       # set by 429 responses
+        "in_flight": {"<slot>": [pid, started_at]}
+    }
+    """
+
+    def __init__(
+        self,
+        state_file: Path,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ):
+        """
+        Initialize governor.
+
+        Args:
+            state_file: State file shared by every process governing the same host.
+            rate: Maximum navigations per second; the adaptive rate never exceeds it.
+            burst: Maximum tokens saved up while idle.
+            max_concurrent: Maximum navigations in flight at once.
+        """
+        self.state_file = Path(state_file)
+        self.lock_file = self.state_file.with_suffix(self.state_file.suffix + ".lock")
+        self.max_rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+
+        # Time this instance spent waiting in acquire()
+        self.wait_seconds = 0.0
+
+    @classmethod
+    def for_host(
+        cls,
+        host: str,
+        rate: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        directory: Path = DEFAULT_STATE_DIR,
+    ) -> "RateGovernor":
+        """
+        Create the governor for a portal host.
+
+        Limits default to the PORTAL_RATE_LIMIT and PORTAL_MAX_NAVIGATIONS
+        env vars, then to DEFAULT_RATE and DEFAULT_MAX_CONCURRENT.
+        """
+        if rate is None:
+            rate = float(os.getenv("PORTAL_RATE_LIMIT", DEFAULT_RATE))
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("PORTAL_MAX_NAVIGATIONS", DEFAULT_MAX_CONCURRENT))
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        return cls(
+            directory / f"rate_{host}.json",
+            rate=rate,
+            burst=max(1, int(rate * 2)),
+            max_concurrent=max_concurrent,
+        )
+
+    def _update(self, change):
+        """Apply change(state, now) to the state under the file lock and return its result."""
+        with open(self.lock_file, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                try:
+                    state = json.loads(self.state_file.read_text())
+                except (OSError, ValueError):
+                    state = {}
+                state.setdefault("rate", self.max_rate)
+                state.setdefault("tokens", float(self.burst))
+                state.setdefault("updated_at", now)
+                state.setdefault("blocked_until", 0.0)
+                state.setdefault("in_flight", {})
+
+                # A lower configured rate in this process caps the shared rate
+                state["rate"] = min(state["rate"], self.max_rate)
+                elapsed = max(0.0, now - state["updated_at"])
+                state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * state["rate"])
+                state["updated_at"] = now
+                state["in_flight"] = {
+                    slot: (pid, started)
+                    for slot, (pid, started) in state["in_flight"].items()
+                    if now - started < SLOT_TIMEOUT_SECONDS and _pid_alive(pid)
+                }
+
+                outcome = change(state, now)
+
+                tmp_file = self.state_file.with_suffix(self.state_file.suffix + ".tmp")
+                tmp_file.write_text(json.dumps(state))
+                tmp_file.replace(self.state_file)
+                return outcome
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def acquire(self, timeout: Optional[float] = None) -> str:
+        """
+        Wait for a token and a free navigation slot.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            Slot ID to pass to release().
+
+        Raises:
+            TimeoutError: No slot was free within the timeout.
+        """
+        slot = uuid.uuid4().hex
+        started = time.monotonic()
+
+        def take(state: dict, now: float) -> float:
+            if now < state["blocked_until"]:
+                return state["blocked_until"] - now
+            if len(state["in_flight"]) >= self.max_concurrent:
+                return POLL_SECONDS
+            if state["tokens"] < 1.0:
+                return (1.0 - state["tokens"]) / state["rate"]
+            state["tokens"] -= 1.0
+            state["in_flight"][slot] = (os.getpid(), now)
+            return 0.0
+
+        try:
+            while True:
+                wait = self._update(take)
+                if wait <= 0:
+                    return slot
+                if timeout is not None and time.monotonic() - started + wait > timeout:
+                    raise TimeoutError("No navigation slot available")
+                time.sleep(min(wait, POLL_SECONDS))
+        finally:
+            self.wait_seconds += time.monotonic() - started
+
+    def release(
+        self,
+        slot: str,
+        latency: Optional[float] = None,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """
+        Free a navigation slot and adapt the rate to how the portal responded.
+
+        Args:
+            slot: Slot ID from acquire().
+            latency: Seconds the navigation took, or None if it failed early.
+            status: HTTP status of the response, if any.
+            retry_after: Seconds to pause all navigations after a 429.
+        """
+
+        def record(state: dict, now: float):
+            state["in_flight"].pop(slot, None)
+            if status == 429:
+                state["rate"] = max(MIN_RATE, state["rate"] / 2)
+                state["tokens"] = 0.0
+                if retry_after:
+                    state["blocked_until"] = max(state["blocked_until"], now + retry_after)
+            elif latency is not None and latency >= SLOW_RESPONSE_SECONDS:
+                state["rate"] = max(MIN_RATE, state["rate"] / 2)
+            elif latency is not None and latency <= HEALTHY_RESPONSE_SECONDS:
+                state["rate"] = min(self.max_rate, state["rate"] + RAMP_STEP)
+
+        self._update(record)
+
+    def current_rate(self) -> float:
+        """Get the shared adaptive rate."""
+        return self._update(lambda state, now: state["rate"])
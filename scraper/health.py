@@ -0,0 +1,262 @@
+"""
+Vehicle health scores.
+
+Each vehicle gets a 0-100 score (higher = healthier) computed from its fault
+codes: every fault subtracts points weighted by severity (critical SPNs count
+as critical), whether it is still active, how often it recurred and, for
+inactive faults, how long ago it was last seen. Risk levels follow the
+AI/ML specification: low >= 80, medium >= 60, high >= 40, critical below.
+
+Scores for a whole fleet are computed in one batch with numpy, and
+HealthScorer only rescores vehicles that raised fault change events since the
+last update.
+
+Usage:
+    scorer = HealthScorer()
+    scorer.update(vehicles)                   # scores everything
+    scorer.update(vehicles, changed={vin})    # rescores VINs with fault events
+    scorer.summary()                          # fleet aggregates
+"""
+
+import math
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .models import FaultCodeData, VehicleData
+
+
+SEVERITY_WEIGHTS = {"critical": 1.0, "major": 0.6, "minor": 0.2, "info": 0.05}
+UNKNOWN_SEVERITY_WEIGHT = 0.1
+
+# Points subtracted per unit of fault weight (one active critical fault = 25)
+POINTS_PER_WEIGHT = 25.0
+
+# Inactive faults count for a fifth, halving every 30 days since last seen
+INACTIVE_FACTOR = 0.2
+INACTIVE_HALF_LIFE_DAYS = 30.0
+
+# Extra weight per doubling of occurrences, capped at twice the base weight
+RECURRENCE_FACTOR = 0.25
+MAX_RECURRENCE_MULTIPLIER = 2.0
+
+# Risk levels by minimum score
+RISK_LEVELS = (("low", 80), ("medium", 60), ("high", 40), ("critical", 0))
+
+
+def risk_level(score: float) -> str:
+    """Get the risk level for a health score."""
+    for level, minimum in RISK_LEVELS:
+        if score >= minimum:
+            return level
+    return RISK_LEVELS[-1][0]
+
+
+def _fault_time(fault: FaultCodeData) -> Optional[datetime]:
+    return fault.last_seen or fault.first_seen
+
+
+def fault_penalty(fault: FaultCodeData, now: datetime) -> float:
+    """
+    Weight of one fault, as used by the batch computation.
+
+    This per-object version is the reference definition (and what the
+    benchmark compares against); scoring itself uses score_fleet().
+    """
+    weight = 1.0 if fault.is_critical else SEVERITY_WEIGHTS.get(fault.severity, UNKNOWN_SEVERITY_WEIGHT)
+
+    activity = 1.0
+    if not fault.is_active:
+        seen = _fault_time(fault)
+        age_days = max(0.0, (now - seen).total_seconds() / 86400) if seen else 0.0
+        activity = INACTIVE_FACTOR * 0.5 ** (age_days / INACTIVE_HALF_LIFE_DAYS)
+
+    recurrence = min(
+        MAX_RECURRENCE_MULTIPLIER,
+        1.0 + RECURRENCE_FACTOR * math.log2(max(fault.occurrence_count, 1)),
+    )
+    return weight * activity * recurrence
+
+
+def score_vehicle(vehicle: VehicleData, now: Optional[datetime] = None) -> int:
+    """Score one vehicle with the per-object reference implementation."""
+    now = now or datetime.now()
+    penalty = sum(fault_penalty(f, now) for f in vehicle.faults)
+    return int(round(min(100.0, max(0.0, 100.0 - POINTS_PER_WEIGHT * penalty))))
+
+
+def score_fleet(vehicles: list[VehicleData], now: Optional[datetime] = None) -> dict:
+    """
+    Score many vehicles in one vectorized batch.
+
+    Fault attributes are flattened into arrays once; penalties are computed
+    on the arrays and summed per vehicle with np.bincount.
+
+    Args:
+        vehicles: Vehicles with faults.
+        now: Reference time for fault ages. Defaults to now.
+
+    Returns:
+        Dict of numpy arrays aligned with `vehicles`: scores (int16),
+        active_faults and critical_faults (int32).
+    """
+    now = now or datetime.now()
+
+    faults = [f for v in vehicles for f in v.faults]
+    owner = np.repeat(
+        np.arange(len(vehicles), dtype=np.int32),
+        np.fromiter((len(v.faults) for v in vehicles), dtype=np.int64, count=len(vehicles)),
+    )
+    critical = np.array([f.is_critical for f in faults], dtype=bool)
+    active = np.array([f.is_active for f in faults], dtype=bool)
+    severity = np.array(
+        [SEVERITY_WEIGHTS.get(f.severity, UNKNOWN_SEVERITY_WEIGHT) for f in faults], dtype=np.float64
+    )
+    weight = np.where(critical, 1.0, severity)
+    occurrences = np.array([f.occurrence_count for f in faults], dtype=np.float64)
+    seen_at = np.array(
+        [t.timestamp() if (t := _fault_time(f)) else np.nan for f in faults], dtype=np.float64
+    )
+
+    age_days = np.nan_to_num((now.timestamp() - seen_at) / 86400, nan=0.0).clip(min=0.0)
+    activity = np.where(
+        active, 1.0, INACTIVE_FACTOR * 0.5 ** (age_days / INACTIVE_HALF_LIFE_DAYS)
+    )
+    recurrence = np.minimum(
+        MAX_RECURRENCE_MULTIPLIER,
+        1.0 + RECURRENCE_FACTOR * np.log2(np.maximum(occurrences, 1.0)),
+    )
+
+    penalty = np.bincount(owner, weights=weight * activity * recurrence, minlength=len(vehicles))
+    scores = np.clip(100.0 - POINTS_PER_WEIGHT * penalty, 0.0, 100.0)
+
+    return {
+        "scores": np.rint(scores).astype(np.int16),
+        "active_faults": np.bincount(owner, weights=active, minlength=len(vehicles)).astype(np.int32),
+        "critical_faults": np.bincount(
+            owner, weights=active & critical, minlength=len(vehicles)
+        ).astype(np.int32),
+    }
+
+
+class HealthScorer:
+    """
+    Keep fleet health scores up to date across syncs.
+
+    Scores live in arrays indexed by VIN. update() rescores only the VINs
+    it is told changed (those with fault change events) and VINs it has
+    never scored, except once per day, when everything is rescored so
+    inactive faults keep aging. Changes that raise no event, like a higher
+    occurrence count, are picked up by that daily rescore.
+    """
+
+    def __init__(self):
+        self.vins: list[str] = []
+        self.index: dict[str, int] = {}
+        self.scores = np.zeros(0, dtype=np.int16)
+        self.active_faults = np.zeros(0, dtype=np.int32)
+        self.critical_faults = np.zeros(0, dtype=np.int32)
+        self._scored_on = None
+
+    def update(
+        self,
+        vehicles: list[VehicleData],
+        now: Optional[datetime] = None,
+        changed: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Rescore changed vehicles and set their `health_score`.
+
+        Args:
+            vehicles: Freshly synced vehicles (all or some of the fleet).
+            now: Reference time for fault ages. Defaults to now.
+            changed: VINs whose faults changed, e.g. those with events from
+                     FaultEventStream.process(). None rescores every vehicle.
+
+        Returns:
+            Number of vehicles rescored.
+        """
+        now = now or datetime.now()
+        full = changed is None or self._scored_on != now.date()
+        self._scored_on = now.date()
+
+        if full:
+            changed = list(vehicles)
+        else:
+            changed_vins = set(changed)
+            changed = [v for v in vehicles if v.vin in changed_vins or v.vin not in self.index]
+
+        new_vins = [v.vin for v in changed if v.vin not in self.index]
+        if new_vins:
+            for vin in new_vins:
+                self.index[vin] = len(self.vins)
+                self.vins.append(vin)
+            grow = len(new_vins)
+            self.scores = np.concatenate([self.scores, np.full(grow, 100, dtype=np.int16)])
+            self.active_faults = np.concatenate([self.active_faults, np.zeros(grow, dtype=np.int32)])
+            self.critical_faults = np.concatenate([self.critical_faults, np.zeros(grow, dtype=np.int32)])
+
+        if changed:
+            batch = score_fleet(changed, now)
+            rows = np.fromiter((self.index[v.vin] for v in changed), dtype=np.int64, count=len(changed))
+            self.scores[rows] = batch["scores"]
+            self.active_faults[rows] = batch["active_faults"]
+            self.critical_faults[rows] = batch["critical_faults"]
+
+        index = self.index
+        scores = self.scores.tolist()
+        for vehicle in vehicles:
+            vehicle.health_score = scores[index[vehicle.vin]]
+
+        return len(changed)
+
+    def prune(self, vins: Iterable[str]):
+        """Forget vehicles that are no longer in the fleet."""
+        keep_vins = set(vins)
+        keep = np.fromiter((vin in keep_vins for vin in self.vins), dtype=bool, count=len(self.vins))
+        if keep.all():
+            return
+
+        self.vins = [vin for vin, kept in zip(self.vins, keep) if kept]
+        self.index = {vin: row for row, vin in enumerate(self.vins)}
+        self.scores = self.scores[keep]
+        self.active_faults = self.active_faults[keep]
+        self.critical_faults = self.critical_faults[keep]
+
+    def score(self, vin: str) -> Optional[int]:
+        """Get a vehicle's current score, or None if it was never scored."""
+        row = self.index.get(vin)
+        return int(self.scores[row]) if row is not None else None
+
+    def summary(self) -> dict:
+        """
+        Get fleet aggregates.
+
+        Returns:
+            Dict with vehicles, average_score, min_score, vehicles per risk level,
+            and vehicles with active and critical faults.
+        """
+        summary = {
+            "vehicles": len(self.vins),
+            "average_score": None,
+            "min_score": None,
+            "risk_levels": {level: 0 for level, _ in RISK_LEVELS},
+            "vehicles_with_active_faults": int(np.count_nonzero(self.active_faults)),
+            "vehicles_with_critical_faults": int(np.count_nonzero(self.critical_faults)),
+        }
+        if not self.vins:
+            return summary
+
+        summary["average_score"] = round(float(self.scores.mean()), 1)
+        summary["min_score"] = int(self.scores.min())
+
+        # Levels are ordered from the highest minimum down
+        upper = None
+        for level, minimum in RISK_LEVELS:
+            in_level = self.scores >= minimum
+            if upper is not None:
+                in_level &= self.scores < upper
+            summary["risk_levels"][level] = int(np.count_nonzero(in_level))
+            upper = minimum
+        return summary
@@ -0,0 +1,559 @@
+"""
+Columnar fault history.
+
+Every sync's vehicles and faults are appended to Parquet files partitioned by
+tenant and date, so fault history survives `sync_result.json` being
+overwritten. Each sync adds one small file per table; once a day is over,
+its files are compacted into a single file sorted by VIN, so row-group
+statistics let VIN queries skip most of the data.
+
+Compaction also summarizes the day, so the fleet-wide queries don't read
+every snapshot's rows:
+
+    fault codes     one row per (VIN, SPN, FMI) seen that day, with its first
+                    and last snapshot; one file per tenant and month, sorted
+                    by SPN so SPN queries only read matching row groups
+    daily counts    distinct fault codes, critical codes and vehicles per
+                    day; one small file per tenant
+
+Days that aren't compacted yet (today) are summarized from their parts at
+query time.
+
+Layout:
+    history/
+        faults/tenant_id=acme-trucking/date=2026-01-21/part-<ts>-<id>.parquet
+        vehicles/tenant_id=acme-trucking/date=2026-01-21/compacted.parquet
+        fault_codes/tenant_id=acme-trucking/month=2026-01/compacted.parquet
+        daily/tenant_id=acme-trucking/compacted.parquet
+
+Requires pyarrow, which is imported only when the store is used.
+
+Usage:
+    store = HistoryStore(Path("history"))
+    store.append(result)
+
+    store.vin_history("1XKYD49X0NJ123456")
+    store.spn_occurrences(110, days=90)
+    store.daily_fault_counts(tenant_id="acme-trucking")
+"""
+
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+from .models import SyncResult
+
+
+FAULTS = "faults"
+VEHICLES = "vehicles"
+FAULT_CODES = "fault_codes"
+DAILY = "daily"
+
+COMPACTED_FILE = "compacted.parquet"
+
+# Rows per row group; small enough that VIN-sorted groups prune well
+ROW_GROUP_SIZE = 16 * 1024
+
+
+def _pyarrow():
+    """Import pyarrow on first use."""
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Fault history requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _schemas(pa) -> dict:
+    """Table schemas, excluding the tenant_id/date partition columns."""
+    return {
+        VEHICLES: pa.schema([
+            ("snapshot_at", pa.timestamp("us")),
+            ("vin", pa.string()),
+            ("unit_number", pa.string()),
+            ("year", pa.int16()),
+            ("make", pa.string()),
+            ("model", pa.string()),
+            ("odometer", pa.int64()),
+            ("engine_hours", pa.int64()),
+            ("status", pa.string()),
+            ("fault_count", pa.int32()),
+        ]),
+        FAULTS: pa.schema([
+            ("snapshot_at", pa.timestamp("us")),
+            ("vin", pa.string()),
+            ("spn", pa.int32()),
+            ("fmi", pa.int16()),
+            ("source_address", pa.int16()),
+            ("severity", pa.string()),
+            ("is_active", pa.bool_()),
+            ("is_critical", pa.bool_()),
+            ("description", pa.string()),
+            ("occurrence_count", pa.int32()),
+        ]),
+        FAULT_CODES: pa.schema([
+            ("date", pa.date32()),
+            ("vin", pa.string()),
+            ("spn", pa.int32()),
+            ("fmi", pa.int16()),
+            ("source_address", pa.int16()),
+            ("severity", pa.string()),  # as of the last snapshot
+            ("description", pa.string()),
+            ("is_active", pa.bool_()),  # as of the last snapshot
+            ("is_critical", pa.bool_()),  # in any snapshot
+            ("occurrence_count", pa.int32()),  # highest reported
+            ("first_snapshot_at", pa.timestamp("us")),
+            ("last_snapshot_at", pa.timestamp("us")),
+            ("snapshots", pa.int32()),
+        ]),
+        DAILY: pa.schema([
+            ("date", pa.date32()),
+            ("faults", pa.int64()),
+            ("critical_faults", pa.int64()),
+            ("vehicles", pa.int64()),
+        ]),
+    }
+
+
+class HistoryStore:
+    """
+    Append-only Parquet store of sync snapshots with a query API.
+
+    Queries return pyarrow Tables (use `.to_pylist()` or `.to_pandas()`).
+    """
+
+    DEFAULT_DIR = Path("history")
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Initialize store.
+
+        Args:
+            root: Store directory. Defaults to ./history.
+        """
+        self.root = Path(root or self.DEFAULT_DIR)
+        self.pa = _pyarrow()
+        self.schemas = _schemas(self.pa)
+        self.partitioning = self.pa.dataset.partitioning(
+            self.pa.schema([("tenant_id", self.pa.string()), ("date", self.pa.date32())]),
+            flavor="hive",
+        )
+
+    def _partition_dir(self, table: str, tenant_id: str, day: date) -> Path:
+        return self.root / table / f"tenant_id={tenant_id}" / f"date={day.isoformat()}"
+
+    def _write(self, table, path: Path):
+        """Write a Parquet file atomically (readers skip dot-files)."""
+        tmp_file = path.with_name(f".{path.name}.tmp")
+        self.pa.parquet.write_table(
+            table, tmp_file, row_group_size=ROW_GROUP_SIZE, compression="zstd"
+        )
+        tmp_file.replace(path)
+
+    def append(self, result: SyncResult) -> int:
+        """
+        Append a sync's vehicles and faults as one snapshot.
+
+        Args:
+            result: Completed sync, with vehicles.
+
+        Returns:
+            Number of fault rows written.
+        """
+        if not result.vehicles:
+            return 0
+
+        snapshot_at = result.completed_at or result.started_at
+        vehicles = {name: [] for name in self.schemas[VEHICLES].names}
+        faults = {name: [] for name in self.schemas[FAULTS].names}
+
+        for vehicle in result.vehicles:
+            vehicles["snapshot_at"].append(snapshot_at)
+            vehicles["vin"].append(vehicle.vin)
+            vehicles["unit_number"].append(vehicle.unit_number)
+            vehicles["year"].append(vehicle.year)
+            vehicles["make"].append(vehicle.make)
+            vehicles["model"].append(vehicle.model)
+            vehicles["odometer"].append(vehicle.odometer)
+            vehicles["engine_hours"].append(vehicle.engine_hours)
+            vehicles["status"].append(vehicle.status)
+            vehicles["fault_count"].append(len(vehicle.faults))
+
+            for fault in vehicle.faults:
+                faults["snapshot_at"].append(snapshot_at)
+                faults["vin"].append(vehicle.vin)
+                faults["spn"].append(fault.spn)
+                faults["fmi"].append(fault.fmi)
+                faults["source_address"].append(fault.source_address)
+                faults["severity"].append(fault.severity)
+                faults["is_active"].append(fault.is_active)
+                faults["is_critical"].append(fault.is_critical)
+                faults["description"].append(fault.description)
+                faults["occurrence_count"].append(fault.occurrence_count)
+
+        name = f"part-{snapshot_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        for table_name, columns in ((VEHICLES, vehicles), (FAULTS, faults)):
+            if not columns["vin"]:
+                continue
+            directory = self._partition_dir(table_name, result.tenant_id, snapshot_at.date())
+            directory.mkdir(parents=True, exist_ok=True)
+            table = self.pa.table(columns, schema=self.schemas[table_name])
+            self._write(table, directory / name)
+
+        return len(faults["vin"])
+
+    def _partitions(self, table_name: str, tenant_id: Optional[str] = None):
+        """Yield (tenant ID, date, directory) of a table's date partitions."""
+        pattern = f"tenant_id={tenant_id}" if tenant_id else "tenant_id=*"
+        for directory in sorted((self.root / table_name).glob(f"{pattern}/date=*")):
+            try:
+                day = date.fromisoformat(directory.name.split("=", 1)[1])
+            except ValueError:
+                continue
+            yield directory.parent.name.split("=", 1)[1], day, directory
+
+    def _read_partition(self, directory: Path):
+        """All fault rows of one date partition."""
+        schema = self.schemas[FAULTS]
+        files = sorted(directory.glob("*.parquet"))
+        if not files:
+            return schema.empty_table()
+        return self.pa.concat_tables(
+            [self.pa.parquet.read_table(f, schema=schema) for f in files]
+        )
+
+    def compact(self, tenant_id: Optional[str] = None, before: Optional[date] = None) -> int:
+        """
+        Merge each closed day's files into one VIN-sorted file and summarize it.
+
+        Args:
+            tenant_id: Only compact this tenant. Defaults to all tenants.
+            before: Only compact days before this date. Defaults to today.
+
+        Returns:
+            Number of partitions compacted.
+        """
+        before = before or date.today()
+        compacted = 0
+
+        for table_name in (VEHICLES, FAULTS):
+            for tenant, day, directory in self._partitions(table_name, tenant_id):
+                if day >= before:
+                    continue
+
+                files = sorted(directory.glob("*.parquet"))
+                if len(files) < 2 and all(f.name == COMPACTED_FILE for f in files):
+                    # Stores compacted before day summaries existed are summarized once
+                    if table_name == FAULTS and files and day not in self._summarized_days(tenant):
+                        self._summarize(tenant, day, self._read_partition(directory))
+                    continue
+
+                tables = [
+                    self.pa.parquet.read_table(f, schema=self.schemas[table_name]) for f in files
+                ]
+                if files[0].name == COMPACTED_FILE:
+                    # Parts left behind by an interrupted compaction are already merged
+                    merged = self.pa.compute.unique(tables[0]["snapshot_at"])
+                    tables[1:] = [
+                        t.filter(self.pa.compute.invert(
+                            self.pa.compute.is_in(t["snapshot_at"], value_set=merged)
+                        ))
+                        for t in tables[1:]
+                    ]
+                table = self.pa.concat_tables(tables)
+                table = table.sort_by([("vin", "ascending"), ("snapshot_at", "ascending")])
+                self._write(table, directory / COMPACTED_FILE)
+                for f in files:
+                    if f.name != COMPACTED_FILE:
+                        f.unlink()
+                if table_name == FAULTS:
+                    self._summarize(tenant, day, table)
+                compacted += 1
+
+        return compacted
+
+    def _fault_codes(self, faults, day: date):
+        """Collapse a day's fault rows to one row per (VIN, SPN, FMI)."""
+        schema = self.schemas[FAULT_CODES]
+        if not faults.num_rows:
+            return schema.empty_table()
+        codes = faults.sort_by("snapshot_at").group_by(["vin", "spn", "fmi"], use_threads=False).aggregate([
+            ("source_address", "max"),
+            ("severity", "last"),
+            ("description", "last"),
+            ("is_active", "last"),
+            ("is_critical", "any"),
+            ("occurrence_count", "max"),
+            ("snapshot_at", "min"),
+            ("snapshot_at", "max"),
+            ("snapshot_at", "count"),
+        ])
+        codes = codes.rename_columns({
+            "source_address_max": "source_address",
+            "severity_last": "severity",
+            "description_last": "description",
+            "is_active_last": "is_active",
+            "is_critical_any": "is_critical",
+            "occurrence_count_max": "occurrence_count",
+            "snapshot_at_min": "first_snapshot_at",
+            "snapshot_at_max": "last_snapshot_at",
+            "snapshot_at_count": "snapshots",
+        })
+        codes = codes.append_column("date", self.pa.array([day] * codes.num_rows, self.pa.date32()))
+        return codes.select(schema.names).cast(schema)
+
+    def _daily_row(self, codes, day: date):
+        """Distinct fault codes, critical codes and vehicles of one day's codes."""
+        pc = self.pa.compute
+        return self.pa.table(
+            {
+                "date": [day],
+                "faults": [codes.num_rows],
+                "critical_faults": [pc.sum(codes["is_critical"].cast(self.pa.int64())).as_py() or 0],
+                "vehicles": [pc.count_distinct(codes["vin"]).as_py()],
+            },
+            schema=self.schemas[DAILY],
+        )
+
+    def _replace_day(self, path: Path, table_name: str, day: date, rows, sort_keys: list):
+        """Rewrite a summary file with one day's rows replaced."""
+        pc = self.pa.compute
+        tables = [rows]
+        if path.exists():
+            existing = self.pa.parquet.read_table(path, schema=self.schemas[table_name])
+            tables.insert(0, existing.filter(pc.not_equal(existing["date"], self.pa.scalar(day))))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write(self.pa.concat_tables(tables).sort_by(sort_keys), path)
+
+    def _summarize(self, tenant_id: str, day: date, faults):
+        """Write a compacted day's fault codes and daily counts."""
+        codes = self._fault_codes(faults, day)
+        self._replace_day(
+            self.root / FAULT_CODES / f"tenant_id={tenant_id}" / f"month={day:%Y-%m}" / COMPACTED_FILE,
+            FAULT_CODES,
+            day,
+            codes,
+            [("spn", "ascending"), ("fmi", "ascending"), ("date", "ascending"), ("vin", "ascending")],
+        )
+        # Written last: a day only counts as summarized once its codes are
+        self._replace_day(
+            self._daily_file(tenant_id), DAILY, day, self._daily_row(codes, day), [("date", "ascending")]
+        )
+
+    def _daily_file(self, tenant_id: str) -> Path:
+        return self.root / DAILY / f"tenant_id={tenant_id}" / COMPACTED_FILE
+
+    def _read_daily(self, tenant_id: str):
+        path = self._daily_file(tenant_id)
+        if not path.exists():
+            return self.schemas[DAILY].empty_table()
+        return self.pa.parquet.read_table(path, schema=self.schemas[DAILY])
+
+    def _summarized_days(self, tenant_id: str) -> set[date]:
+        return set(self._read_daily(tenant_id)["date"].to_pylist())
+
+    def _open_days(
+        self, tenant_id: Optional[str], since: Optional[date], until: Optional[date]
+    ) -> dict[str, dict[date, Path]]:
+        """
+        Fault partitions whose summaries are missing or out of date.
+
+        That's normally only today; a late part in a compacted day also
+        reopens it until the next compaction.
+
+        Returns:
+            Tenant ID -> {date: partition directory}.
+        """
+        summarized: dict[str, set[date]] = {}
+        open_days: dict[str, dict[date, Path]] = {}
+        for tenant, day, directory in self._partitions(FAULTS, tenant_id):
+            if (since and day < since) or (until and day > until):
+                continue
+            if tenant not in summarized:
+                summarized[tenant] = self._summarized_days(tenant)
+            if day not in summarized[tenant] or any(
+                f.name != COMPACTED_FILE for f in directory.glob("*.parquet")
+            ):
+                open_days.setdefault(tenant, {})[day] = directory
+        return open_days
+
+    def _without_days(self, table, open_days: dict[str, dict[date, Path]]):
+        """Drop summary rows of reopened days from a table with tenant_id and date columns."""
+        pc = self.pa.compute
+        for tenant, days in open_days.items():
+            stale = pc.and_(
+                pc.equal(table["tenant_id"], tenant),
+                pc.is_in(table["date"], value_set=self.pa.array(list(days), self.pa.date32())),
+            )
+            table = table.filter(pc.invert(stale))
+        return table
+
+    def _dataset_schema(self, table_name: str):
+        """Table schema including the partition columns."""
+        schema = self.schemas[table_name]
+        for partition_field in self.partitioning.schema:
+            schema = schema.append(partition_field)
+        return schema
+
+    def _query(self, table_name: str, filters: list, columns: Optional[list[str]] = None):
+        """Scan a table with the filters pushed down to partitions and row groups."""
+        schema = self._dataset_schema(table_name)
+        if not (self.root / table_name).exists():
+            return schema.empty_table().select(columns or schema.names)
+
+        dataset = self.pa.dataset.dataset(
+            self.root / table_name,
+            schema=schema,
+            format="parquet",
+            partitioning=self.partitioning,
+        )
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+        return dataset.to_table(columns=columns, filter=expression)
+
+    def _common_filters(
+        self, tenant_id: Optional[str], since: Optional[date], until: Optional[date]
+    ) -> list:
+        field = self.pa.dataset.field
+        filters = []
+        if tenant_id:
+            filters.append(field("tenant_id") == tenant_id)
+        if since:
+            filters.append(field("date") >= since)
+        if until:
+            filters.append(field("date") <= until)
+        return filters
+
+    def vin_history(
+        self,
+        vin: str,
+        tenant_id: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+    ):
+        """
+        Get every fault row recorded for a VIN.
+
+        Args:
+            vin: Vehicle VIN.
+            tenant_id: Restrict to one tenant.
+            since: First date to include.
+            until: Last date to include.
+
+        Returns:
+            Table of fault rows sorted by snapshot time.
+        """
+        filters = self._common_filters(tenant_id, since, until)
+        filters.append(self.pa.dataset.field("vin") == vin)
+        return self._query(FAULTS, filters).sort_by("snapshot_at")
+
+    def spn_occurrences(self, spn: int, days: int = 90, tenant_id: Optional[str] = None):
+        """
+        Get the days each VIN reported an SPN, over the last `days` days.
+
+        Args:
+            spn: Suspect Parameter Number.
+            days: Look-back window in days.
+            tenant_id: Restrict to one tenant.
+
+        Returns:
+            Table with one row per tenant, day, VIN and FMI: the fault's
+            last state that day, its first/last snapshot and the number of
+            snapshots it was in. Sorted by date and VIN.
+        """
+        field = self.pa.dataset.field
+        since = date.today() - timedelta(days=days)
+        schema = self.schemas[FAULT_CODES]
+        columns = ["tenant_id", *schema.names]
+
+        open_days = self._open_days(tenant_id, since, None)
+        tables = []
+        if (self.root / FAULT_CODES).exists():
+            partitioning = self.pa.dataset.partitioning(
+                self.pa.schema([("tenant_id", self.pa.string()), ("month", self.pa.string())]),
+                flavor="hive",
+            )
+            dataset = self.pa.dataset.dataset(
+                self.root / FAULT_CODES,
+                schema=schema.append(self.pa.field("tenant_id", self.pa.string()))
+                .append(self.pa.field("month", self.pa.string())),
+                format="parquet",
+                partitioning=partitioning,
+            )
+            expression = (field("spn") == spn) & (field("date") >= since) & (field("month") >= f"{since:%Y-%m}")
+            if tenant_id:
+                expression = expression & (field("tenant_id") == tenant_id)
+            tables.append(self._without_days(dataset.to_table(columns=columns, filter=expression), open_days))
+
+        for tenant, partitions in open_days.items():
+            for day, directory in partitions.items():
+                faults = self._read_partition(directory)
+                faults = faults.filter(self.pa.compute.equal(faults["spn"], spn))
+                codes = self._fault_codes(faults, day)
+                tables.append(codes.add_column(
+                    0, "tenant_id", self.pa.array([tenant] * codes.num_rows, self.pa.string())
+                ))
+
+        if not tables:
+            return schema.empty_table().add_column(0, "tenant_id", self.pa.array([], self.pa.string()))
+        return self.pa.concat_tables(tables).sort_by([("date", "ascending"), ("vin", "ascending")])
+
+    def daily_fault_counts(
+        self,
+        tenant_id: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+    ):
+        """
+        Count distinct fault codes and affected vehicles per day across the fleet.
+
+        A fault counts once per day however many snapshots it appears in.
+
+        Args:
+            tenant_id: Restrict to one tenant.
+            since: First date to include.
+            until: Last date to include.
+
+        Returns:
+            Table with date, faults (distinct VIN/SPN/FMI), critical_faults
+            (distinct critical codes) and vehicles columns, sorted by date.
+        """
+        pc = self.pa.compute
+        open_days = self._open_days(tenant_id, since, until)
+
+        tables = []
+        pattern = f"tenant_id={tenant_id}" if tenant_id else "tenant_id=*"
+        for path in sorted((self.root / DAILY).glob(f"{pattern}/{COMPACTED_FILE}")):
+            tenant = path.parent.name.split("=", 1)[1]
+            daily = self._read_daily(tenant)
+            if since:
+                daily = daily.filter(pc.greater_equal(daily["date"], self.pa.scalar(since)))
+            if until:
+                daily = daily.filter(pc.less_equal(daily["date"], self.pa.scalar(until)))
+            daily = daily.add_column(0, "tenant_id", self.pa.array([tenant] * daily.num_rows, self.pa.string()))
+            tables.append(self._without_days(daily, open_days))
+
+        for tenant, partitions in open_days.items():
+            for day, directory in partitions.items():
+                daily = self._daily_row(self._fault_codes(self._read_partition(directory), day), day)
+                tables.append(daily.add_column(0, "tenant_id", self.pa.array([tenant], self.pa.string())))
+
+        schema = self.schemas[DAILY]
+        if not tables:
+            return schema.empty_table()
+        counts = self.pa.concat_tables(tables).group_by("date").aggregate([
+            ("faults", "sum"),
+            ("critical_faults", "sum"),
+            ("vehicles", "sum"),
+        ])
+        counts = counts.rename_columns({
+            "faults_sum": "faults",
+            "critical_faults_sum": "critical_faults",
+            "vehicles_sum": "vehicles",
+        })
+        return counts.select(schema.names).sort_by("date")
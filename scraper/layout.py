@@ -0,0 +1,150 @@
+"""
+Portal layout fingerprint cache.
+
+The portal renders the asset list as a table or as cards, fault rows with
+one of several selectors, and may or may not show an MFA prompt. Probing
+every variant costs several selector waits per page. Once a variant is
+seen, it is cached per tenant and portal version, so later runs only use
+the matching fast path. A cached entry is dropped as soon as its fast path
+returns nothing, and the full probe runs again.
+"""
+
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+# Portal version documented for PACCAR Solutions (January 2026)
+DEFAULT_PORTAL_VERSION = "8.29.0"
+
+PORTAL_VERSION_PATTERN = re.compile(r"(?:Decisiv|SRM)[^<>\d]{0,20}v?(\d+\.\d+(?:\.\d+)?)", re.IGNORECASE)
+
+# Vehicle list layouts
+VEHICLES_TABLE = "table"
+VEHICLES_CARDS = "cards"
+
+# Cached MFA type when no MFA prompt appeared after login
+MFA_NONE = "none"
+
+
+def detect_portal_version(html: str) -> Optional[str]:
+    """
+    Find the Decisiv SRM version in page HTML.
+
+    Args:
+        html: Page content.
+
+    Returns:
+        Version string such as "8.29.0", or None if not found.
+    """
+    match = PORTAL_VERSION_PATTERN.search(html)
+    return match.group(1) if match else None
+
+
+class LayoutCache:
+    """
+    Per-tenant layout fingerprints in a JSON file.
+
+    File format:
+    {
+        "acme-trucking": {
+            "portal_version": "8.29.0",
+            "vehicles_layout": "table",
+            "faults_selector": "table tbody tr",
+            "mfa_type": "none",
+            "updated_at": "2026-01-21T10:30:00"
+        }
+    }
+    """
+
+    DEFAULT_FILE = Path("layout_cache.json")
+
+    def __init__(self, file_path: Optional[Path] = None):
+        """
+        Initialize cache.
+
+        Args:
+            file_path: Cache file. Defaults to layout_cache.json.
+        """
+        self.file_path = Path(file_path or self.DEFAULT_FILE)
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """Load fingerprints, ignoring a missing or corrupt file."""
+        if not self.file_path.exists():
+            return
+        try:
+            with open(self.file_path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Ignoring unreadable layout cache: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Persist fingerprints atomically."""
+        with self._lock:
+            tmp_file = self.file_path.with_suffix(self.file_path.suffix + ".tmp")
+            tmp_file.write_text(json.dumps(self.entries, indent=2))
+            tmp_file.replace(self.file_path)
+
+    def for_tenant(self, tenant_id: str) -> "TenantLayout":
+        """Get the layout handle for a tenant."""
+        return TenantLayout(self, tenant_id)
+
+
+class TenantLayout:
+    """
+    One tenant's cached layout, as used by the scraper.
+
+    Every change is written through to the cache file.
+    """
+
+    def __init__(self, cache: LayoutCache, tenant_id: str):
+        self.cache = cache
+        self.tenant_id = tenant_id
+        self.portal_version = cache.entries.get(tenant_id, {}).get(
+            "portal_version", DEFAULT_PORTAL_VERSION
+        )
+
+    def set_portal_version(self, version: str):
+        """Record the portal version; a different version drops the cached layout."""
+        self.portal_version = version
+        with self.cache._lock:
+            entry = self.cache.entries.get(self.tenant_id)
+            if entry and entry.get("portal_version") != version:
+                print(f"  Portal version changed to {version}, re-detecting layout")
+                del self.cache.entries[self.tenant_id]
+                self.cache.save()
+
+    def get(self, field: str) -> Optional[str]:
+        """Get a cached value, only if it was recorded for the current portal version."""
+        entry = self.cache.entries.get(self.tenant_id)
+        if not entry or entry.get("portal_version") != self.portal_version:
+            return None
+        return entry.get(field)
+
+    def remember(self, field: str, value: str):
+        """Cache a detected layout value."""
+        if self.get(field) == value:
+            return
+        with self.cache._lock:
+            entry = self.cache.entries.get(self.tenant_id)
+            if not entry or entry.get("portal_version") != self.portal_version:
+                entry = {"portal_version": self.portal_version}
+                self.cache.entries[self.tenant_id] = entry
+            entry[field] = value
+            entry["updated_at"] = datetime.now().isoformat()
+            self.cache.save()
+
+    def invalidate(self, field: str):
+        """Drop a cached value whose fast path stopped working."""
+        with self.cache._lock:
+            entry = self.cache.entries.get(self.tenant_id)
+            if entry and entry.pop(field, None) is not None:
+                print(f"  Cached {field} no longer matches, re-detecting")
+                self.cache.save()
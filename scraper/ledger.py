@@ -0,0 +1,349 @@
+"""
+Sync history ledger.
+
+Every sync (CLI, daemon cycle or assembled sweep) is recorded in a local
+SQLite database: its SyncResult counters, wall time per phase and errors
+counted by exception class. Indexes keep the `status` queries independent
+of how many runs are stored:
+
+    - last N runs per tenant        (tenant_id, started_at) index, one seek per tenant
+    - p95 duration over a window    covering (started_at, duration_seconds) index
+    - tenants without a recent success  per-tenant summary row, updated on insert
+
+Usage:
+    ledger = SyncLedger(Path("sync_ledger.db"))
+    ledger.record(result)
+
+    ledger.recent_runs(limit=5)
+    ledger.duration_percentile(95, since=datetime.now() - timedelta(days=7))
+    ledger.stale_tenants(hours=24)
+"""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .models import SyncResult
+
+
+DEFAULT_FILE = Path("sync_ledger.db")
+
+# SyncResult counters stored per run, in column order
+RUN_COUNTERS = (
+    "vehicles_found",
+    "vehicles_synced",
+    "vehicles_skipped",
+    "vehicles_swept",
+    "faults_found",
+    "critical_faults",
+    "new_faults",
+    "sweep_requests",
+    "context_recycles",
+    "memory_peak_mb",
+    "enrichment_seconds",
+    "rate_limit_wait_seconds",
+)
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+class SyncLedger:
+    """
+    Append-only record of sync runs with indexed status queries.
+
+    Timestamps are stored as Unix seconds so range scans compare numbers.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY,
+            tenant_id TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            completed_at REAL,
+            duration_seconds REAL,
+            success INTEGER NOT NULL,
+            deadline_reached INTEGER NOT NULL DEFAULT 0,
+            memory_limit_reached INTEGER NOT NULL DEFAULT 0,
+            vehicles_found INTEGER,
+            vehicles_synced INTEGER,
+            vehicles_skipped INTEGER,
+            vehicles_swept INTEGER,
+            faults_found INTEGER,
+            critical_faults INTEGER,
+            new_faults INTEGER,
+            sweep_requests INTEGER,
+            context_recycles INTEGER,
+            memory_peak_mb REAL,
+            enrichment_seconds REAL,
+            rate_limit_wait_seconds REAL,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            first_error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_tenant
+            ON runs (tenant_id, started_at, duration_seconds);
+        CREATE INDEX IF NOT EXISTS idx_runs_started
+            ON runs (started_at, duration_seconds);
+
+        CREATE TABLE IF NOT EXISTS run_phases (
+            run_id INTEGER NOT NULL,
+            phase TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            PRIMARY KEY (run_id, phase)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS run_errors (
+            run_id INTEGER NOT NULL,
+            error_class TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (run_id, error_class)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS tenants (
+            tenant_id TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL,
+            last_run_at REAL NOT NULL,
+            last_success_at REAL
+        );
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_FILE):
+        """
+        Initialize ledger, creating the database if needed.
+
+        Args:
+            db_path: SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def for_directory(cls, directory: Path) -> "SyncLedger":
+        """Create the ledger in a data directory (e.g. the daemon's output dir)."""
+        return cls(Path(directory) / DEFAULT_FILE.name)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, result: SyncResult) -> int:
+        """
+        Record a finished sync.
+
+        Args:
+            result: Sync result. `success` is the sync's own flag; errors on
+                    individual VINs don't make a run unsuccessful.
+
+        Returns:
+            The run's ID.
+        """
+        started_at = result.started_at.timestamp()
+        completed_at = _timestamp(result.completed_at)
+        columns = [
+            "tenant_id", "started_at", "completed_at", "duration_seconds", "success",
+            "deadline_reached", "memory_limit_reached", *RUN_COUNTERS, "error_count", "first_error",
+        ]
+        values = [
+            result.tenant_id,
+            started_at,
+            completed_at,
+            result.duration_seconds,
+            int(result.success),
+            int(result.deadline_reached),
+            int(result.memory_limit_reached),
+            *(getattr(result, name) for name in RUN_COUNTERS),
+            len(result.errors),
+            result.errors[0][:500] if result.errors else None,
+        ]
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            run_id = conn.execute(
+                f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                values,
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO run_phases (run_id, phase, seconds) VALUES (?, ?, ?)",
+                [(run_id, phase, seconds) for phase, seconds in result.phase_seconds.items()],
+            )
+            conn.executemany(
+                "INSERT INTO run_errors (run_id, error_class, count) VALUES (?, ?, ?)",
+                [(run_id, name, count) for name, count in result.error_classes.items()],
+            )
+            conn.execute(
+                "INSERT INTO tenants (tenant_id, runs, last_run_at, last_success_at) "
+                "VALUES (?, 1, ?, ?) "
+                "ON CONFLICT (tenant_id) DO UPDATE SET "
+                "runs = runs + 1, "
+                "last_run_at = MAX(last_run_at, excluded.last_run_at), "
+                # Scalar MAX() is NULL if either side is
+                "last_success_at = COALESCE("
+                "MAX(last_success_at, excluded.last_success_at), last_success_at, excluded.last_success_at)",
+                (result.tenant_id, started_at, started_at if result.success else None),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return run_id
+
+    def tenant_ids(self) -> list[str]:
+        """Get every tenant with at least one recorded run."""
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT tenant_id FROM tenants ORDER BY tenant_id")]
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        """Get the number of recorded runs."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(SUM(runs), 0) FROM tenants").fetchone()[0]
+        finally:
+            conn.close()
+
+    def recent_runs(self, tenant_id: Optional[str] = None, limit: int = 10) -> dict[str, list[dict]]:
+        """
+        Get the last runs of each tenant, newest first.
+
+        Args:
+            tenant_id: Only this tenant. Defaults to every tenant.
+            limit: Runs per tenant.
+
+        Returns:
+            Mapping of tenant ID to run dicts (runs columns, datetimes for
+            timestamps, plus "error_classes").
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            tenant_ids = [tenant_id] if tenant_id else [
+                row[0] for row in conn.execute("SELECT tenant_id FROM tenants ORDER BY tenant_id")
+            ]
+            runs = {}
+            for tenant in tenant_ids:
+                rows = conn.execute(
+                    "SELECT * FROM runs WHERE tenant_id = ? ORDER BY started_at DESC LIMIT ?",
+                    (tenant, limit),
+                ).fetchall()
+                runs[tenant] = [self._run_dict(conn, row) for row in rows]
+            return runs
+        finally:
+            conn.close()
+
+    def _run_dict(self, conn: sqlite3.Connection, row: sqlite3.Row) -> dict:
+        run = dict(row)
+        for key in ("started_at", "completed_at"):
+            if run[key] is not None:
+                run[key] = datetime.fromtimestamp(run[key])
+        run["success"] = bool(run["success"])
+        run["error_classes"] = dict(
+            conn.execute(
+                "SELECT error_class, count FROM run_errors WHERE run_id = ?", (run["run_id"],)
+            ).fetchall()
+        )
+        return run
+
+    def duration_percentile(
+        self,
+        pct: float = 95.0,
+        since: Optional[datetime] = None,
+        tenant_id: Optional[str] = None,
+    ) -> tuple[Optional[float], int]:
+        """
+        Get a nearest-rank percentile of run durations.
+
+        Args:
+            pct: Percentile (0-100).
+            since: Only runs started at or after this time.
+            tenant_id: Only this tenant's runs.
+
+        Returns:
+            (duration in seconds or None without runs, number of runs considered).
+        """
+        where = ["duration_seconds IS NOT NULL", "started_at >= ?"]
+        params: list = [_timestamp(since) or 0.0]
+        if tenant_id:
+            where.append("tenant_id = ?")
+            params.append(tenant_id)
+        condition = " AND ".join(where)
+
+        conn = self._connect()
+        try:
+            count = conn.execute(f"SELECT COUNT(*) FROM runs WHERE {condition}", params).fetchone()[0]
+            if not count:
+                return None, 0
+            offset = min(count - 1, int(count * pct / 100))
+            value = conn.execute(
+                f"SELECT duration_seconds FROM runs WHERE {condition} "
+                "ORDER BY duration_seconds LIMIT 1 OFFSET ?",
+                [*params, offset],
+            ).fetchone()[0]
+            return value, count
+        finally:
+            conn.close()
+
+    def stale_tenants(self, hours: float = 24.0, now: Optional[datetime] = None) -> list[tuple[str, Optional[datetime]]]:
+        """
+        Get tenants without a successful sync in the last `hours` hours.
+
+        Returns:
+            (tenant ID, last success or None if never), oldest success first.
+        """
+        cutoff = (now or datetime.now()).timestamp() - hours * 3600
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT tenant_id, last_success_at FROM tenants "
+                "WHERE last_success_at IS NULL OR last_success_at < ? "
+                "ORDER BY COALESCE(last_success_at, 0), tenant_id",
+                (cutoff,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            (tenant_id, datetime.fromtimestamp(last) if last is not None else None)
+            for tenant_id, last in rows
+        ]
+
+    def error_classes(self, since: Optional[datetime] = None) -> dict[str, int]:
+        """Count errors by exception class over runs started since a time."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT e.error_class, SUM(e.count) FROM runs r "
+                "JOIN run_errors e ON e.run_id = r.run_id "
+                "WHERE r.started_at >= ? GROUP BY e.error_class ORDER BY SUM(e.count) DESC",
+                (_timestamp(since) or 0.0,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    def phase_averages(self, since: Optional[datetime] = None, tenant_id: Optional[str] = None) -> dict[str, float]:
+        """Average seconds per phase over runs started since a time."""
+        where = "r.started_at >= ?"
+        params: list = [_timestamp(since) or 0.0]
+        if tenant_id:
+            where += " AND r.tenant_id = ?"
+            params.append(tenant_id)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT p.phase, AVG(p.seconds) FROM runs r "
+                "JOIN run_phases p ON p.run_id = r.run_id "
+                f"WHERE {where} GROUP BY p.phase ORDER BY p.phase",
+                params,
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
@@ -0,0 +1,206 @@
+"""
+Parallel login pipeline.
+
+Logs many tenants in at once so their session files are fresh before syncs
+start, and keeps per-tenant login latency history.
+
+Playwright's sync API is bound to the thread that started it, so each
+worker thread runs its own browser; the output of the pipeline is the
+saved session file, which later syncs reuse without logging in.
+
+Usage:
+    pipeline = LoginPipeline(max_workers=4)
+    outcomes = pipeline.run(tenants)
+    print(pipeline.stats.summary("acme-trucking"))
+"""
+
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .client import TruckTechPlusScraper
+from .daemon import TenantConfig
+from .layout import LayoutCache
+
+
+@dataclass
+class LoginOutcome:
+    """Result of one tenant's login."""
+
+    tenant_id: str
+    success: bool
+    seconds: float
+    session_reused: bool = False
+    mfa_attempts: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "tenant_id": self.tenant_id,
+            "success": self.success,
+            "seconds": self.seconds,
+            "session_reused": self.session_reused,
+            "mfa_attempts": self.mfa_attempts,
+            "error": self.error,
+        }
+
+
+class LoginStats:
+    """
+    Rolling per-tenant login latency history in a JSON file.
+
+    Only the most recent `history` attempts per tenant are kept.
+    """
+
+    def __init__(self, file_path: Path = Path("login_stats.json"), history: int = 200):
+        self.file_path = Path(file_path)
+        self.history = history
+        self.samples: dict[str, list[dict]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load history, ignoring a missing or corrupt file."""
+        if not self.file_path.exists():
+            return
+        try:
+            with open(self.file_path) as f:
+                self.samples = json.load(f).get("tenants", {})
+        except (OSError, ValueError) as e:
+            print(f"  Ignoring unreadable login stats: {e}")
+            self.samples = {}
+
+    def save(self):
+        """Persist history atomically."""
+        with self._lock:
+            data = {"tenants": self.samples}
+        tmp_file = self.file_path.with_suffix(self.file_path.suffix + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+        tmp_file.replace(self.file_path)
+
+    def record(self, outcome: LoginOutcome):
+        """Add a login attempt to its tenant's history."""
+        sample = {
+            "at": datetime.now().isoformat(),
+            "seconds": round(outcome.seconds, 3),
+            "success": outcome.success,
+            "session_reused": outcome.session_reused,
+            "mfa_attempts": outcome.mfa_attempts,
+        }
+        with self._lock:
+            samples = self.samples.setdefault(outcome.tenant_id, [])
+            samples.append(sample)
+            del samples[: -self.history]
+
+    def summary(self, tenant_id: str) -> dict:
+        """
+        Get the latency distribution of a tenant's logins.
+
+        Returns:
+            Dict with count, failures, fresh_logins, p50, p95 and max seconds.
+        """
+        with self._lock:
+            samples = list(self.samples.get(tenant_id, []))
+
+        latencies = sorted(s["seconds"] for s in samples if s["success"])
+        summary = {
+            "count": len(samples),
+            "failures": sum(1 for s in samples if not s["success"]),
+            "fresh_logins": sum(1 for s in samples if s["success"] and not s["session_reused"]),
+            "p50": None,
+            "p95": None,
+            "max": None,
+        }
+        if latencies:
+            summary["p50"] = statistics.median(latencies)
+            summary["p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            summary["max"] = latencies[-1]
+        return summary
+
+
+class LoginPipeline:
+    """Authenticate many tenants in parallel and refresh their session files."""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        session_dir: Path = Path("."),
+        stats: Optional[LoginStats] = None,
+        headless: Optional[bool] = None,
+        layout_cache: Optional[LayoutCache] = None,
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            max_workers: Concurrent logins (each runs its own browser).
+            session_dir: Directory for session_<tenant>.json files.
+            stats: Latency history. Defaults to login_stats.json in session_dir.
+            headless: Run browsers in headless mode. Defaults to HEADLESS env var or True.
+            layout_cache: Layout cache shared by all logins. Defaults to layout_cache.json in session_dir.
+        """
+        self.max_workers = max_workers
+        self.session_dir = Path(session_dir)
+        self.stats = stats or LoginStats(self.session_dir / "login_stats.json")
+        self.headless = headless
+        self.layout_cache = layout_cache or LayoutCache(
+            self.session_dir / LayoutCache.DEFAULT_FILE.name
+        )
+
+    def _login(self, tenant: TenantConfig) -> LoginOutcome:
+        """Log one tenant in on the calling thread."""
+        started = time.monotonic()
+        scraper = TruckTechPlusScraper(
+            **tenant.scraper_options(),
+            headless=self.headless,
+            session_file=self.session_dir / f"session_{tenant.tenant_id}.json",
+            layout=self.layout_cache.for_tenant(tenant.tenant_id),
+        )
+        try:
+            success = scraper.login()
+            error = None if success else "Login failed"
+        except Exception as e:
+            success = False
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+
+        return LoginOutcome(
+            tenant_id=tenant.tenant_id,
+            success=success,
+            seconds=time.monotonic() - started,
+            session_reused=scraper.session_reused,
+            mfa_attempts=scraper.mfa_attempts,
+            error=error,
+        )
+
+    def run(self, tenants: list[TenantConfig]) -> list[LoginOutcome]:
+        """
+        Log every tenant in, in parallel.
+
+        Args:
+            tenants: Tenants to authenticate.
+
+        Returns:
+            One LoginOutcome per tenant, in input order.
+        """
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="login") as pool:
+            outcomes = list(pool.map(self._login, tenants))
+
+        for outcome in outcomes:
+            self.stats.record(outcome)
+        self.stats.save()
+        return outcomes
@@ -0,0 +1,174 @@
+"""
+Memory watchdog for long syncs.
+
+Samples the RSS of the browser process tree (Playwright driver and Chromium,
+i.e. every descendant of this process) and of the Python process itself.
+On Linux this reads /proc directly; elsewhere psutil is used if installed.
+With heap tracing on, the Python heap is also measured with tracemalloc,
+which slows allocation-heavy code down noticeably, so it is opt-in.
+"""
+
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Watchdog states
+OK = "ok"
+SOFT_LIMIT = "soft_limit"
+HARD_LIMIT = "hard_limit"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_MB = 1024 * 1024
+
+
+@dataclass
+class MemorySample:
+    """One memory measurement, in megabytes."""
+
+    browser_rss_mb: float
+    python_rss_mb: float
+    python_heap_mb: Optional[float] = None  # Only when tracemalloc is running
+
+    @property
+    def total_mb(self) -> float:
+        return self.browser_rss_mb + self.python_rss_mb
+
+
+def _proc_rss_mb(pid: int) -> float:
+    """RSS of one process from /proc, 0 if it has exited."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / _MB
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _proc_descendants(root_pid: int) -> list[int]:
+    """All descendant PIDs of a process, from /proc/<pid>/stat parent links."""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            # Field 4 is the parent PID; the command name (field 2) may contain spaces
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    descendants = []
+    stack = [root_pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            descendants.append(child)
+            stack.append(child)
+    return descendants
+
+
+class MemoryWatchdog:
+    """
+    Track memory during a sync and flag soft/hard limit breaches.
+
+    Limits apply to the combined RSS of the browser process tree and Python.
+
+    Usage:
+        watchdog = MemoryWatchdog(soft_limit_mb=1500, hard_limit_mb=2500, trace_heap=True)
+        state = watchdog.check()  # between VINs
+        if state == SOFT_LIMIT:
+            scraper.recycle_context()
+        elif state == HARD_LIMIT:
+            ...  # stop and save a partial result
+    """
+
+    def __init__(
+        self,
+        soft_limit_mb: Optional[float] = None,
+        hard_limit_mb: Optional[float] = None,
+        root_pid: Optional[int] = None,
+        trace_heap: bool = False,
+    ):
+        """
+        Initialize watchdog.
+
+        Args:
+            soft_limit_mb: Recycle the browser context above this total RSS.
+            hard_limit_mb: Abort the sync above this total RSS.
+            root_pid: Process whose descendants make up the browser tree. Defaults to this process.
+            trace_heap: Start tracemalloc (if not running) and track the Python heap peak.
+                        Tracing stays on for the rest of the process.
+        """
+        self.soft_limit_mb = soft_limit_mb
+        self.hard_limit_mb = hard_limit_mb
+        self.root_pid = root_pid or os.getpid()
+        self.samples = 0
+        self.peak_mb = 0.0
+        self.heap_peak_mb: Optional[float] = None  # Only when tracemalloc is running
+        if trace_heap and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._total_mb = 0.0
+        self._use_proc = sys.platform.startswith("linux") and os.path.isdir("/proc")
+        self.available = self._use_proc or psutil is not None
+
+    def sample(self) -> MemorySample:
+        """Measure current memory usage."""
+        heap_mb = None
+        if tracemalloc.is_tracing():
+            heap_mb = tracemalloc.get_traced_memory()[0] / _MB
+
+        if self._use_proc:
+            browser = sum(_proc_rss_mb(pid) for pid in _proc_descendants(self.root_pid))
+            return MemorySample(browser, _proc_rss_mb(self.root_pid), heap_mb)
+
+        if psutil is not None:
+            try:
+                root = psutil.Process(self.root_pid)
+                browser = 0.0
+                for child in root.children(recursive=True):
+                    try:
+                        browser += child.memory_info().rss / _MB
+                    except psutil.Error:
+                        pass
+                return MemorySample(browser, root.memory_info().rss / _MB, heap_mb)
+            except psutil.Error:
+                pass
+
+        return MemorySample(0.0, 0.0, heap_mb)
+
+    def check(self) -> str:
+        """
+        Sample memory, update statistics and compare against the limits.
+
+        Returns:
+            OK, SOFT_LIMIT or HARD_LIMIT.
+        """
+        if not self.available:
+            return OK
+
+        sample = self.sample()
+        total = sample.total_mb
+        self.samples += 1
+        self._total_mb += total
+        self.peak_mb = max(self.peak_mb, total)
+        if sample.python_heap_mb is not None:
+            self.heap_peak_mb = max(self.heap_peak_mb or 0.0, sample.python_heap_mb)
+
+        if self.hard_limit_mb and total >= self.hard_limit_mb:
+            return HARD_LIMIT
+        if self.soft_limit_mb and total >= self.soft_limit_mb:
+            return SOFT_LIMIT
+        return OK
+
+    @property
+    def average_mb(self) -> Optional[float]:
+        """Average total RSS over all checks, or None before the first one."""
+        return self._total_mb / self.samples if self.samples else None
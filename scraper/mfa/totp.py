@@ -1,5 +1,8 @@
 """TOTP (Time-based One-Time Password) handler for MFA automation."""
 
+import time
+from typing import Optional
+
 import pyotp
 
 
@@ -37,6 +40,26 @@ class TOTPHandler:
         """
         return self.totp.now()
 
+    def get_fresh_code(self, min_remaining: int = 5, exclude: Optional[str] = None) -> str:
+        """
+        Generate a code that will stay valid long enough to be submitted.
+
+        If the current window has fewer than `min_remaining` seconds left,
+        or the current code equals `exclude` (e.g. a code that was just
+        rejected), wait for the next window first.
+
+        Args:
+            min_remaining: Minimum seconds the code must remain valid.
+            exclude: Code that must not be returned.
+
+        Returns:
+            6-digit string code.
+        """
+        remaining = self.get_time_remaining()
+        if remaining < min_remaining or (exclude and self.get_code() == exclude):
+            time.sleep(remaining + 0.1)
+        return self.get_code()
+
     def verify_setup(self) -> bool:
         """
         Verify the secret is valid and generating codes.
@@ -57,8 +80,6 @@ class TOTPHandler:
         Returns:
             Seconds until code rotation (0-30).
         """
-        import time
-
         return 30 - int(time.time()) % 30
 
     def verify_code(self, code: str) -> bool:
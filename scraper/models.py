@@ -1,5 +1,6 @@
 """Data models for TruckTech+ extracted data."""
 
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
@@ -20,6 +21,7 @@ class VehicleData:
     engine_hours: Optional[int] = None
     status: str = "unknown"
     last_location: Optional[dict] = None  # {lat, lng}
+    health_score: Optional[int] = None  # 0-100, higher = healthier
     faults: list["FaultCodeData"] = field(default_factory=list)
     extracted_at: datetime = field(default_factory=datetime.now)
 
@@ -53,6 +55,159 @@ class VehicleData:
             status=row_data.get("status", "unknown"),
         )
 
+    @classmethod
+    def from_api_record(cls, record: dict) -> Optional["VehicleData"]:
+        """
+        Create VehicleData from an asset record of the Decisiv API.
+
+        Accepts flat records and JSON:API style records (fields under
+        "attributes"). Detail fields are filled through apply_details(), so
+        the same value formats are recognised as on the diagnostics page.
+
+        Returns:
+            VehicleData, or None if the record has no VIN.
+        """
+        attributes = record.get("attributes") if isinstance(record.get("attributes"), dict) else record
+        vin = attributes.get("vin") or attributes.get("serial_number")
+        if not vin:
+            return None
+
+        try:
+            year = int(attributes.get("year") or attributes.get("model_year"))
+        except (TypeError, ValueError):
+            year = None
+
+        vehicle = cls(
+            vin=str(vin).strip().upper(),
+            unit_number=str(attributes.get("unit_number") or attributes.get("unit") or ""),
+            year=year,
+            make=str(attributes.get("make") or ""),
+            model=str(attributes.get("model") or ""),
+            status=str(attributes.get("status") or "unknown").lower(),
+        )
+
+        engine = attributes.get("engine") if isinstance(attributes.get("engine"), dict) else {}
+        location = attributes.get("last_location") or attributes.get("location")
+        location = location if isinstance(location, dict) else {}
+        details = {
+            "odometer": attributes.get("odometer") or attributes.get("mileage"),
+            "engine hours": attributes.get("engine_hours"),
+            "engine make": attributes.get("engine_make") or engine.get("make"),
+            "engine model": attributes.get("engine_model") or engine.get("model"),
+            "lat": location.get("lat") or location.get("latitude"),
+            "lng": location.get("lng") or location.get("longitude"),
+        }
+        vehicle.apply_details({k: str(v) for k, v in details.items() if v not in (None, "")})
+        return vehicle
+
+    def apply_details(self, details: dict[str, str]) -> int:
+        """
+        Fill detail fields from label/value pairs scraped off a vehicle page.
+
+        Recognised labels (case-insensitive): odometer/mileage, engine hours,
+        engine make/manufacturer, engine model, engine (e.g. "PACCAR MX-13"),
+        location/last location ("lat, lng"), lat and lng.
+
+        Args:
+            details: Mapping of lowercased label to raw text value.
+
+        Returns:
+            Number of fields filled.
+        """
+
+        def number(text: str) -> Optional[int]:
+            match = re.search(r"\d[\d,]*(?:\.\d+)?", text or "")
+            if not match:
+                return None
+            return int(round(float(match.group(0).replace(",", ""))))
+
+        def first(*labels: str) -> Optional[str]:
+            for label in labels:
+                if details.get(label):
+                    return details[label].strip()
+            return None
+
+        filled = 0
+
+        odometer = number(first("odometer", "mileage", "current odometer"))
+        if odometer is not None:
+            self.odometer = odometer
+            filled += 1
+
+        engine_hours = number(first("engine hours", "engine-hours", "hours"))
+        if engine_hours is not None:
+            self.engine_hours = engine_hours
+            filled += 1
+
+        engine_make = first("engine make", "engine-make", "engine manufacturer")
+        engine_model = first("engine model", "engine-model")
+        engine = first("engine")
+        if engine and not (engine_make and engine_model):
+            parts = engine.split(" ", 1)
+            engine_make = engine_make or parts[0]
+            engine_model = engine_model or (parts[1] if len(parts) > 1 else None)
+        if engine_make:
+            self.engine_make = engine_make
+            filled += 1
+        if engine_model:
+            self.engine_model = engine_model
+            filled += 1
+
+        lat, lng = first("lat", "latitude"), first("lng", "longitude")
+        location = first("location", "last location", "gps location")
+        if not (lat and lng) and location:
+            coords = re.findall(r"-?\d+\.\d+", location)
+            if len(coords) >= 2:
+                lat, lng = coords[0], coords[1]
+        try:
+            if lat and lng:
+                self.last_location = {"lat": float(lat), "lng": float(lng)}
+                filled += 1
+        except ValueError:
+            pass
+
+        return filled
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization, including faults."""
+        return {
+            "vin": self.vin,
+            "unit_number": self.unit_number,
+            "year": self.year,
+            "make": self.make,
+            "model": self.model,
+            "engine_make": self.engine_make,
+            "engine_model": self.engine_model,
+            "odometer": self.odometer,
+            "engine_hours": self.engine_hours,
+            "status": self.status,
+            "last_location": self.last_location,
+            "health_score": self.health_score,
+            "faults": [f.to_dict() for f in self.faults],
+            "extracted_at": self.extracted_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VehicleData":
+        """Create VehicleData from its to_dict() representation."""
+        extracted_at = data.get("extracted_at")
+        return cls(
+            vin=data["vin"],
+            unit_number=data.get("unit_number", ""),
+            year=data.get("year"),
+            make=data.get("make", ""),
+            model=data.get("model", ""),
+            engine_make=data.get("engine_make"),
+            engine_model=data.get("engine_model"),
+            odometer=data.get("odometer"),
+            engine_hours=data.get("engine_hours"),
+            status=data.get("status", "unknown"),
+            last_location=data.get("last_location"),
+            health_score=data.get("health_score"),
+            faults=[FaultCodeData.from_dict(f) for f in data.get("faults", [])],
+            extracted_at=datetime.fromisoformat(extracted_at) if extracted_at else datetime.now(),
+        )
+
 
 @dataclass
 class FaultCodeData:
@@ -88,6 +243,103 @@ class FaultCodeData:
         }
         return self.spn in critical_spns or self.severity == "critical"
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "vin": self.vin,
+            "spn": self.spn,
+            "fmi": self.fmi,
+            "source_address": self.source_address,
+            "description": self.description,
+            "severity": self.severity,
+            "is_active": self.is_active,
+            "first_seen": self.first_seen.isoformat() if self.first_seen else None,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "occurrence_count": self.occurrence_count,
+            "raw_text": self.raw_text,
+        }
+
+    @classmethod
+    def from_feed_record(cls, record: dict) -> Optional["FaultCodeData"]:
+        """
+        Create FaultCodeData from a row of a fleet-level fault feed.
+
+        Accepts the common field spellings (vin/asset_vin/asset.vin,
+        spn+fmi or a "SPN 110 FMI 0" code, active/is_active/status).
+
+        Returns:
+            FaultCodeData, or None if the record has no VIN or SPN/FMI.
+        """
+        asset = record.get("asset") if isinstance(record.get("asset"), dict) else {}
+        vin = record.get("vin") or record.get("asset_vin") or asset.get("vin")
+        if not vin:
+            return None
+
+        try:
+            spn, fmi = int(record["spn"]), int(record["fmi"])
+        except (KeyError, TypeError, ValueError):
+            match = re.search(
+                r"SPN[:\s]*(\d+).*?FMI[:\s]*(\d+)", str(record.get("code", "")), re.IGNORECASE
+            )
+            if not match:
+                return None
+            spn, fmi = int(match.group(1)), int(match.group(2))
+
+        is_active = record.get("is_active", record.get("active"))
+        if is_active is None:
+            is_active = str(record.get("status", "active")).lower() not in (
+                "inactive", "historical", "cleared", "resolved"
+            )
+        elif not isinstance(is_active, bool):
+            # Feeds send flags as strings or numbers too; bool("false") is True
+            is_active = str(is_active).strip().lower() in ("1", "true", "yes", "active")
+
+        severity = str(record.get("severity") or "unknown").lower()
+        if severity not in ("critical", "major", "minor", "info"):
+            severity = "unknown"
+
+        def timestamp(value) -> Optional[datetime]:
+            if not value:
+                return None
+            try:
+                return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                return None
+
+        description = str(record.get("description") or record.get("name") or "")
+        return cls(
+            vin=str(vin).strip().upper(),
+            spn=spn,
+            fmi=fmi,
+            source_address=int(record.get("source_address") or 0),
+            description=description[:500],
+            severity=severity,
+            is_active=is_active,
+            first_seen=timestamp(record.get("first_seen") or record.get("first_occurrence")),
+            last_seen=timestamp(record.get("last_seen") or record.get("last_occurrence")),
+            occurrence_count=int(record.get("occurrence_count") or record.get("count") or 1),
+            raw_text=description,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FaultCodeData":
+        """Create FaultCodeData from its to_dict() representation."""
+        first_seen = data.get("first_seen")
+        last_seen = data.get("last_seen")
+        return cls(
+            vin=data["vin"],
+            spn=data["spn"],
+            fmi=data["fmi"],
+            source_address=data.get("source_address", 0),
+            description=data.get("description", ""),
+            severity=data.get("severity", "unknown"),
+            is_active=data.get("is_active", True),
+            first_seen=datetime.fromisoformat(first_seen) if first_seen else None,
+            last_seen=datetime.fromisoformat(last_seen) if last_seen else None,
+            occurrence_count=data.get("occurrence_count", 1),
+            raw_text=data.get("raw_text", ""),
+        )
+
 
 @dataclass
 class SyncResult:
@@ -100,9 +352,31 @@ class SyncResult:
     faults_found: int = 0
     new_faults: int = 0
     critical_faults: int = 0
+    vehicles_synced: int = 0
+    vehicles_skipped: int = 0
+    deadline_reached: bool = False
+    memory_limit_reached: bool = False
+    context_recycles: int = 0
+    memory_peak_mb: Optional[float] = None
+    memory_avg_mb: Optional[float] = None
+    python_heap_peak_mb: Optional[float] = None  # only with heap tracing
+    vehicles_swept: int = 0  # faults taken from the fleet-wide sweep
+    sweep_requests: int = 0
+    enrichment_seconds: float = 0.0
+    rate_limit_wait_seconds: float = 0.0
+    fleet_health: Optional[dict] = None
+    phase_seconds: dict[str, float] = field(default_factory=dict)  # wall time per sync phase
+    error_classes: dict[str, int] = field(default_factory=dict)  # exception name -> count
+    vehicles: list[VehicleData] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
     success: bool = False
 
+    def add_error(self, message: str, error: Optional[BaseException] = None):
+        """Record an error message, counted under its exception class (or "Error")."""
+        self.errors.append(message)
+        error_class = type(error).__name__ if error is not None else "Error"
+        self.error_classes[error_class] = self.error_classes.get(error_class, 0) + 1
+
     @property
     def duration_seconds(self) -> Optional[float]:
         """Get sync duration in seconds."""
@@ -121,6 +395,53 @@ class SyncResult:
             "faults_found": self.faults_found,
             "new_faults": self.new_faults,
             "critical_faults": self.critical_faults,
+            "vehicles_synced": self.vehicles_synced,
+            "vehicles_skipped": self.vehicles_skipped,
+            "deadline_reached": self.deadline_reached,
+            "memory_limit_reached": self.memory_limit_reached,
+            "context_recycles": self.context_recycles,
+            "memory_peak_mb": self.memory_peak_mb,
+            "memory_avg_mb": self.memory_avg_mb,
+            "python_heap_peak_mb": self.python_heap_peak_mb,
+            "vehicles_swept": self.vehicles_swept,
+            "sweep_requests": self.sweep_requests,
+            "enrichment_seconds": self.enrichment_seconds,
+            "rate_limit_wait_seconds": self.rate_limit_wait_seconds,
+            "fleet_health": self.fleet_health,
+            "phase_seconds": self.phase_seconds,
+            "error_classes": self.error_classes,
             "errors": self.errors,
             "success": self.success,
         }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SyncResult":
+        """Create SyncResult from its serialized form (see serialization.encode_result)."""
+        completed_at = data.get("completed_at")
+        return cls(
+            tenant_id=data["tenant_id"],
+            started_at=datetime.fromisoformat(data["started_at"]),
+            completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+            vehicles_found=data.get("vehicles_found", 0),
+            faults_found=data.get("faults_found", 0),
+            new_faults=data.get("new_faults", 0),
+            critical_faults=data.get("critical_faults", 0),
+            vehicles_synced=data.get("vehicles_synced", 0),
+            vehicles_skipped=data.get("vehicles_skipped", 0),
+            deadline_reached=data.get("deadline_reached", False),
+            memory_limit_reached=data.get("memory_limit_reached", False),
+            context_recycles=data.get("context_recycles", 0),
+            memory_peak_mb=data.get("memory_peak_mb"),
+            memory_avg_mb=data.get("memory_avg_mb"),
+            python_heap_peak_mb=data.get("python_heap_peak_mb"),
+            vehicles_swept=data.get("vehicles_swept", 0),
+            sweep_requests=data.get("sweep_requests", 0),
+            enrichment_seconds=data.get("enrichment_seconds", 0.0),
+            rate_limit_wait_seconds=data.get("rate_limit_wait_seconds", 0.0),
+            fleet_health=data.get("fleet_health"),
+            phase_seconds=data.get("phase_seconds", {}),
+            error_classes=data.get("error_classes", {}),
+            vehicles=[VehicleData.from_dict(v) for v in data.get("vehicles", [])],
+            errors=data.get("errors", []),
+            success=data.get("success", False),
+        )
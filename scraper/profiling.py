@@ -0,0 +1,359 @@
+"""
+Outlier-triggered profiling of per-VIN fetches.
+
+Every VIN fetch runs under cProfile, but samples are only kept for the
+slowest VINs: a VIN counts as an outlier when its fetch took longer than
+the run's latency percentile (and at least a minimum number of seconds).
+For sources that can trace, Playwright tracing (screenshots, DOM
+snapshots, network) is not left on for the whole sync: it is armed once a
+VIN runs over the outlier threshold and then records the next few fetches,
+each as its own chunk, and optionally a random sample of fetches. Only the
+chunks of outlier VINs are kept, so the trace shows a slow fetch itself
+rather than a later re-fetch. The time the profiler adds per VIN is
+reported in the index.
+
+Output layout:
+    profiles/<tenant>/<YYYYmmdd-HHMMSS>/
+        index.json          # outliers, phase timings and top functions
+        <vin>.prof          # cProfile stats (python -m pstats <file>)
+        <vin>.trace.zip     # playwright show-trace <file>
+
+Usage:
+    profiler = OutlierProfiler(Path("profiles"))
+    result = scraper.export_all_data(profiler=profiler)
+
+    python -m scraper profile     # summarise the slowest VINs
+"""
+
+import cProfile
+import heapq
+import itertools
+import json
+import pstats
+import random
+import shutil
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MIN_SECONDS = 5.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_CAPTURES = 10
+DEFAULT_TRACE_WINDOW = 10  # Fetches traced after one ran over the threshold
+
+# Functions listed per outlier in the index
+TOP_FUNCTIONS = 8
+
+
+@dataclass
+class Measurement:
+    """Timing of one VIN fetch; the caller fills in the phase breakdown."""
+
+    vin: str
+    seconds: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    trace_file: Optional[Path] = None  # Trace chunk, kept while the VIN may be an outlier
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def top_functions(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list[dict]:
+    """
+    Get the functions with the most own time from a profile.
+
+    Args:
+        profile: Finished profile.
+        limit: Number of functions.
+
+    Returns:
+        Dicts with function ("file:line(name)"), calls, own_seconds and cumulative_seconds.
+    """
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{Path(filename).name}:{line}({name})",
+            "calls": calls,
+            "own_seconds": round(own, 4),
+            "cumulative_seconds": round(cumulative, 4),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+class OutlierProfiler:
+    """
+    Keep cProfile samples and Playwright traces for the slowest VINs of a sync.
+
+    Only the `max_captures` slowest profiles are held in memory during the
+    run; the percentile threshold is applied once all latencies are known.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path = Path("profiles"),
+        percentile: float = DEFAULT_PERCENTILE,
+        min_seconds: float = DEFAULT_MIN_SECONDS,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        max_captures: int = DEFAULT_MAX_CAPTURES,
+        trace: bool = True,
+        trace_window: int = DEFAULT_TRACE_WINDOW,
+        trace_sample: float = 0.0,
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            output_dir: Root directory for profile runs.
+            percentile: Latency percentile above which a VIN is an outlier.
+            min_seconds: VINs faster than this are never outliers.
+            min_samples: Below this many VINs, only min_seconds applies.
+            max_captures: Maximum outliers kept per run.
+            trace: Record fetches as Playwright trace chunks when the source can trace.
+            trace_window: Fetches traced after a fetch ran over the outlier
+                          threshold (0 disables arming).
+            trace_sample: Fraction of all other fetches traced at random.
+        """
+        self.output_dir = Path(output_dir)
+        self.percentile = percentile
+        self.min_seconds = min_seconds
+        self.min_samples = min_samples
+        self.max_captures = max_captures
+        self.trace = trace
+        self.trace_window = trace_window
+        self.trace_sample = trace_sample
+
+        self.tenant_id = "default"
+        self.run_dir: Optional[Path] = None
+        self.started_at: Optional[datetime] = None
+        self.latencies: list[float] = []
+        self._slowest: list = []  # min-heap of (seconds, seq, measurement, profile)
+        self._seq = itertools.count()
+        self._tracing = None  # Playwright Tracing currently started
+        self._tracing_failed = False
+        self._armed = 0  # Fetches left to trace in the current window
+        self._arm_threshold = min_seconds
+        self._random = random.Random()
+        self.traced = 0
+        self.overhead_seconds = 0.0  # Profiler time around fetches, tracing included
+
+    @property
+    def chunk_dir(self) -> Path:
+        """Directory holding trace chunks of possible outliers during a run."""
+        return self.run_dir / "chunks"
+
+    def start_run(self, tenant_id: str):
+        """Reset for a new sync."""
+        self.tenant_id = tenant_id
+        self.started_at = datetime.now()
+        self.run_dir = self.output_dir / tenant_id / self.started_at.strftime("%Y%m%d-%H%M%S")
+        self.latencies = []
+        self._slowest = []
+        self._tracing = None
+        self._tracing_failed = False
+        self._armed = 0
+        self._arm_threshold = self.min_seconds
+        self.traced = 0
+        self.overhead_seconds = 0.0
+
+    @contextmanager
+    def measure(self, vin: str, tracing=None):
+        """
+        Profile one VIN fetch; yields a Measurement for the phase breakdown.
+
+        Args:
+            vin: VIN being fetched.
+            tracing: Playwright Tracing of the browser context doing the
+                     fetch, or None. If tracing is armed or the fetch is
+                     sampled, it is recorded as a trace chunk, which is
+                     saved only if the VIN may be an outlier.
+        """
+        measurement = Measurement(vin)
+        began = time.perf_counter()
+        tracing = self._start_chunk(tracing, vin)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield measurement
+        finally:
+            profile.disable()
+            stopped = time.perf_counter()
+            measurement.seconds = stopped - started
+            if tracing is not None:
+                self._stop_chunk(tracing, measurement)
+            self._record(measurement, profile)
+            self.overhead_seconds += (started - began) + (time.perf_counter() - stopped)
+
+    def _wants_trace(self) -> bool:
+        """Whether the next fetch is traced: tracing is armed, or it is sampled."""
+        if self._armed > 0:
+            self._armed -= 1
+            return True
+        return self.trace_sample > 0 and self._random.random() < self.trace_sample
+
+    def _start_chunk(self, tracing, vin: str):
+        """Start a trace chunk, starting the trace first if needed. Returns the Tracing or None."""
+        if tracing is None or not self.trace or self._tracing_failed or not self._wants_trace():
+            return None
+        try:
+            if tracing is not self._tracing:
+                # Armed or sampled again, or the source recreated its browser context
+                tracing.start(screenshots=True, snapshots=True)
+                self._tracing = tracing
+            tracing.start_chunk(title=vin)
+            self.traced += 1
+            return tracing
+        except Exception as e:
+            print(f"  Tracing disabled for this run: {e}")
+            self._tracing_failed = True
+            return None
+
+    def _stop_chunk(self, tracing, measurement: Measurement):
+        """
+        Stop a trace chunk, saving it only if the fetch was slow enough to be
+        an outlier. The trace itself is stopped when no traced fetch follows.
+        """
+        try:
+            if measurement.seconds < self.min_seconds:
+                tracing.stop_chunk()
+            else:
+                self.chunk_dir.mkdir(parents=True, exist_ok=True)
+                trace_file = self.chunk_dir / f"{len(self.latencies)}-{measurement.vin}.trace.zip"
+                tracing.stop_chunk(path=str(trace_file))
+                measurement.trace_file = trace_file
+        except Exception as e:
+            print(f"  Could not save trace of {measurement.vin}: {e}")
+        if self._armed == 0 and measurement.seconds < self._arm_threshold:
+            self._stop_trace()
+
+    def _record(self, measurement: Measurement, profile: cProfile.Profile):
+        self.latencies.append(measurement.seconds)
+        if len(self.latencies) % max(1, self.min_samples) == 0:
+            self._arm_threshold = self.threshold
+        if measurement.seconds >= self._arm_threshold and self.trace:
+            self._armed = self.trace_window
+        if measurement.seconds < self.min_seconds:
+            return
+        entry = (measurement.seconds, next(self._seq), measurement, profile)
+        if len(self._slowest) < self.max_captures:
+            heapq.heappush(self._slowest, entry)
+            return
+        evicted = heapq.heappushpop(self._slowest, entry)[2]
+        if evicted.trace_file:
+            evicted.trace_file.unlink(missing_ok=True)
+            evicted.trace_file = None
+
+    def _stop_trace(self):
+        """Stop the trace between armed windows; saved chunks are kept."""
+        if self._tracing is not None:
+            try:
+                self._tracing.stop()
+            except Exception:
+                pass  # The browser context is already closed
+            self._tracing = None
+
+    def _stop_tracing(self):
+        """Stop the run's trace and drop chunks that were not kept."""
+        self._stop_trace()
+        if self.run_dir is not None:
+            shutil.rmtree(self.chunk_dir, ignore_errors=True)
+
+    @property
+    def threshold(self) -> float:
+        """Outlier threshold in seconds for the latencies seen so far."""
+        if len(self.latencies) < self.min_samples:
+            return self.min_seconds
+        return max(self.min_seconds, percentile(self.latencies, self.percentile))
+
+    def finish(self) -> list[dict]:
+        """
+        Save profiles (and trace chunks) for the run's outliers.
+
+        Returns:
+            Outlier entries as written to index.json, slowest first.
+        """
+        threshold = self.threshold
+        outliers = sorted(
+            (entry for entry in self._slowest if entry[0] > threshold),
+            key=lambda entry: entry[0],
+            reverse=True,
+        )
+        self._slowest = []
+        if not outliers:
+            self._stop_tracing()
+            return []
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for seconds, _, measurement, profile in outliers:
+            profile_file = self.run_dir / f"{measurement.vin}.prof"
+            profile.dump_stats(profile_file)
+
+            entry = {
+                "vin": measurement.vin,
+                "seconds": round(seconds, 3),
+                "phases": {name: round(value, 3) for name, value in measurement.phases.items()},
+                "top_functions": top_functions(profile),
+                "profile": profile_file.name,
+                "trace": None,
+            }
+
+            if measurement.trace_file:
+                trace_file = self.run_dir / f"{measurement.vin}.trace.zip"
+                measurement.trace_file.replace(trace_file)
+                entry["trace"] = trace_file.name
+
+            entries.append(entry)
+        self._stop_tracing()
+
+        index = {
+            "tenant_id": self.tenant_id,
+            "started_at": self.started_at.isoformat(),
+            "vins_measured": len(self.latencies),
+            "percentile": self.percentile,
+            "threshold_seconds": round(threshold, 3),
+            "p50_seconds": round(percentile(self.latencies, 50), 3),
+            "vins_traced": self.traced,
+            "overhead_seconds": round(self.overhead_seconds, 3),
+            "overhead_ms_per_vin": round(1000 * self.overhead_seconds / len(self.latencies), 2),
+            "outliers": entries,
+        }
+        with open(self.run_dir / "index.json", "w") as f:
+            json.dump(index, f, indent=2)
+        return entries
+
+
+def load_runs(output_dir: Path = Path("profiles"), tenant_id: Optional[str] = None) -> list[dict]:
+    """
+    Load every profile run index, newest first.
+
+    Args:
+        output_dir: Root directory for profile runs.
+        tenant_id: Only load this tenant's runs.
+
+    Returns:
+        Parsed index.json documents, each with a "run_dir" key added.
+    """
+    runs = []
+    for index_file in Path(output_dir).glob(f"{tenant_id or '*'}/*/index.json"):
+        try:
+            with open(index_file) as f:
+                run = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Skipping unreadable profile index {index_file}: {e}")
+            continue
+        run["run_dir"] = str(index_file.parent)
+        runs.append(run)
+    return sorted(runs, key=lambda run: run.get("started_at", ""), reverse=True)
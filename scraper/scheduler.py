@@ -0,0 +1,170 @@
+"""Priority-ordered VIN scheduling for sync runs."""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from .models import VehicleData
+
+
+# Priority classes, lowest value is visited first
+PRIORITY_CRITICAL = 0
+PRIORITY_ACTIVE = 1
+PRIORITY_STALE = 2
+PRIORITY_NORMAL = 3
+
+
+@dataclass
+class VINState:
+    """Per-VIN outcome of the last successful fault fetch."""
+
+    last_success: Optional[datetime] = None
+    critical_faults: int = 0
+    active_faults: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "critical_faults": self.critical_faults,
+            "active_faults": self.active_faults,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VINState":
+        """Create VINState from its JSON representation."""
+        last_success = data.get("last_success")
+        return cls(
+            last_success=datetime.fromisoformat(last_success) if last_success else None,
+            critical_faults=data.get("critical_faults", 0),
+            active_faults=data.get("active_faults", 0),
+        )
+
+
+class SyncScheduler:
+    """
+    Order VINs so the most important trucks are refreshed first.
+
+    Visit order:
+        1. VINs that had critical faults on their last successful fetch
+        2. VINs that had active (non-critical) faults
+        3. VINs not refreshed within `stale_after` (oldest first)
+        4. Everything else
+
+    State is kept in a small JSON file per tenant so priorities survive
+    between runs.
+
+    Usage:
+        scheduler = SyncScheduler.for_tenant("acme-trucking")
+        for vehicle in scheduler.order(vehicles):
+            vehicle.faults = scraper.get_faults(vehicle.vin)
+            scheduler.record(vehicle)
+        scheduler.save()
+    """
+
+    def __init__(
+        self,
+        state_file: Optional[Path] = None,
+        stale_after: timedelta = timedelta(hours=1),
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            state_file: Path of the JSON state file. Defaults to sync_state_default.json.
+            stale_after: Age after which a VIN without a refresh is considered stale.
+        """
+        self.state_file = Path(state_file or "sync_state_default.json")
+        self.stale_after = stale_after
+        self.states: dict[str, VINState] = {}
+        self.load()
+
+    @classmethod
+    def for_tenant(cls, tenant_id: str, directory: Path = Path("."), **kwargs) -> "SyncScheduler":
+        """Create a scheduler using the default state file for a tenant."""
+        return cls(Path(directory) / f"sync_state_{tenant_id}.json", **kwargs)
+
+    def load(self):
+        """Load VIN state from disk, ignoring a missing or corrupt file."""
+        if not self.state_file.exists():
+            return
+
+        try:
+            with open(self.state_file) as f:
+                data = json.load(f)
+            self.states = {
+                vin: VINState.from_dict(state) for vin, state in data.get("vins", {}).items()
+            }
+        except (OSError, ValueError) as e:
+            print(f"  Ignoring unreadable scheduler state: {e}")
+            self.states = {}
+
+    def save(self):
+        """Persist VIN state atomically."""
+        tmp_file = self.state_file.with_suffix(self.state_file.suffix + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(
+                {"vins": {vin: state.to_dict() for vin, state in self.states.items()}},
+                f,
+            )
+        tmp_file.replace(self.state_file)
+
+    def priority(self, vin: str, now: Optional[datetime] = None) -> int:
+        """
+        Get the priority class for a VIN.
+
+        Args:
+            vin: Vehicle VIN.
+            now: Reference time for staleness. Defaults to now.
+
+        Returns:
+            One of the PRIORITY_* constants.
+        """
+        state = self.states.get(vin)
+        if state is None or state.last_success is None:
+            return PRIORITY_STALE
+        if state.critical_faults:
+            return PRIORITY_CRITICAL
+        if state.active_faults:
+            return PRIORITY_ACTIVE
+        if (now or datetime.now()) - state.last_success > self.stale_after:
+            return PRIORITY_STALE
+        return PRIORITY_NORMAL
+
+    def order(self, vehicles: list[VehicleData]) -> list[VehicleData]:
+        """
+        Sort vehicles into visit order.
+
+        Within a priority class, the least recently refreshed VIN goes first.
+        The sort is stable, so ties keep the portal's order.
+
+        Args:
+            vehicles: Vehicles as returned by the asset list.
+
+        Returns:
+            New list in visit order.
+        """
+        now = datetime.now()
+
+        def sort_key(vehicle: VehicleData):
+            state = self.states.get(vehicle.vin)
+            last_success = state.last_success if state and state.last_success else datetime.min
+            return (self.priority(vehicle.vin, now), last_success)
+
+        return sorted(vehicles, key=sort_key)
+
+    def record(self, vehicle: VehicleData, when: Optional[datetime] = None):
+        """
+        Record a successful fault fetch for a vehicle.
+
+        Args:
+            vehicle: Vehicle with freshly fetched faults.
+            when: Time of the fetch. Defaults to now.
+        """
+        self.states[vehicle.vin] = VINState(
+            last_success=when or datetime.now(),
+            critical_faults=sum(1 for f in vehicle.faults if f.is_critical),
+            active_faults=sum(1 for f in vehicle.faults if f.is_active),
+        )
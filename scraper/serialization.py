@@ -0,0 +1,139 @@
+"""
+Typed JSON serialization of sync results.
+
+Full SyncResults (vehicles and faults included) are written with orjson when
+it is installed, which serializes the dataclasses and datetimes natively,
+and with the standard json module otherwise. Both produce the same
+document: the fields of each dataclass, with datetimes as ISO 8601 strings
+and `duration_seconds` added to the result. decode_result() turns that
+document back into typed objects.
+
+Next to each result file, write_result() also writes a summary (the result
+without its vehicles) so status checks don't parse the full document.
+
+Usage:
+    write_result(result, Path("sync_result.json"))
+    result = read_result(Path("sync_result.json"))
+    counters = read_summary(Path("sync_result.json"))
+"""
+
+import json
+from dataclasses import is_dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .models import SyncResult
+
+
+# Encoder in use: "orjson" or "json"
+BACKEND = "orjson" if orjson else "json"
+
+
+def _default(obj: Any) -> Any:
+    """Stdlib fallback for types orjson handles natively."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj) and hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False, fast: bool = True) -> bytes:
+    """
+    Encode an object to JSON bytes.
+
+    Args:
+        obj: Object to encode. Dataclasses with to_dict() and datetimes are supported.
+        indent: Pretty-print with two-space indentation.
+        fast: Use orjson if installed; False forces the standard library.
+
+    Returns:
+        UTF-8 encoded JSON.
+    """
+    if fast and orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=_default, indent=2 if indent else None).encode()
+
+
+def loads(data: Union[bytes, str], fast: bool = True) -> Any:
+    """Decode JSON bytes or text."""
+    if fast and orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_result(result: SyncResult, indent: bool = False, fast: bool = True) -> bytes:
+    """
+    Encode a full SyncResult, including vehicles and their faults.
+
+    Args:
+        result: Result to encode.
+        indent: Pretty-print with two-space indentation.
+        fast: Use orjson if installed.
+
+    Returns:
+        UTF-8 encoded JSON.
+    """
+    document = result.to_dict()
+    # Left as dataclasses so orjson can serialize them without building dicts
+    document["vehicles"] = result.vehicles
+    return dumps(document, indent=indent, fast=fast)
+
+
+def decode_result(data: Union[bytes, str], fast: bool = True) -> SyncResult:
+    """Decode a SyncResult written by encode_result()."""
+    return SyncResult.from_dict(loads(data, fast=fast))
+
+
+def summary_path(path: Path) -> Path:
+    """Get the summary file written next to a result file."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.summary{path.suffix}")
+
+
+def write_result(result: SyncResult, path: Path, indent: bool = True):
+    """Write a full SyncResult atomically, then its summary."""
+    path = Path(path)
+    tmp_file = path.with_suffix(path.suffix + ".tmp")
+    tmp_file.write_bytes(encode_result(result, indent=indent))
+    tmp_file.replace(path)
+
+    summary_file = summary_path(path)
+    tmp_file = summary_file.with_suffix(summary_file.suffix + ".tmp")
+    tmp_file.write_bytes(dumps(result.to_dict(), indent=indent))
+    tmp_file.replace(summary_file)
+
+
+def read_summary(path: Path) -> dict:
+    """
+    Read the counters of a result file without its vehicles.
+
+    Args:
+        path: Result file written by write_result().
+
+    Returns:
+        The result document without "vehicles". Taken from the summary file
+        when it is at least as new as the result, otherwise (results written
+        before summaries existed) from the full document.
+    """
+    path = Path(path)
+    summary_file = summary_path(path)
+    try:
+        if summary_file.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+            return loads(summary_file.read_bytes())
+    except (OSError, ValueError):
+        pass
+    document = loads(path.read_bytes())
+    document.pop("vehicles", None)
+    return document
+
+
+def read_result(path: Path) -> SyncResult:
+    """Read a SyncResult written by write_result()."""
+    return decode_result(Path(path).read_bytes())
@@ -0,0 +1,468 @@
+"""
+Memory-mapped fleet snapshots for the dashboard.
+
+Each sync publishes the tenant's latest result as one immutable binary file,
+so the dashboard can answer its queries without parsing the sync JSON:
+
+    header          magic, version, counts and section offsets
+    summary         the SyncResult counters and fleet health, as JSON
+    vehicle table   fixed-size records, one per vehicle, in sync order
+    VIN index       (VIN, row) pairs sorted by VIN, for binary search
+    fault table     fixed-size records, grouped by vehicle; each vehicle
+                    holds the start and length of its slice
+    string heap     UTF-8 text referenced by (offset, length) pairs
+
+Readers memory-map the file and view the tables as read-only numpy arrays,
+so opening a snapshot reads nothing but the header and summary, and only
+the rows a query touches are decoded. A new sync writes a temp file and
+renames it over the old one; readers that still hold the old snapshot keep
+its pages until they reopen, and SnapshotReader reopens when the file changes.
+
+A partial sync (deadline, stop request, memory limit or failed VINs) only
+holds the vehicles it visited, so the vehicles it missed are carried over
+from the previous snapshot with their last known data.
+
+Usage:
+    publish_snapshot(result, Path("snapshots"))
+
+    reader = SnapshotReader(Path("snapshots"))
+    reader.fleet_summary("acme-trucking")
+    reader.vehicle("acme-trucking", "1XKYD49X0NJ123456")
+    reader.critical_vehicles("acme-trucking")
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .models import FaultCodeData, SyncResult, VehicleData
+
+
+DEFAULT_DIR = Path("snapshots")
+SUFFIX = ".snapshot"
+
+SNAPSHOT_MAGIC = b"TSNP"
+SNAPSHOT_VERSION = 1
+
+# magic, version, reserved, vehicles, faults, then (offset, length) of the
+# summary, vehicle table, VIN index, fault table and string heap
+HEADER = struct.Struct("<4sHHII10Q")
+
+VIN_WIDTH = 17
+
+# Text fields are <name>_offset/<name>_length into the string heap;
+# NONE_LENGTH marks None
+NONE_LENGTH = 0xFFFFFFFF
+VEHICLE_TEXT = ("unit_number", "make", "model", "engine_make", "engine_model", "status")
+FAULT_TEXT = ("description", "severity", "raw_text")
+
+
+def _text_columns(names: tuple) -> list:
+    return [(f"{name}_{part}", "<u4") for name in names for part in ("offset", "length")]
+
+
+VEHICLE_DTYPE = np.dtype([
+    ("vin", f"S{VIN_WIDTH}"),
+    ("year", "<u2"),  # 0 = unknown
+    ("health_score", "<i2"),  # -1 = not scored
+    ("odometer", "<i8"),  # -1 = unknown
+    ("engine_hours", "<i8"),  # -1 = unknown
+    ("lat", "<f8"),  # NaN = no location
+    ("lng", "<f8"),
+    ("extracted_at", "<f8"),
+    ("fault_start", "<u4"),
+    ("fault_count", "<u4"),
+    ("active_faults", "<u2"),
+    ("critical_faults", "<u2"),  # active critical faults
+    *_text_columns(VEHICLE_TEXT),
+])
+
+INDEX_DTYPE = np.dtype([("vin", f"S{VIN_WIDTH}"), ("row", "<u4")])
+
+FAULT_DTYPE = np.dtype([
+    ("spn", "<i4"),
+    ("fmi", "<i2"),
+    ("source_address", "<i2"),
+    ("is_active", "?"),
+    ("is_critical", "?"),
+    ("occurrence_count", "<i4"),
+    ("first_seen", "<f8"),  # Unix seconds, NaN = unknown
+    ("last_seen", "<f8"),
+    *_text_columns(FAULT_TEXT),
+])
+
+
+def snapshot_path(directory: Path, tenant_id: str) -> Path:
+    """Path of a tenant's snapshot in a snapshot directory."""
+    return Path(directory) / f"{tenant_id}{SUFFIX}"
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return value.timestamp() if value else math.nan
+
+
+def _datetime(value: float) -> Optional[datetime]:
+    return None if math.isnan(value) else datetime.fromtimestamp(value)
+
+
+class _StringHeap:
+    """UTF-8 text buffer; repeated strings (makes, statuses) are stored once."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets: dict[str, tuple[int, int]] = {}
+
+    def add(self, text: Optional[str]) -> tuple[int, int]:
+        if text is None:
+            return 0, NONE_LENGTH
+        if text not in self._offsets:
+            encoded = text.encode()
+            self._offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self._offsets[text]
+
+
+def encode_snapshot(result: SyncResult, carried_over: list[VehicleData] = ()) -> bytes:
+    """
+    Encode a SyncResult as a snapshot file.
+
+    Vehicles whose VIN doesn't fit the fixed-width VIN column are left out
+    (and counted in the summary as `snapshot_skipped`).
+
+    Args:
+        result: Sync result with vehicles and faults.
+        carried_over: Vehicles the sync didn't reach, from the previous
+                      snapshot (counted in the summary as `snapshot_carried_over`).
+
+    Returns:
+        The snapshot file contents.
+    """
+    all_vehicles = [*result.vehicles, *carried_over]
+    vehicles = [v for v in all_vehicles if len(v.vin.encode()) <= VIN_WIDTH]
+    faults = [f for v in vehicles for f in v.faults]
+    heap = _StringHeap()
+
+    # Records are built as tuples in VEHICLE_DTYPE/FAULT_DTYPE field order
+    rows = []
+    fault_start = 0
+    for vehicle in vehicles:
+        location = vehicle.last_location or {}
+        rows.append((
+            vehicle.vin.encode(),
+            vehicle.year or 0,
+            -1 if vehicle.health_score is None else vehicle.health_score,
+            -1 if vehicle.odometer is None else vehicle.odometer,
+            -1 if vehicle.engine_hours is None else vehicle.engine_hours,
+            location.get("lat", math.nan),
+            location.get("lng", math.nan),
+            _timestamp(vehicle.extracted_at),
+            fault_start,
+            len(vehicle.faults),
+            sum(1 for f in vehicle.faults if f.is_active),
+            sum(1 for f in vehicle.faults if f.is_active and f.is_critical),
+            *(part for name in VEHICLE_TEXT for part in heap.add(getattr(vehicle, name))),
+        ))
+        fault_start += len(vehicle.faults)
+    table = np.array(rows, dtype=VEHICLE_DTYPE)
+
+    fault_table = np.array(
+        [
+            (
+                fault.spn,
+                fault.fmi,
+                fault.source_address,
+                fault.is_active,
+                fault.is_critical,
+                fault.occurrence_count,
+                _timestamp(fault.first_seen),
+                _timestamp(fault.last_seen),
+                *(part for name in FAULT_TEXT for part in heap.add(getattr(fault, name))),
+            )
+            for fault in faults
+        ],
+        dtype=FAULT_DTYPE,
+    )
+
+    index = np.zeros(len(vehicles), dtype=INDEX_DTYPE)
+    index["vin"] = table["vin"]
+    index["row"] = np.arange(len(vehicles), dtype=np.uint32)
+    index.sort(order="vin", kind="stable")
+
+    summary = result.to_dict()
+    summary["snapshot_skipped"] = len(all_vehicles) - len(vehicles)
+    summary["snapshot_carried_over"] = len(carried_over)
+
+    sections = [
+        json.dumps(summary).encode(),
+        table.tobytes(),
+        index.tobytes(),
+        fault_table.tobytes(),
+        bytes(heap.data),
+    ]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets += [position, len(section)]
+        position += len(section)
+
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(vehicles), len(faults), *offsets)
+    return b"".join([header, *sections])
+
+
+def write_snapshot(result: SyncResult, path: Path) -> Path:
+    """
+    Write a snapshot file atomically.
+
+    The file is renamed into place, never rewritten, so readers holding the
+    previous snapshot keep a consistent view of it. If the sync didn't reach
+    every vehicle, the missing ones are carried over from the snapshot being
+    replaced.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    carried_over = _missing_vehicles(result, path) if path.exists() else []
+    tmp_file = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    tmp_file.write_bytes(encode_snapshot(result, carried_over))
+    tmp_file.replace(path)
+    return path
+
+
+def _missing_vehicles(result: SyncResult, previous_file: Path) -> list[VehicleData]:
+    """Vehicles of the previous snapshot that a partial sync didn't reach."""
+    if result.vehicles_synced >= result.vehicles_found:
+        # A complete sync is the whole fleet; vehicles it didn't list are gone
+        return []
+    try:
+        previous = Snapshot(previous_file)
+    except ValueError:
+        return []
+    synced = np.array([v.vin.encode() for v in result.vehicles], dtype=f"S{VIN_WIDTH}")
+    missing = np.flatnonzero(~np.isin(previous.vehicles["vin"], synced))
+    return [previous.vehicle_at(row) for row in missing]
+
+
+def publish_snapshot(result: SyncResult, directory: Path = DEFAULT_DIR) -> Path:
+    """Publish a sync's result as its tenant's latest snapshot."""
+    return write_snapshot(result, snapshot_path(directory, result.tenant_id))
+
+
+class Snapshot:
+    """
+    One memory-mapped snapshot file.
+
+    `vehicles`, `vin_index` and `faults` are read-only numpy views of the
+    mapped file; nothing is copied until a vehicle is materialized.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Map a snapshot file.
+
+        Args:
+            path: Snapshot written by write_snapshot().
+
+        Raises:
+            ValueError: If the file isn't a snapshot of this version.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"Not a snapshot file: {self.path}")
+        magic, version, _, vehicles, faults, *offsets = HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Not a version {SNAPSHOT_VERSION} snapshot: {self.path}")
+
+        summary, table, index, fault_table, heap = zip(offsets[::2], offsets[1::2])
+        self._summary = json.loads(self._mmap[summary[0]:summary[0] + summary[1]])
+        self.vehicles = np.frombuffer(self._mmap, VEHICLE_DTYPE, vehicles, table[0])
+        self.vin_index = np.frombuffer(self._mmap, INDEX_DTYPE, vehicles, index[0])
+        self.faults = np.frombuffer(self._mmap, FAULT_DTYPE, faults, fault_table[0])
+        self._heap = memoryview(self._mmap)[heap[0]:heap[0] + heap[1]]
+        self._decoded: dict[tuple[int, int], str] = {}
+
+    @property
+    def tenant_id(self) -> str:
+        return self._summary["tenant_id"]
+
+    def _texts(self, refs: list) -> list[Optional[str]]:
+        """Decode flattened (offset, length) pairs from the string heap."""
+        texts = []
+        for offset, length in zip(refs[::2], refs[1::2]):
+            if length == NONE_LENGTH:
+                texts.append(None)
+                continue
+            # Heap strings are deduplicated, so makes, statuses and descriptions repeat
+            text = self._decoded.get((offset, length))
+            if text is None:
+                text = str(self._heap[offset:offset + length], "utf-8")
+                self._decoded[offset, length] = text
+            texts.append(text)
+        return texts
+
+    def fleet_summary(self) -> dict:
+        """
+        Get the fleet overview.
+
+        Returns:
+            The sync's SyncResult fields (without vehicles), plus vehicle
+            counts computed from the vehicle table: vehicles,
+            vehicles_with_active_faults, vehicles_with_critical_faults and
+            avg_health_score (None if no vehicle is scored).
+        """
+        scores = self.vehicles["health_score"]
+        scored = scores[scores >= 0]
+        return {
+            **self._summary,
+            "vehicles": len(self.vehicles),
+            "vehicles_with_active_faults": int(np.count_nonzero(self.vehicles["active_faults"])),
+            "vehicles_with_critical_faults": int(np.count_nonzero(self.vehicles["critical_faults"])),
+            "avg_health_score": round(float(scored.mean()), 1) if len(scored) else None,
+        }
+
+    def row(self, vin: str) -> Optional[int]:
+        """Find a vehicle's row in the vehicle table by binary search of the VIN index."""
+        key = vin.strip().upper().encode()
+        position = int(np.searchsorted(self.vin_index["vin"], key))
+        if position < len(self.vin_index) and self.vin_index["vin"][position] == key:
+            return int(self.vin_index["row"][position])
+        return None
+
+    def fault_slice(self, row: int) -> np.ndarray:
+        """A vehicle's fault records, as a view of the fault table."""
+        start, count = self.vehicles[["fault_start", "fault_count"]][row].item()
+        return self.faults[start:start + count]
+
+    def vehicle_at(self, row: int) -> VehicleData:
+        """Materialize one vehicle, with its faults."""
+        # Records are unpacked as Python tuples (in dtype field order); numpy
+        # per-field access is much slower
+        (
+            vin, year, health_score, odometer, engine_hours, lat, lng, extracted_at,
+            fault_start, fault_count, _, _, *text,
+        ) = self.vehicles[row].item()
+        vin = vin.decode()
+        unit_number, make, model, engine_make, engine_model, status = self._texts(text)
+
+        faults = []
+        for (
+            spn, fmi, source_address, is_active, _, occurrence_count, first_seen, last_seen, *text,
+        ) in self.faults[fault_start:fault_start + fault_count].tolist():
+            description, severity, raw_text = self._texts(text)
+            faults.append(FaultCodeData(
+                vin=vin,
+                spn=spn,
+                fmi=fmi,
+                source_address=source_address,
+                description=description,
+                severity=severity,
+                is_active=is_active,
+                first_seen=_datetime(first_seen),
+                last_seen=_datetime(last_seen),
+                occurrence_count=occurrence_count,
+                raw_text=raw_text,
+            ))
+
+        return VehicleData(
+            vin=vin,
+            unit_number=unit_number,
+            year=year or None,
+            make=make,
+            model=model,
+            engine_make=engine_make,
+            engine_model=engine_model,
+            odometer=odometer if odometer >= 0 else None,
+            engine_hours=engine_hours if engine_hours >= 0 else None,
+            status=status,
+            last_location=None if math.isnan(lat) else {"lat": lat, "lng": lng},
+            health_score=health_score if health_score >= 0 else None,
+            faults=faults,
+            extracted_at=_datetime(extracted_at),
+        )
+
+    def vehicle(self, vin: str) -> Optional[VehicleData]:
+        """Get one vehicle by VIN, or None if it isn't in the snapshot."""
+        row = self.row(vin)
+        return None if row is None else self.vehicle_at(row)
+
+    def critical_rows(self) -> np.ndarray:
+        """Rows of vehicles with active critical faults, most critical faults first."""
+        rows = np.flatnonzero(self.vehicles["critical_faults"])
+        return rows[np.argsort(-self.vehicles["critical_faults"][rows].astype(np.int32), kind="stable")]
+
+    def critical_vehicles(self) -> list[VehicleData]:
+        """Vehicles with active critical faults, most critical faults first."""
+        return [self.vehicle_at(row) for row in self.critical_rows()]
+
+
+class SnapshotReader:
+    """
+    Serves the latest snapshot of each tenant from a snapshot directory.
+
+    Each call checks the tenant's file and maps it again if a sync has
+    replaced it since; otherwise the mapped snapshot is reused. Callers that
+    need several answers from the same sync should take current() once.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_DIR):
+        """
+        Initialize reader.
+
+        Args:
+            directory: Directory snapshots are published to.
+        """
+        self.directory = Path(directory)
+        self._open: dict[str, tuple[tuple, Snapshot]] = {}
+        self._lock = threading.Lock()
+
+    def current(self, tenant_id: str) -> Optional[Snapshot]:
+        """
+        Get a tenant's latest snapshot.
+
+        Returns:
+            The snapshot, or None if the tenant has none.
+        """
+        path = snapshot_path(self.directory, tenant_id)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        # A rename always brings a new inode, even within the mtime resolution
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            opened = self._open.get(tenant_id)
+            if opened and opened[0] == key:
+                return opened[1]
+            # The replaced mapping is released once no caller holds it
+            snapshot = Snapshot(path)
+            self._open[tenant_id] = (key, snapshot)
+            return snapshot
+
+    def tenant_ids(self) -> list[str]:
+        """Tenants with a published snapshot."""
+        return sorted(p.name[:-len(SUFFIX)] for p in self.directory.glob(f"*{SUFFIX}"))
+
+    def fleet_summary(self, tenant_id: str) -> Optional[dict]:
+        """Fleet overview of a tenant's latest sync (see Snapshot.fleet_summary)."""
+        snapshot = self.current(tenant_id)
+        return snapshot.fleet_summary() if snapshot else None
+
+    def vehicle(self, tenant_id: str, vin: str) -> Optional[VehicleData]:
+        """One vehicle of a tenant's latest sync."""
+        snapshot = self.current(tenant_id)
+        return snapshot.vehicle(vin) if snapshot else None
+
+    def critical_vehicles(self, tenant_id: str) -> list[VehicleData]:
+        """Vehicles with active critical faults in a tenant's latest sync."""
+        snapshot = self.current(tenant_id)
+        return snapshot.critical_vehicles() if snapshot else []
@@ -0,0 +1,437 @@
+"""
+Fleet data sources.
+
+A DataSource lists a tenant's vehicles and fetches each vehicle's faults
+and details; export_all_data() runs the sync around it (VIN priority,
+deadlines, VIN decoding, fault events, memory checks, health scores,
+profiling), so every backend produces the same SyncResult.
+
+Backends:
+    TruckTechPlusScraper  - the PACCAR Solutions portal, through a browser
+    DecisivAPIClient      - the Decisiv SRM API, for tenants with API access
+
+Usage:
+    with DecisivAPIClient(client_id, client_secret) as source:
+        if source.login():
+            result = source.export_all_data(tenant_id="acme-trucking")
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Optional
+
+from .errors import RateLimited
+from .events import FAULT_APPEARED, FaultEventStream
+from .governor import RateGovernor
+from .health import HealthScorer
+from .memory import HARD_LIMIT, SOFT_LIMIT, MemoryWatchdog
+from .models import FaultCodeData, SyncResult, VehicleData
+from .profiling import OutlierProfiler
+from .scheduler import SyncScheduler
+from .vin import VinDecoder
+
+
+def page_is_last(data, page_number: int) -> Optional[bool]:
+    """
+    Read a JSON list page's pagination metadata.
+
+    Args:
+        data: Decoded page body.
+        page_number: 1-based number of the page.
+
+    Returns:
+        True if links.next is present and empty or meta.total_pages is
+        reached, False if they say more pages follow, None if the page
+        carries neither (a short page proves nothing: servers may cap the
+        page size below what was asked for).
+    """
+    if not isinstance(data, dict):
+        return None
+    links = data.get("links")
+    if isinstance(links, dict) and "next" in links:
+        return not links["next"]
+    meta = data.get("meta")
+    if isinstance(meta, dict) and meta.get("total_pages") is not None:
+        return page_number >= int(meta["total_pages"])
+    return None
+
+
+def sweep_fault_feed(
+    fetch: Callable,
+    url: str,
+    fleet_vins: set[str],
+    page_size: int = 500,
+    max_pages: int = 200,
+) -> tuple:
+    """
+    Page through a fleet-level JSON fault feed.
+
+    The feed only counts as read to the end when pagination metadata says
+    so (see page_is_last()) or a page comes back empty. Without metadata,
+    pages are requested until an empty one; a page identical to the
+    previous one (a server ignoring `page`) ends the sweep as incomplete.
+
+    Args:
+        fetch: fetch(url, params=...) returning a response with ok,
+               headers and json().
+        url: Feed URL.
+        fleet_vins: VINs of the fleet; rows for other VINs are ignored.
+        page_size: Rows asked for per page.
+        max_pages: Pages read at most.
+
+    Returns:
+        (faults by VIN or None if the feed doesn't exist, complete, last VIN, requests).
+    """
+    found: dict[str, list[FaultCodeData]] = {}
+    last_vin = None
+    previous = None
+
+    for page_number in range(1, max_pages + 1):
+        response = fetch(url, params={"page": page_number, "per_page": page_size})
+        content_type = response.headers.get("content-type", "")
+        if not response.ok or "json" not in content_type:
+            if page_number == 1:
+                return None, False, None, page_number
+            return found, False, last_vin, page_number
+
+        data = response.json()
+        if isinstance(data, dict):
+            records = data.get("data") or data.get("faults") or data.get("items") or []
+        else:
+            records = data
+        if not records:
+            return found, True, last_vin, page_number
+        if records == previous:
+            return found, False, last_vin, page_number
+        previous = records
+
+        for record in records:
+            fault = FaultCodeData.from_feed_record(record) if isinstance(record, dict) else None
+            if fault and fault.vin in fleet_vins:
+                found.setdefault(fault.vin, []).append(fault)
+                last_vin = fault.vin
+
+        last = page_is_last(data, page_number)
+        if last:
+            return found, True, last_vin, page_number
+
+    return found, False, last_vin, max_pages
+
+
+class DataSource(ABC):
+    """
+    Where vehicles and faults come from.
+
+    Subclasses implement login(), get_vehicles(), get_diagnostics() and
+    close(); the remaining hooks have defaults for sources without a
+    browser session.
+    """
+
+    MIN_VINS_PER_CONTEXT = 10  # VINs between memory-triggered context recycles
+
+    # Collect faults with sweep_faults() unless export_all_data() says otherwise
+    SWEEP_BY_DEFAULT = False
+
+    def __init__(self, governor: RateGovernor):
+        """
+        Initialize source.
+
+        Args:
+            governor: Rate governor for requests to the source's host.
+        """
+        self.governor = governor
+
+        # Time spent reading vehicle details during get_diagnostics(), and
+        # the phase breakdown of the last get_diagnostics() call
+        self.enrichment_seconds = 0.0
+        self.diagnostics_timings: dict[str, float] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @abstractmethod
+    def login(self) -> bool:
+        """
+        Authenticate with the source.
+
+        Returns:
+            True if login successful.
+
+        Raises:
+            LoginError: If login fails.
+        """
+
+    @abstractmethod
+    def get_vehicles(self) -> list[VehicleData]:
+        """
+        List the tenant's vehicles.
+
+        Raises:
+            SessionExpired: If the session is no longer valid.
+            ExtractionError: If the vehicle list can't be read.
+        """
+
+    @abstractmethod
+    def get_diagnostics(self, vehicle: VehicleData) -> VehicleData:
+        """
+        Fill a vehicle's faults and details in place.
+
+        Implementations add time spent on details to `enrichment_seconds`
+        and set `diagnostics_timings` to the phase breakdown.
+
+        Returns:
+            The same vehicle.
+        """
+
+    @abstractmethod
+    def close(self):
+        """Release connections and other resources."""
+
+    def ensure_logged_in(self) -> bool:
+        """Login only if there is no live session."""
+        return self.login()
+
+    def reset_session(self):
+        """Drop the current session so the next login re-validates it."""
+
+    def save_session(self):
+        """Persist the session for reuse, if the source has one."""
+
+    def recycle_context(self):
+        """Free memory held by the session between VINs, if possible."""
+
+    def sweep_faults(self, vehicles: list[VehicleData]) -> tuple[dict[str, list[FaultCodeData]], int]:
+        """
+        Collect faults for many VINs at once.
+
+        Returns:
+            (faults per covered VIN, number of requests made). The default
+            covers no VINs, so every VIN is fetched with get_diagnostics().
+        """
+        return {}, 0
+
+    @property
+    def tracing(self):
+        """Playwright Tracing of the current browser context, or None if the source can't trace."""
+        return None
+
+    def export_all_data(
+        self,
+        tenant_id: str = "default",
+        deadline: Optional[datetime] = None,
+        scheduler: Optional[SyncScheduler] = None,
+        stop_event: Optional[threading.Event] = None,
+        events: Optional[FaultEventStream] = None,
+        watchdog: Optional[MemoryWatchdog] = None,
+        health: Optional[HealthScorer] = None,
+        profiler: Optional[OutlierProfiler] = None,
+        sweep: Optional[bool] = None,
+    ) -> SyncResult:
+        """
+        Export all vehicle and fault data.
+
+        VINs are visited in priority order (critical/active faults first,
+        then stale VINs). When a deadline is given, the sync stops cleanly
+        before the next VIN once it has passed and returns a partial result
+        covering the VINs already visited.
+
+        Each VIN's faults are diffed against the previous snapshot as soon as
+        it is scraped, and change events are appended to the event queue.
+
+        Memory is checked between VINs: above the watchdog's soft limit the
+        source's session is recycled (the browser context is recreated);
+        above the hard limit the sync stops with a partial result.
+
+        Health scores are then recalculated for vehicles that raised fault
+        events; skipped vehicles keep their previous score.
+
+        Wall time per phase (vehicles, sweep, diagnostics, scoring,
+        profiling, save) goes to `phase_seconds`, with the per-VIN breakdown
+        of get_diagnostics() summed under "diagnostics.<phase>". Errors are
+        counted by exception class in `error_classes`.
+
+        Args:
+            tenant_id: Identifier for this sync operation.
+            deadline: Optional time after which no further VINs are fetched.
+            scheduler: VIN scheduler. Defaults to the tenant's state file.
+            stop_event: Optional event that, once set, stops the sync like a deadline.
+            events: Fault event stream. Defaults to the tenant's snapshot file.
+            watchdog: Memory watchdog. Defaults to sampling without limits.
+            health: Health scorer holding previous scores. Defaults to a new one.
+            profiler: Outlier profiler. Slow VINs keep their cProfile samples
+                      and, if the source can trace, the trace chunk of their
+                      fetch.
+            sweep: Collect faults with sweep_faults() first and only fetch
+                   diagnostics for VINs it didn't cover. Defaults to
+                   SWEEP_BY_DEFAULT.
+
+        Returns:
+            SyncResult with all extracted data.
+        """
+        result = SyncResult(tenant_id=tenant_id, started_at=datetime.now())
+        if sweep is None:
+            sweep = self.SWEEP_BY_DEFAULT
+        if profiler:
+            profiler.start_run(tenant_id)
+        scheduler = scheduler or SyncScheduler.for_tenant(tenant_id)
+        events = events or FaultEventStream.for_tenant(tenant_id)
+        watchdog = watchdog or MemoryWatchdog()
+        health = health or HealthScorer()
+        changed: set[str] = set()  # VINs with fault events, rescored below
+        last_recycle = 0
+        self.enrichment_seconds = 0.0
+        governor_wait = self.governor.wait_seconds
+        phase_started = time.monotonic()
+
+        def end_phase(name: str):
+            nonlocal phase_started
+            now = time.monotonic()
+            result.phase_seconds[name] = result.phase_seconds.get(name, 0.0) + now - phase_started
+            phase_started = now
+
+        try:
+            vehicles = scheduler.order(self.get_vehicles())
+            result.vehicles_found = len(vehicles)
+            decoded = VinDecoder.shared().apply(vehicles)
+            if decoded:
+                print(f"  Filled or corrected year/make of {decoded} vehicles from their VINs")
+            end_phase("vehicles")
+
+            swept: dict[str, list[FaultCodeData]] = {}
+            if sweep:
+                try:
+                    swept, result.sweep_requests = self.sweep_faults(vehicles)
+                except RateLimited as e:
+                    result.add_error(f"Fleet sweep stopped: {e}", e)
+                print(
+                    f"  Fleet sweep covered {len(swept)}/{len(vehicles)} vehicles "
+                    f"in {result.sweep_requests} requests"
+                )
+                end_phase("sweep")
+
+            for index, vehicle in enumerate(vehicles):
+                stopped = stop_event is not None and stop_event.is_set()
+                if stopped or (deadline and datetime.now() >= deadline):
+                    result.deadline_reached = True
+                    result.vehicles_skipped = len(vehicles) - index
+                    reason = "Stop requested" if stopped else "Deadline reached"
+                    print(f"  {reason}, skipping {result.vehicles_skipped} vehicles")
+                    break
+
+                memory_state = watchdog.check()
+                if memory_state == HARD_LIMIT:
+                    result.memory_limit_reached = True
+                    result.vehicles_skipped = len(vehicles) - index
+                    print(
+                        f"  Memory hard limit reached ({watchdog.peak_mb:.0f}MB), "
+                        f"skipping {result.vehicles_skipped} vehicles"
+                    )
+                    break
+                # Don't thrash if recreating the context didn't free enough
+                if memory_state == SOFT_LIMIT and index - last_recycle >= self.MIN_VINS_PER_CONTEXT:
+                    print("  Memory soft limit reached, recycling session")
+                    self.recycle_context()
+                    result.context_recycles += 1
+                    last_recycle = index
+
+                try:
+                    if vehicle.vin in swept:
+                        vehicle.faults = swept[vehicle.vin]
+                        result.vehicles_swept += 1
+                    elif profiler:
+                        with profiler.measure(vehicle.vin, tracing=self.tracing) as measurement:
+                            self.get_diagnostics(vehicle)
+                            measurement.phases = dict(self.diagnostics_timings)
+                    else:
+                        self.get_diagnostics(vehicle)
+                    if vehicle.vin not in swept:
+                        for name, seconds in self.diagnostics_timings.items():
+                            key = f"diagnostics.{name}"
+                            result.phase_seconds[key] = result.phase_seconds.get(key, 0.0) + seconds
+                    result.faults_found += len(vehicle.faults)
+                    result.critical_faults += sum(
+                        1 for f in vehicle.faults if f.is_critical
+                    )
+                    result.vehicles.append(vehicle)
+                    result.vehicles_synced += 1
+                    scheduler.record(vehicle)
+                    vehicle_events = events.process(tenant_id, vehicle)
+                    if vehicle_events:
+                        changed.add(vehicle.vin)
+                    result.new_faults += sum(1 for event in vehicle_events if event.event_type == FAULT_APPEARED)
+                except Exception as e:
+                    result.add_error(f"Failed to get faults for {vehicle.vin}: {e}", e)
+            end_phase("diagnostics")
+
+            # Without a baseline there are no events, so score everything
+            health.update(result.vehicles, changed=changed if events.has_baseline else None)
+            health.prune(v.vin for v in vehicles)
+            result.fleet_health = health.summary()
+            end_phase("scoring")
+
+            result.success = True
+
+        except Exception as e:
+            result.add_error(f"Sync failed: {e}", e)
+            result.success = False
+
+        # Snapshot before profiling so nothing after the VIN loop is counted
+        result.enrichment_seconds = self.enrichment_seconds
+
+        if profiler:
+            try:
+                outliers = profiler.finish()
+                if outliers:
+                    print(f"  Profiled {len(outliers)} slow VINs in {profiler.run_dir}")
+            except Exception as e:
+                result.add_error(f"Failed to save profiles: {e}", e)
+            end_phase("profiling")
+
+        try:
+            scheduler.save()
+        except OSError as e:
+            result.add_error(f"Failed to save scheduler state: {e}", e)
+
+        try:
+            events.save()
+        except OSError as e:
+            result.add_error(f"Failed to save fault snapshot: {e}", e)
+        end_phase("save")
+
+        watchdog.check()
+        result.memory_peak_mb = watchdog.peak_mb if watchdog.samples else None
+        result.memory_avg_mb = watchdog.average_mb
+        result.python_heap_peak_mb = watchdog.heap_peak_mb
+        result.rate_limit_wait_seconds = self.governor.wait_seconds - governor_wait
+        result.completed_at = datetime.now()
+
+        # Log summary
+        print(f"\nSync completed in {result.duration_seconds:.1f}s")
+        print(f"  Vehicles: {result.vehicles_synced}/{result.vehicles_found}")
+        print(f"  Faults: {result.faults_found} ({result.critical_faults} critical, {result.new_faults} new)")
+        if result.vehicles_synced:
+            per_vin_ms = 1000 * result.enrichment_seconds / result.vehicles_synced
+            print(f"  Vehicle details: {per_vin_ms:.0f}ms extra per vehicle")
+        if result.vehicles_swept:
+            print(f"  Fleet sweep: {result.vehicles_swept} vehicles without a page visit")
+        if result.rate_limit_wait_seconds >= 1:
+            print(f"  Rate governor: waited {result.rate_limit_wait_seconds:.1f}s")
+        if result.fleet_health and result.fleet_health["average_score"] is not None:
+            print(
+                f"  Health: avg {result.fleet_health['average_score']:.0f}, "
+                f"{result.fleet_health['risk_levels']['critical']} critical-risk vehicles"
+            )
+        if result.memory_peak_mb is not None:
+            heap = ""
+            if result.python_heap_peak_mb is not None:
+                heap = f", Python heap peak {result.python_heap_peak_mb:.0f}MB"
+            print(f"  Memory: peak {result.memory_peak_mb:.0f}MB, avg {result.memory_avg_mb:.0f}MB{heap}")
+        if result.errors:
+            print(f"  Errors: {len(result.errors)}")
+
+        return result
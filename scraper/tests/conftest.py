@@ -0,0 +1,159 @@
+"""
+Shared fixtures: a local stub of the Decisiv SRM API.
+
+The stub serves the endpoints DecisivAPIClient uses (token, paged assets,
+per-asset faults) over a real socket, with ETags so conditional requests
+can be checked, and records what it was asked for.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scraper.governor import RateGovernor
+
+
+TOKEN = "stub-token"
+
+
+class StubAPI:
+    """State and counters of the stub server."""
+
+    def __init__(self, assets: int = 250, delay: float = 0.005):
+        self.assets = [
+            {
+                "id": f"a{i}",
+                "attributes": {
+                    "vin": f"1XKYD49X0NJ{i:06d}",
+                    "unit_number": f"U{i}",
+                    "year": 2022,
+                    "make": "Kenworth",
+                    "model": "T680",
+                    "odometer": "123,456",
+                    "engine": {"make": "PACCAR", "model": "MX-13"},
+                },
+            }
+            for i in range(assets)
+        ]
+        self.delay = delay
+        self.token_requests = 0
+        self.gets = 0
+        self.not_modified = 0
+        self.max_concurrent = 0
+        self.reject_tokens = 0  # Answer 401 to this many authorized GETs
+        self.retry_after = None  # Answer 429 with this Retry-After while set
+        self.missing_faults = set()  # Asset indexes whose faults answer 404
+        self.stray_not_modified = 0  # Answer 304 to this many GETs, validators or not
+        self._concurrent = 0
+        self._lock = threading.Lock()
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def faults_for(self, index: int) -> list[dict]:
+        """Every third asset has one active critical fault."""
+        if index % 3:
+            return []
+        return [
+            {"spn": 110, "fmi": 0, "severity": "critical", "active": True, "description": "Coolant temp"}
+        ]
+
+    def respond(self, path: str, query: dict):
+        """Body for a GET, or None for 404."""
+        if path == "/v1/assets":
+            page = int(query.get("page", ["1"])[0])
+            per_page = int(query.get("per_page", ["100"])[0])
+            return {
+                "data": self.assets[(page - 1) * per_page:page * per_page],
+                "meta": {"total_pages": (len(self.assets) + per_page - 1) // per_page},
+            }
+        parts = path.split("/")
+        if len(parts) == 5 and parts[2] == "assets" and parts[4] == "faults":
+            if int(parts[3][1:]) in self.missing_faults:
+                return None
+            return {"data": self.faults_for(int(parts[3][1:])), "links": {"next": None}}
+        return None
+
+
+def _handler(api: StubAPI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # Headers and body are sent separately
+
+        def log_message(self, format, *args):
+            pass
+
+        def send(self, code: int, body=None, headers: dict = {}):
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(code)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with api._lock:
+                api.token_requests += 1
+            self.send(200, {"access_token": TOKEN, "expires_in": 3600})
+
+        def do_GET(self):
+            with api._lock:
+                api.gets += 1
+                api._concurrent += 1
+                api.max_concurrent = max(api.max_concurrent, api._concurrent)
+            try:
+                time.sleep(api.delay)
+                if api.retry_after is not None:
+                    return self.send(429, {}, {"Retry-After": str(api.retry_after)})
+                if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+                    return self.send(401, {})
+                with api._lock:
+                    if api.reject_tokens:
+                        api.reject_tokens -= 1
+                        return self.send(401, {})
+                    if api.stray_not_modified:
+                        api.stray_not_modified -= 1
+                        return self.send(304)
+
+                url = urlparse(self.path)
+                body = api.respond(url.path, parse_qs(url.query))
+                if body is None:
+                    return self.send(404, {})
+                etag = '"%08x"' % (hash(json.dumps(body, sort_keys=True)) & 0xFFFFFFFF)
+                if self.headers.get("If-None-Match") == etag:
+                    with api._lock:
+                        api.not_modified += 1
+                    return self.send(304, None, {"ETag": etag})
+                self.send(200, body, {"ETag": etag})
+            finally:
+                with api._lock:
+                    api._concurrent -= 1
+
+    return Handler
+
+
+@pytest.fixture
+def stub_api():
+    """A running stub API with 250 assets."""
+    api = StubAPI()
+    api.server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(api))
+    thread = threading.Thread(target=api.server.serve_forever, daemon=True)
+    thread.start()
+    yield api
+    api.server.shutdown()
+    api.server.server_close()
+
+
+@pytest.fixture
+def governor(tmp_path):
+    """A rate governor that never throttles the stub."""
+    return RateGovernor(tmp_path / "rate.json", rate=1000, burst=1000, max_concurrent=8)
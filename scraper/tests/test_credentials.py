@@ -0,0 +1,58 @@
+"""Tenant credentials from the encrypted repository, as the daemon uses them."""
+
+from scraper.credentials import TenantCredentialRepository
+from scraper.daemon import tenants_from_repository
+
+
+class ReversingStore:
+    """A credential store that "encrypts" by reversing, and counts decrypt passes."""
+
+    def __init__(self):
+        self.passes = 0
+
+    def encrypt(self, value: str) -> str:
+        return value[::-1]
+
+    def decrypt_many(self, encrypted: list[str]) -> list[bytearray]:
+        self.passes += 1
+        return [bytearray(value[::-1].encode()) for value in encrypted]
+
+
+def _repository(tmp_path) -> TenantCredentialRepository:
+    repo = TenantCredentialRepository(tmp_path / "tenant_credentials.json", store=ReversingStore())
+    repo.save("acme", "ops@acme", "hunter2", "JBSWY3DP")
+    repo.save("roadrunner", "ops@roadrunner", "meepmeep")
+    return repo
+
+
+def test_tenants_keep_only_their_ids(tmp_path):
+    repo = _repository(tmp_path)
+
+    tenants = tenants_from_repository(repo, interval=600, jitter=0)
+
+    assert [t.tenant_id for t in tenants] == ["acme", "roadrunner"]
+    assert repo.store.passes == 0
+    assert all(t.username == t.password == "" and t.totp_secret is None for t in tenants)
+    assert all(t.repository is repo for t in tenants)
+
+
+def test_logins_read_the_shared_cache(tmp_path):
+    repo = _repository(tmp_path)
+    acme, roadrunner = tenants_from_repository(repo)
+
+    assert acme.login_credentials() == ("ops@acme", "hunter2", "JBSWY3DP")
+    assert roadrunner.login_credentials() == ("ops@roadrunner", "meepmeep", None)
+    assert repo.store.passes == 1
+
+    repo.cache.clear()
+    assert acme.login_credentials()[1] == "hunter2"
+    assert repo.store.passes == 2
+
+
+def test_scraper_options_defer_to_the_repository(tmp_path):
+    acme = tenants_from_repository(_repository(tmp_path))[0]
+
+    options = acme.scraper_options()
+
+    assert options["password"] == ""
+    assert options["credentials_source"]() == ("ops@acme", "hunter2", "JBSWY3DP")
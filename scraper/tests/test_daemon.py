@@ -0,0 +1,103 @@
+"""SyncDaemon cycles for API tenants, against the local stub API."""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.request import urlopen
+
+from scraper.daemon import SyncDaemon, TenantConfig
+from scraper.ledger import SyncLedger
+from scraper.serialization import read_result
+
+
+@contextmanager
+def _first_cycle_done(daemon: SyncDaemon, timeout: float = 30.0):
+    """Run the daemon on a thread and stop it after its first cycle."""
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while not all(s.last_completed for s in daemon.status.values()):
+            assert time.monotonic() < deadline, "Daemon cycle did not complete"
+            time.sleep(0.05)
+        yield daemon
+    finally:
+        daemon.stop()
+        thread.join(timeout)
+
+
+def _tenant_health(health: dict, tenant_id: str) -> dict:
+    return next(t for t in health["tenants"] if t["tenant_id"] == tenant_id)
+
+
+def _api_tenant(tenant_id: str = "stub") -> TenantConfig:
+    return TenantConfig(
+        tenant_id=tenant_id,
+        username="",
+        password="",
+        jitter=0,
+        api_client_id="id",
+        api_client_secret="secret",
+    )
+
+
+def test_api_tenant_cycle_skips_the_browser(stub_api, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DECISIV_API_URL", stub_api.base_url)
+    monkeypatch.setenv("DECISIV_API_RATE_LIMIT", "1000")
+    daemon = SyncDaemon([_api_tenant()], output_dir=tmp_path, health_port=None, login_workers=0)
+
+    with _first_cycle_done(daemon):
+        health = daemon.health()
+
+    assert "playwright" not in sys.modules
+    assert daemon._browser is None
+    status = _tenant_health(health, "stub")
+    assert status["last_error"] is None
+    assert status["last_success"] is not None
+
+    result = read_result(tmp_path / "stub_sync.json")
+    assert result.success
+    assert result.vehicles_synced == 250
+    assert result.critical_faults == 84
+    assert (tmp_path / "snapshots" / "stub.snapshot").exists()
+    assert SyncLedger.for_directory(tmp_path).count() == 1
+
+
+def test_vin_errors_keep_the_session(stub_api, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DECISIV_API_URL", stub_api.base_url)
+    monkeypatch.setenv("DECISIV_API_RATE_LIMIT", "1000")
+    stub_api.missing_faults = {1, 2}
+    daemon = SyncDaemon([_api_tenant()], output_dir=tmp_path, health_port=None, login_workers=0)
+
+    with _first_cycle_done(daemon):
+        health = daemon.health()
+        token = daemon._scrapers["stub"]._token
+
+    status = _tenant_health(health, "stub")
+    assert status["last_success"] is not None
+    assert status["failures"] == 0
+    assert "Failed to get faults" in status["last_error"]
+    assert token is not None
+
+    result = read_result(tmp_path / "stub_sync.json")
+    assert result.vehicles_synced == 248
+    assert len(result.errors) == 2
+
+
+def test_health_endpoint_reports_api_tenants(stub_api, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DECISIV_API_URL", stub_api.base_url)
+    monkeypatch.setenv("DECISIV_API_RATE_LIMIT", "1000")
+    daemon = SyncDaemon([_api_tenant()], output_dir=tmp_path, health_port=0, login_workers=0)
+
+    with _first_cycle_done(daemon):
+        port = daemon._health_server.server_port
+        with urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+            health = json.load(response)
+
+    assert health["status"] == "ok"
+    assert _tenant_health(health, "stub")["runs"] == 1
@@ -0,0 +1,110 @@
+"""DecisivAPIClient against the local stub API."""
+
+import pytest
+
+from scraper.decisiv_api import DecisivAPIClient
+from scraper.errors import RateLimited
+
+
+@pytest.fixture
+def client(stub_api, governor):
+    with DecisivAPIClient("id", "secret", base_url=stub_api.base_url, max_workers=4, governor=governor) as source:
+        source.login()
+        yield source
+
+
+def test_get_vehicles_reads_every_page(client, stub_api):
+    vehicles = client.get_vehicles()
+
+    assert len(vehicles) == 250
+    assert stub_api.gets == 3
+    assert [v.vin for v in vehicles] == [a["attributes"]["vin"] for a in stub_api.assets]
+
+
+def test_vehicle_details_are_mapped(client):
+    vehicle = client.get_vehicles()[0]
+
+    assert vehicle.unit_number == "U0"
+    assert (vehicle.year, vehicle.make, vehicle.model) == (2022, "Kenworth", "T680")
+    assert vehicle.odometer == 123456
+    assert (vehicle.engine_make, vehicle.engine_model) == ("PACCAR", "MX-13")
+
+
+def test_sweep_faults_covers_every_vehicle(client):
+    vehicles = client.get_vehicles()
+
+    found, requests = client.sweep_faults(vehicles)
+
+    assert requests == 250
+    assert set(found) == {v.vin for v in vehicles}
+    faulted = [vin for vin, faults in found.items() if faults]
+    assert len(faulted) == 84
+    fault = found[vehicles[0].vin][0]
+    assert (fault.vin, fault.spn, fault.fmi) == (vehicles[0].vin, 110, 0)
+    assert fault.is_active and fault.is_critical
+
+
+def test_fault_requests_are_bounded(client, stub_api):
+    client.sweep_faults(client.get_vehicles())
+
+    assert 1 < stub_api.max_concurrent <= client.max_workers
+
+
+def test_repeated_requests_are_conditional(client, stub_api):
+    first = client.get_vehicles()
+    second = client.get_vehicles()
+
+    assert stub_api.not_modified == 3
+    assert client.not_modified == 3
+    assert [(v.vin, v.odometer) for v in first] == [(v.vin, v.odometer) for v in second]
+
+
+def test_cache_is_sized_to_the_fleet(client):
+    client.sweep_faults(client.get_vehicles())
+
+    assert client.cache_entries >= 250 + 3
+    assert len(client._cache) == 250 + 3
+
+
+def test_cache_evicts_least_recently_used(stub_api, governor):
+    with DecisivAPIClient("id", "secret", base_url=stub_api.base_url, governor=governor, cache_entries=2) as source:
+        source.get_vehicles()
+        source.get_vehicles()
+
+        assert len(source._cache) == 2
+        assert stub_api.not_modified == 0  # Each page was evicted before it came round again
+
+
+def test_not_modified_without_a_cached_body_is_refetched(client, stub_api):
+    stub_api.stray_not_modified = 1
+
+    assert len(client.get_vehicles()) == 250
+    assert stub_api.gets == 4
+    assert client.not_modified == 0
+
+
+def test_rejected_token_is_renewed(client, stub_api):
+    stub_api.reject_tokens = 1
+
+    assert len(client.get_vehicles()) == 250
+    assert stub_api.token_requests == 2
+
+
+def test_rate_limit_raises_with_retry_after(client, stub_api):
+    stub_api.retry_after = 7
+
+    with pytest.raises(RateLimited) as raised:
+        client.get_vehicles()
+    assert raised.value.retry_after == 7
+
+
+def test_export_all_data_sweeps_without_a_browser(client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    result = client.export_all_data(tenant_id="stub")
+
+    assert result.success
+    assert result.vehicles_synced == result.vehicles_swept == 250
+    assert result.faults_found == result.critical_faults == 84
+    assert result.sweep_requests == 250
+    assert not result.errors
@@ -0,0 +1,112 @@
+"""Fault change events and the consumer cursor of the event queue."""
+
+import pytest
+
+from scraper.events import (
+    FAULT_APPEARED,
+    FAULT_CLEARED,
+    FAULT_INACTIVE,
+    SEVERITY_ESCALATED,
+    EventQueue,
+    FaultEventStream,
+)
+from scraper.models import FaultCodeData, VehicleData
+
+
+VIN = "1XKYD49X0NJ000001"
+
+
+def _vehicle(*faults: tuple) -> VehicleData:
+    """A vehicle with faults given as (spn, fmi, severity, is_active)."""
+    return VehicleData(
+        vin=VIN,
+        unit_number="1",
+        faults=[
+            FaultCodeData(vin=VIN, spn=spn, fmi=fmi, severity=severity, is_active=active)
+            for spn, fmi, severity, active in faults
+        ],
+    )
+
+
+@pytest.fixture
+def stream(tmp_path):
+    """A stream whose baseline has four active faults on one VIN."""
+    baseline = FaultEventStream.for_tenant("stub", tmp_path)
+    assert baseline.process("stub", _vehicle(
+        (110, 0, "major", True),
+        (100, 1, "minor", True),
+        (190, 2, "minor", True),
+        (94, 3, "major", True),
+    )) == []
+    baseline.save()
+    return FaultEventStream.for_tenant("stub", tmp_path)
+
+
+def test_first_sync_only_records_a_baseline(tmp_path):
+    stream = FaultEventStream.for_tenant("stub", tmp_path)
+
+    assert stream.process("stub", _vehicle((110, 0, "critical", True))) == []
+    assert not stream.queue.file_path.exists()
+
+
+def test_changes_become_events(stream):
+    events = stream.process("stub", _vehicle(
+        (110, 0, "major", True),  # unchanged
+        (100, 1, "critical", True),  # escalated
+        (190, 2, "minor", False),  # went inactive
+        (3364, 4, "major", True),  # new
+        # 94/3 is gone: cleared
+    ))
+
+    assert [(e.event_type, e.spn) for e in events] == [
+        (SEVERITY_ESCALATED, 100),
+        (FAULT_INACTIVE, 190),
+        (FAULT_APPEARED, 3364),
+        (FAULT_CLEARED, 94),
+    ]
+    escalated = events[0]
+    assert (escalated.previous_severity, escalated.severity) == ("minor", "critical")
+    assert events[2].is_critical  # SPN 3364 is a derate condition
+    assert [e.event_type for e in stream.queue.read("alerts").events] == [e.event_type for e in events]
+
+
+def test_reactivated_code_appears_again(stream):
+    stream.process("stub", _vehicle((110, 0, "major", False)))
+
+    events = stream.process("stub", _vehicle((110, 0, "major", True)))
+
+    assert [(e.event_type, e.spn) for e in events] == [(FAULT_APPEARED, 110)]
+
+
+def test_consumer_cursor_redelivers_until_acked(stream):
+    stream.process("stub", _vehicle())  # all four cleared
+    queue = stream.queue
+
+    first = queue.read("alerts", limit=3)
+    assert len(first.events) == 3
+    assert queue.read("alerts", limit=3).events == first.events  # not acked yet
+
+    queue.ack("alerts", first)
+    rest = queue.read("alerts", limit=3)
+    assert [e.spn for e in rest.events] == [94]
+    assert rest.events[0].offset == first.next_offset
+
+    queue.ack("alerts", rest)
+    assert queue.read("alerts").events == []
+    assert len(queue.read("audit").events) == 4  # consumers are independent
+    assert queue.cursor("alerts") == queue.file_path.stat().st_size
+
+
+def test_partial_trailing_line_is_not_delivered(tmp_path):
+    queue = EventQueue(tmp_path / "fault_events.jsonl")
+    stream = FaultEventStream(tmp_path / "snapshot.json", queue)
+    stream.save()
+    stream.process("stub", _vehicle((110, 0, "major", True)))
+    with open(queue.file_path, "ab") as f:
+        f.write(b'{"event_type": "fault_appeared", "tenant_id": "st')
+
+    batch = queue.read("alerts")
+
+    assert [e.spn for e in batch.events] == [110]
+    queue.ack("alerts", batch)
+    assert queue.read("alerts").events == []
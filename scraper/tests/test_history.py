@@ -0,0 +1,95 @@
+"""Fault history queries before and after compaction."""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from scraper.history import COMPACTED_FILE, FAULTS, HistoryStore
+from scraper.models import FaultCodeData, SyncResult, VehicleData
+
+
+VIN_A = "1XKYD49X0NJ000001"
+VIN_B = "1XKYD49X0NJ000002"
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def _snapshot(day: date, hour: int, minute: int, faults: dict) -> SyncResult:
+    """A sync result with faults given per VIN as (spn, fmi, severity)."""
+    at = datetime.combine(day, time(hour, minute))
+    result = SyncResult(tenant_id="stub", started_at=at, completed_at=at, success=True)
+    for vin, codes in faults.items():
+        result.vehicles.append(VehicleData(
+            vin=vin,
+            unit_number=vin[-1],
+            faults=[FaultCodeData(vin=vin, spn=spn, fmi=fmi, severity=severity) for spn, fmi, severity in codes],
+        ))
+    return result
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history")
+    store.append(_snapshot(YESTERDAY, 10, 0, {VIN_A: [(110, 0, "major")], VIN_B: []}))
+    store.append(_snapshot(YESTERDAY, 10, 15, {VIN_A: [(110, 0, "critical")], VIN_B: [(100, 1, "minor")]}))
+    store.append(_snapshot(TODAY, 9, 0, {VIN_A: [(110, 0, "major")]}))
+    return store
+
+
+def _queries(store: HistoryStore) -> dict:
+    return {
+        "vin_history": store.vin_history(VIN_A).to_pylist(),
+        "spn_occurrences": store.spn_occurrences(110, days=7).to_pylist(),
+        "daily_fault_counts": store.daily_fault_counts(tenant_id="stub").to_pylist(),
+    }
+
+
+def test_queries_answer_the_same_after_compaction(store):
+    before = _queries(store)
+
+    assert store.compact("stub") == 2  # yesterday's vehicles and faults; today stays open
+
+    faults_dir = store._partition_dir(FAULTS, "stub", YESTERDAY)
+    assert [f.name for f in faults_dir.glob("*.parquet")] == [COMPACTED_FILE]
+    assert len(list(store._partition_dir(FAULTS, "stub", TODAY).glob("part-*.parquet"))) == 1
+    assert _queries(store) == before
+
+
+def test_vin_history_after_compaction(store):
+    store.compact("stub")
+
+    rows = store.vin_history(VIN_A).to_pylist()
+
+    assert [(r["snapshot_at"].date(), r["spn"], r["severity"]) for r in rows] == [
+        (YESTERDAY, 110, "major"),
+        (YESTERDAY, 110, "critical"),
+        (TODAY, 110, "major"),
+    ]
+    assert store.vin_history(VIN_A, since=TODAY).num_rows == 1
+
+
+def test_spn_occurrences_after_compaction(store):
+    store.compact("stub")
+
+    rows = store.spn_occurrences(110, days=7).to_pylist()
+
+    assert [(r["date"], r["vin"], r["snapshots"], r["severity"], r["is_critical"]) for r in rows] == [
+        (YESTERDAY, VIN_A, 2, "critical", True),  # last severity, critical in any snapshot
+        (TODAY, VIN_A, 1, "major", False),
+    ]
+    assert rows[0]["first_snapshot_at"] == datetime.combine(YESTERDAY, time(10, 0))
+    assert rows[0]["last_snapshot_at"] == datetime.combine(YESTERDAY, time(10, 15))
+    assert store.spn_occurrences(100, days=7).num_rows == 1
+
+
+def test_daily_fault_counts_after_compaction(store):
+    store.compact("stub")
+
+    rows = store.daily_fault_counts(tenant_id="stub").to_pylist()
+
+    # A code seen in both of yesterday's snapshots counts once
+    assert rows == [
+        {"date": YESTERDAY, "faults": 2, "critical_faults": 1, "vehicles": 2},
+        {"date": TODAY, "faults": 1, "critical_faults": 0, "vehicles": 1},
+    ]
+    assert store.daily_fault_counts(tenant_id="stub", since=TODAY).num_rows == 1
@@ -0,0 +1,35 @@
+"""Parsing of fault feed records."""
+
+import pytest
+
+from scraper.models import FaultCodeData
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (True, True),
+        (False, False),
+        (1, True),
+        (0, False),
+        ("true", True),
+        ("False", False),
+        ("0", False),
+        ("1", True),
+        (" yes ", True),
+        ("no", False),
+        ("active", True),
+        ("inactive", False),
+        ("", False),
+    ],
+)
+def test_is_active_flag_is_parsed(value, expected):
+    fault = FaultCodeData.from_feed_record({"vin": "1xkyd49x0nj123456", "spn": 110, "fmi": 0, "is_active": value})
+
+    assert fault.is_active is expected
+
+
+def test_status_is_used_without_a_flag():
+    record = {"vin": "1XKYD49X0NJ123456", "code": "SPN 110 FMI 0", "status": "Cleared"}
+
+    assert FaultCodeData.from_feed_record(record).is_active is False
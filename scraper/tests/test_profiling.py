@@ -0,0 +1,91 @@
+"""OutlierProfiler tracing windows and overhead reporting."""
+
+import json
+import time
+from pathlib import Path
+
+from scraper.profiling import OutlierProfiler
+
+
+class RecordingTracing:
+    """Records the Playwright Tracing calls the profiler makes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def start(self, **options):
+        self.calls.append("start")
+
+    def start_chunk(self, title=None):
+        self.calls.append(f"chunk {title}")
+
+    def stop_chunk(self, path=None):
+        if path:
+            Path(path).write_bytes(b"trace")
+        self.calls.append("stop_chunk")
+
+    def stop(self):
+        self.calls.append("stop")
+
+
+def _fetch(profiler, tracing, vin, seconds=0.0):
+    with profiler.measure(vin, tracing=tracing):
+        time.sleep(seconds)
+
+
+def _profiler(tmp_path, **options) -> OutlierProfiler:
+    profiler = OutlierProfiler(tmp_path, min_seconds=0.05, min_samples=100, trace_window=2, **options)
+    profiler.start_run("stub")
+    return profiler
+
+
+def test_tracing_is_armed_by_a_slow_fetch(tmp_path):
+    profiler = _profiler(tmp_path)
+    tracing = RecordingTracing()
+
+    for i in range(5):
+        _fetch(profiler, tracing, f"fast{i}")
+    assert tracing.calls == []
+
+    _fetch(profiler, tracing, "slow", 0.06)
+    _fetch(profiler, tracing, "next0")
+    _fetch(profiler, tracing, "next1", 0.06)
+    _fetch(profiler, tracing, "next2")
+    _fetch(profiler, tracing, "next3")
+    _fetch(profiler, tracing, "after")
+
+    # next1 was slow too and re-armed the window for next2 and next3
+    assert tracing.calls == [
+        "start", "chunk next0", "stop_chunk",
+        "chunk next1", "stop_chunk",
+        "chunk next2", "stop_chunk",
+        "chunk next3", "stop_chunk", "stop",
+    ]
+    assert profiler.traced == 4
+
+
+def test_sampled_fetches_are_traced(tmp_path):
+    profiler = _profiler(tmp_path, trace_sample=1.0)
+    tracing = RecordingTracing()
+
+    _fetch(profiler, tracing, "a")
+    _fetch(profiler, tracing, "b")
+
+    assert tracing.calls == ["start", "chunk a", "stop_chunk", "stop", "start", "chunk b", "stop_chunk", "stop"]
+
+
+def test_index_reports_overhead(tmp_path):
+    profiler = _profiler(tmp_path)
+    tracing = RecordingTracing()
+    _fetch(profiler, tracing, "slow", 0.06)
+    _fetch(profiler, tracing, "traced", 0.06)
+    _fetch(profiler, tracing, "fast")
+
+    outliers = profiler.finish()
+
+    assert {o["vin"]: o["trace"] for o in outliers} == {"slow": None, "traced": "traced.trace.zip"}
+    index = json.loads((profiler.run_dir / "index.json").read_text())
+    assert index["vins_measured"] == 3
+    assert index["vins_traced"] == 2
+    assert 0 < index["overhead_ms_per_vin"] < 50
+    assert not profiler.chunk_dir.exists()
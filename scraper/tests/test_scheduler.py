@@ -0,0 +1,69 @@
+"""Deadline-aware, priority-ordered syncs against the local stub API."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from scraper.decisiv_api import DecisivAPIClient
+from scraper.scheduler import PRIORITY_CRITICAL, PRIORITY_STALE, SyncScheduler
+from scraper.serialization import read_result, write_result
+
+
+@pytest.fixture
+def client(stub_api, governor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stub_api.delay = 0.02
+    with DecisivAPIClient("id", "secret", base_url=stub_api.base_url, max_workers=1, governor=governor) as source:
+        source.login()
+        yield source
+
+
+def test_deadline_stop_returns_a_valid_partial_result(client, tmp_path):
+    scheduler = SyncScheduler.for_tenant("stub", tmp_path)
+
+    result = client.export_all_data(
+        tenant_id="stub",
+        deadline=datetime.now() + timedelta(seconds=0.5),
+        scheduler=scheduler,
+        sweep=False,
+    )
+
+    assert result.success and not result.errors
+    assert result.deadline_reached
+    assert 0 < result.vehicles_synced < 250
+    assert result.vehicles_synced + result.vehicles_skipped == result.vehicles_found == 250
+    assert len(result.vehicles) == result.vehicles_synced
+    assert result.completed_at is not None
+
+    write_result(result, tmp_path / "partial.json")
+    reread = read_result(tmp_path / "partial.json")
+    assert (reread.deadline_reached, reread.vehicles_synced, reread.vehicles_skipped) == (
+        True,
+        result.vehicles_synced,
+        result.vehicles_skipped,
+    )
+    assert [v.vin for v in reread.vehicles] == [v.vin for v in result.vehicles]
+
+    # Only visited VINs are recorded, so the skipped ones stay stale
+    assert set(SyncScheduler.for_tenant("stub", tmp_path).states) == {v.vin for v in result.vehicles}
+
+
+def test_next_run_starts_with_critical_then_skipped_vins(client, tmp_path):
+    first = client.export_all_data(
+        tenant_id="stub",
+        deadline=datetime.now() + timedelta(seconds=0.5),
+        sweep=False,
+    )
+    visited = {v.vin for v in first.vehicles}
+    critical = {v.vin for v in first.vehicles if any(f.is_critical for f in v.faults)}
+
+    scheduler = SyncScheduler.for_tenant("stub", tmp_path)
+    order = scheduler.order(client.get_vehicles())
+    priorities = [scheduler.priority(v.vin) for v in order]
+
+    assert priorities == sorted(priorities)
+    assert {v.vin for v in order[: len(critical)]} == critical
+    assert all(p == PRIORITY_CRITICAL for p in priorities[: len(critical)])
+    skipped = order[len(critical): len(critical) + first.vehicles_skipped]
+    assert all(scheduler.priority(v.vin) == PRIORITY_STALE for v in skipped)
+    assert not visited & {v.vin for v in skipped}
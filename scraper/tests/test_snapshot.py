@@ -0,0 +1,76 @@
+"""Snapshot publishing: carry-over of unvisited vehicles and the atomic swap."""
+
+from datetime import datetime
+
+import pytest
+
+from scraper.models import FaultCodeData, SyncResult, VehicleData
+from scraper.snapshot import SnapshotReader, publish_snapshot, snapshot_path
+
+
+VINS = [f"1XKYD49X0NJ{i:06d}" for i in range(5)]
+
+
+def _result(vins: list[str], found: int, odometer: int) -> SyncResult:
+    """A sync that visited `vins` out of a fleet of `found`."""
+    result = SyncResult(tenant_id="stub", started_at=datetime.now(), completed_at=datetime.now(), success=True)
+    for vin in vins:
+        faults = [FaultCodeData(vin=vin, spn=3364, fmi=4, severity="critical")] if vin == VINS[0] else []
+        result.vehicles.append(VehicleData(vin=vin, unit_number=vin[-2:], odometer=odometer, faults=faults))
+    result.vehicles_found = found
+    result.vehicles_synced = len(vins)
+    result.vehicles_skipped = found - len(vins)
+    return result
+
+
+@pytest.fixture
+def reader(tmp_path):
+    publish_snapshot(_result(VINS, found=5, odometer=1000), tmp_path)
+    return SnapshotReader(tmp_path)
+
+
+def test_partial_sync_carries_unvisited_vehicles_over(reader, tmp_path):
+    publish_snapshot(_result(VINS[1:3], found=5, odometer=2000), tmp_path)
+
+    snapshot = reader.current("stub")
+    assert len(snapshot.vehicles) == 5
+    assert {vin: snapshot.vehicle(vin).odometer for vin in VINS} == {
+        VINS[0]: 1000, VINS[1]: 2000, VINS[2]: 2000, VINS[3]: 1000, VINS[4]: 1000,
+    }
+    # Carried-over vehicles keep their faults, so they stay on the critical list
+    assert [v.vin for v in snapshot.critical_vehicles()] == [VINS[0]]
+    assert snapshot.fleet_summary()["vehicles_synced"] == 2
+
+
+def test_complete_sync_drops_vehicles_no_longer_listed(reader, tmp_path):
+    publish_snapshot(_result(VINS[1:], found=4, odometer=2000), tmp_path)
+
+    snapshot = reader.current("stub")
+    assert len(snapshot.vehicles) == 4
+    assert snapshot.vehicle(VINS[0]) is None
+    assert snapshot.critical_vehicles() == []
+
+
+def test_swap_leaves_open_snapshots_intact(reader, tmp_path):
+    old = reader.current("stub")
+    old_inode = snapshot_path(tmp_path, "stub").stat().st_ino
+
+    publish_snapshot(_result(VINS, found=5, odometer=2000), tmp_path)
+
+    new = reader.current("stub")
+    assert new is not old
+    assert snapshot_path(tmp_path, "stub").stat().st_ino != old_inode
+    # The old mapping still reads the snapshot it was opened on
+    assert old.vehicle(VINS[3]).odometer == 1000
+    assert new.vehicle(VINS[3]).odometer == 2000
+    assert reader.current("stub") is new
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["stub.snapshot"]
+
+
+def test_unreadable_previous_snapshot_is_replaced(tmp_path):
+    snapshot_path(tmp_path, "stub").write_bytes(b"not a snapshot")
+
+    publish_snapshot(_result(VINS[:2], found=5, odometer=2000), tmp_path)
+
+    snapshot = SnapshotReader(tmp_path).current("stub")
+    assert [snapshot.vehicle(vin) is not None for vin in VINS] == [True, True, False, False, False]
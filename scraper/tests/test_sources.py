@@ -0,0 +1,109 @@
+"""Fleet fault feed paging against a stub feed that caps its page size."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from scraper.sources import page_is_last, sweep_fault_feed
+
+
+FLEET = [f"1XKYD49X0NJ{i:06d}" for i in range(250)]
+PAGE_CAP = 100  # The server ignores larger per_page values
+
+
+class CappedFeed:
+    """A fault feed with one fault per fleet VIN, at most PAGE_CAP rows a page."""
+
+    def __init__(self, pagination: str = "none"):
+        self.pagination = pagination  # none, total_pages, links or ignore_page
+        self.requests = 0
+
+    def page(self, number: int) -> dict:
+        if self.pagination == "ignore_page":
+            number = 1
+        start = (number - 1) * PAGE_CAP
+        rows = [{"vin": vin, "spn": 110, "fmi": 0, "is_active": "true"} for vin in FLEET[start:start + PAGE_CAP]]
+        body = {"data": rows}
+        pages = (len(FLEET) + PAGE_CAP - 1) // PAGE_CAP
+        if self.pagination == "total_pages":
+            body["meta"] = {"total_pages": pages}
+        elif self.pagination == "links":
+            body["links"] = {"next": f"/faults?page={number + 1}" if number < pages else None}
+        return body
+
+
+@pytest.fixture
+def feed(request):
+    state = CappedFeed(getattr(request, "param", "none"))
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            state.requests += 1
+            number = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            data = json.dumps(state.page(number)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.url = f"http://127.0.0.1:{server.server_port}/faults"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _sweep(feed):
+    with requests.Session() as session:
+        return sweep_fault_feed(session.get, feed.url, set(FLEET), page_size=500)
+
+
+def test_capped_pages_without_metadata_are_read_to_an_empty_page(feed):
+    found, complete, _, made = _sweep(feed)
+
+    assert complete
+    assert set(found) == set(FLEET)
+    assert made == 4  # three capped pages, then the empty one
+
+
+@pytest.mark.parametrize("feed", ["total_pages", "links"], indirect=True)
+def test_pagination_metadata_ends_the_sweep(feed):
+    found, complete, _, made = _sweep(feed)
+
+    assert complete
+    assert set(found) == set(FLEET)
+    assert made == 3
+
+
+@pytest.mark.parametrize("feed", ["ignore_page"], indirect=True)
+def test_repeated_page_is_incomplete(feed):
+    found, complete, last_vin, made = _sweep(feed)
+
+    assert not complete
+    assert set(found) == set(FLEET[:PAGE_CAP])
+    assert last_vin == FLEET[PAGE_CAP - 1]
+    assert made == 2
+
+
+@pytest.mark.parametrize(
+    "data, page, expected",
+    [
+        ({"links": {"next": None}}, 1, True),
+        ({"links": {"next": "/faults?page=2"}}, 1, False),
+        ({"meta": {"total_pages": 3}}, 3, True),
+        ({"meta": {"total_pages": 3}}, 2, False),
+        ({"data": [{}] * 10}, 1, None),
+        ([{}], 1, None),
+    ],
+)
+def test_page_is_last(data, page, expected):
+    assert page_is_last(data, page) is expected
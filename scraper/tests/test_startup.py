@@ -0,0 +1,41 @@
+"""Cold-start import budget of the lightweight `status` command."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from scraper.bench import DEFAULT_STARTUP_BUDGET_MS, parse_importtime
+
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _status_import_profile(cwd: Path):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", PYTHONPATH=str(PACKAGE_ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "scraper", "status"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return parse_importtime(proc.stderr)
+
+
+def test_status_stays_within_the_startup_budget(tmp_path):
+    # Fastest of a few cold starts, like `bench startup`, to ride out noise
+    profile = min((_status_import_profile(tmp_path) for _ in range(3)), key=lambda p: p.total_ms)
+
+    assert profile.modules, "no importtime output parsed"
+    assert profile.total_ms <= DEFAULT_STARTUP_BUDGET_MS
+
+
+def test_status_skips_heavy_subsystems(tmp_path):
+    profile = _status_import_profile(tmp_path)
+
+    assert profile.heavy_modules == []  # playwright, cryptography, pyotp
+    # These are what would pull the heavy modules in
+    assert not {"scraper.client", "scraper.mfa.totp"} & profile.imported
@@ -0,0 +1,54 @@
+"""Model years decoded from VINs, and what apply() may change."""
+
+from datetime import date
+
+import pytest
+
+from scraper.models import VehicleData
+from scraper.vin import VinDecoder, check_digit
+
+
+def _vin(prefix: str, year_code: str, position7: str = "9") -> str:
+    """A VIN with a valid check digit."""
+    vin = f"{prefix}{position7}9X{year_code}J123456"
+    return vin[:8] + check_digit(vin) + vin[9:]
+
+
+@pytest.fixture(scope="module")
+def decoder(tmp_path_factory):
+    return VinDecoder(tmp_path_factory.mktemp("vin") / "wmi.table", today=date(2026, 10, 19))
+
+
+def test_heavy_make_year_is_ambiguous_when_both_cycles_fit(decoder):
+    decoded = decoder.decode(_vin("1XKYD4", "T"))  # Kenworth, 1996 or 2026
+
+    assert decoded.model_year == 2026
+    assert decoded.year_ambiguous
+    assert decoder.decode_batch([decoded.vin])["year_ambiguous"].tolist() == [True]
+
+
+def test_year_is_unambiguous_when_the_later_cycle_is_in_the_future(decoder):
+    decoded = decoder.decode(_vin("1XKYD4", "X"))  # Kenworth, 1999 (2029 hasn't come)
+
+    assert (decoded.model_year, decoded.year_ambiguous) == (1999, False)
+
+
+def test_position7_rule_settles_other_makes(decoder):
+    numeric = decoder.decode(_vin("1FTYD4", "T", position7="9"))
+    alpha = decoder.decode(_vin("1FTYD4", "T", position7="A"))
+
+    assert (numeric.model_year, numeric.year_ambiguous) == (1996, False)
+    assert (alpha.model_year, alpha.year_ambiguous) == (2026, False)
+
+
+def test_apply_keeps_a_portal_year_the_vin_cant_disprove(decoder):
+    old_truck = VehicleData(vin=_vin("1XKYD4", "T"), unit_number="1", year=1996, make="Kenworth")
+    no_year = VehicleData(vin=_vin("1XKYD4", "T"), unit_number="2", make="Kenworth")
+    wrong_year = VehicleData(vin=_vin("1FTYD4", "T"), unit_number="3", year=2001, make="Ford")
+
+    changed = decoder.apply([old_truck, no_year, wrong_year])
+
+    assert old_truck.year == 1996
+    assert no_year.year == 2026
+    assert wrong_year.year == 1996
+    assert changed == 2
@@ -0,0 +1,93 @@
+"""VIN leases of the sweep work queue: expiry, re-issue and assembly."""
+
+import time
+
+import pytest
+
+from scraper.decisiv_api import DecisivAPIClient
+from scraper.models import VehicleData
+from scraper.workqueue import FAILED, SQLiteWorkQueue, SweepCoordinator, SweepWorker
+
+
+def _fleet(count: int = 3) -> list[VehicleData]:
+    return [VehicleData(vin=f"1XKYD49X0NJ{i:06d}", unit_number=str(i)) for i in range(count)]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "sweeps.db", max_attempts=2)
+    queue.enqueue("sweep", "stub", _fleet())
+    return queue
+
+
+def test_expired_lease_is_reissued(queue):
+    stalled = queue.claim("sweep", "node-a", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    reissued = queue.claim("sweep", "node-b", lease_seconds=30)
+
+    assert reissued.vin == stalled.vin
+    assert reissued.attempt == 2
+    assert reissued.token != stalled.token
+    # The stalled worker's lease is gone; its result is refused
+    assert not queue.heartbeat(stalled, 30)
+    assert not queue.complete(stalled, stalled.vehicle)
+    assert queue.complete(reissued, reissued.vehicle)
+    assert queue.progress("sweep").done == 1
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    held = queue.claim("sweep", "node-a", lease_seconds=0.2)
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.heartbeat(held, 0.2)
+
+    other = queue.claim("sweep", "node-b", lease_seconds=30)
+
+    assert other.vin != held.vin
+    assert queue.complete(held, held.vehicle)
+
+
+def test_lease_expiring_on_its_last_attempt_fails_the_vin(queue):
+    first = queue.claim("sweep", "node-a", lease_seconds=0.05)
+    time.sleep(0.1)
+    second = queue.claim("sweep", "node-a", lease_seconds=0.05)
+    assert (second.vin, second.attempt) == (first.vin, 2)
+    time.sleep(0.1)
+
+    third = queue.claim("sweep", "node-a", lease_seconds=30)
+
+    assert third.vin != first.vin
+    item = next(i for i in queue.items("sweep") if i.vin == first.vin)
+    assert (item.status, item.error) == (FAILED, "Lease expired")
+
+
+def test_released_lease_keeps_its_attempts(queue):
+    lease = queue.claim("sweep", "node-a", lease_seconds=30)
+    assert queue.release(lease)
+
+    again = queue.claim("sweep", "node-a", lease_seconds=30)
+
+    assert (again.vin, again.attempt) == (lease.vin, 1)
+
+
+def test_stalled_workers_vins_are_swept_by_another(stub_api, governor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue = SQLiteWorkQueue(tmp_path / "sweeps.db")
+    with DecisivAPIClient("id", "secret", base_url=stub_api.base_url, governor=governor) as source:
+        source.login()
+        coordinator = SweepCoordinator(queue)
+        sweep_id = coordinator.start(source, "stub")
+
+        # A worker that died holding a lease
+        stalled = queue.claim(sweep_id, "dead-node", lease_seconds=0.2)
+        completed = SweepWorker(queue, source, worker_id="live-node", lease_seconds=30, poll_interval=0.05).run(sweep_id)
+
+        result = coordinator.assemble(sweep_id)
+
+    assert completed == 250
+    assert result.success and not result.errors
+    assert result.vehicles_synced == 250 and result.vehicles_skipped == 0
+    assert result.critical_faults == 84
+    item = next(i for i in queue.items(sweep_id) if i.vin == stalled.vin)
+    assert item.attempts == 2
@@ -0,0 +1,385 @@
+"""
+Offline VIN decoding.
+
+A VIN gives a vehicle's identity without any page visit:
+
+    1-3   WMI (world manufacturer identifier) -> make
+    7     model year cycle (light vehicles: letter = 2010-2039, digit = 1980-2009)
+    9     check digit (North America)
+    10    model year code, repeating every 30 years
+    11    plant code (manufacturer-specific)
+    12-17 serial number
+
+Heavy trucks (GVWR above 10,000 lb) don't follow the position 7 rule, so
+for heavy-truck makes the latest year cycle not after next year is used.
+
+Makes are looked up in a compact table indexed directly by WMI (33^3
+one-byte entries), built once under the user's cache directory and
+memory-mapped, so every process shares the same pages. The file name
+carries a hash of the table contents, so editing WMI_MAKES builds a new
+file instead of reusing a stale one. Whole fleets are decoded in one
+vectorized batch.
+
+Usage:
+    decoder = VinDecoder.shared()
+    decoder.decode("1XKYD49X0NJ123456")   # DecodedVin(make="Kenworth", model_year=2022, ...)
+    decoder.apply(vehicles)               # fills or corrects year/make
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .models import VehicleData
+
+
+# Characters allowed in a VIN (no I, O or Q)
+VIN_ALPHABET = "0123456789ABCDEFGHJKLMNPRSTUVWXYZ"
+VIN_LENGTH = 17
+
+# Check digit transliteration and position weights
+TRANSLITERATION = {
+    **{str(d): d for d in range(10)},
+    "A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8,
+    "J": 1, "K": 2, "L": 3, "M": 4, "N": 5, "P": 7, "R": 9,
+    "S": 2, "T": 3, "U": 4, "V": 5, "W": 6, "X": 7, "Y": 8, "Z": 9,
+}
+WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Position 10 codes in the 1980-2009 cycle; add 30 for 2010-2039
+YEAR_CODES = {code: 1980 + offset for offset, code in enumerate("ABCDEFGHJKLMNPRSTVWXY123456789")}
+YEAR_CYCLE = 30
+
+# WMI -> (make, heavy truck). Heavy-truck makes skip the position 7 rule.
+WMI_MAKES = {
+    "1XK": ("Kenworth", True),
+    "1NK": ("Kenworth", True),
+    "2NK": ("Kenworth", True),
+    "3WK": ("Kenworth", True),
+    "1XP": ("Peterbilt", True),
+    "1NP": ("Peterbilt", True),
+    "2NP": ("Peterbilt", True),
+    "1FU": ("Freightliner", True),
+    "1FV": ("Freightliner", True),
+    "3AK": ("Freightliner", True),
+    "4UZ": ("Freightliner Custom Chassis", True),
+    "1M1": ("Mack", True),
+    "1M2": ("Mack", True),
+    "4V4": ("Volvo", True),
+    "4VG": ("Volvo", True),
+    "1HT": ("International", True),
+    "1HS": ("International", True),
+    "3HA": ("International", True),
+    "3HS": ("International", True),
+    "5KJ": ("Western Star", True),
+    "5KK": ("Western Star", True),
+    "5PV": ("Hino", True),
+    "JAL": ("Isuzu", True),
+    "1FT": ("Ford", False),
+    "1FD": ("Ford", False),
+    "1FM": ("Ford", False),
+    "1FA": ("Ford", False),
+    "1GC": ("Chevrolet", False),
+    "1GB": ("Chevrolet", False),
+    "1G1": ("Chevrolet", False),
+    "1GT": ("GMC", False),
+    "1GD": ("GMC", False),
+    "1C6": ("Ram", False),
+    "3C6": ("Ram", False),
+    "3C7": ("Ram", False),
+    "5TF": ("Toyota", False),
+    "4T1": ("Toyota", False),
+    "1N6": ("Nissan", False),
+    "WD3": ("Mercedes-Benz", False),
+}
+
+# Bump when the file layout changes; WMI_MAKES changes are caught by TABLE_DIGEST
+TABLE_VERSION = 1
+TABLE_MAGIC = b"VINT"
+# magic, version, entries, names offset, index offset
+TABLE_HEADER = struct.Struct("<4sHHII")
+TABLE_DIGEST = hashlib.sha256(
+    repr((TABLE_VERSION, sorted(WMI_MAKES.items()))).encode()
+).hexdigest()[:16]
+
+
+def default_table_file() -> Path:
+    """Table file under the per-user cache directory (XDG_CACHE_HOME, LOCALAPPDATA or ~/.cache)."""
+    root = os.getenv("XDG_CACHE_HOME") or os.getenv("LOCALAPPDATA")
+    cache_dir = Path(root) if root else Path.home() / ".cache"
+    return cache_dir / "trucktech" / f"wmi-v{TABLE_VERSION}-{TABLE_DIGEST}.bin"
+
+
+def _byte_table(mapping: dict, default: int, dtype) -> np.ndarray:
+    """256-entry lookup from ASCII byte to value."""
+    table = np.full(256, default, dtype=dtype)
+    for char, value in mapping.items():
+        table[ord(char)] = value
+    return table
+
+
+CHAR_INDEX = _byte_table({c: i for i, c in enumerate(VIN_ALPHABET)}, -1, np.int16)
+CHAR_VALUE = _byte_table(TRANSLITERATION, 0, np.int64)
+CHAR_YEAR = _byte_table(YEAR_CODES, 0, np.int16)
+WEIGHT_ARRAY = np.array(WEIGHTS, dtype=np.int64)
+
+
+def check_digit(vin: str) -> Optional[str]:
+    """Compute the check digit ("0"-"9" or "X") of a 17-character VIN, or None if it has illegal characters."""
+    try:
+        total = sum(TRANSLITERATION[c] * w for c, w in zip(vin, WEIGHTS))
+    except KeyError:
+        return None
+    remainder = total % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+def build_table(path: Path) -> Path:
+    """
+    Write the WMI lookup table.
+
+    Layout: header, then one byte per possible WMI (33^3, indexed by the
+    base-33 value of its characters) holding an entry number (0 = unknown),
+    then the entries as "make<TAB>heavy" lines.
+
+    Args:
+        path: Table file to write (atomically).
+
+    Returns:
+        The path.
+    """
+    entries = sorted(set(WMI_MAKES.values()))
+    if len(entries) > 255:
+        raise ValueError("WMI table supports at most 255 distinct makes")
+    entry_ids = {entry: number for number, entry in enumerate(entries, start=1)}
+
+    base = len(VIN_ALPHABET)
+    index = bytearray(base ** 3)
+    for wmi, entry in WMI_MAKES.items():
+        a, b, c = (VIN_ALPHABET.index(ch) for ch in wmi)
+        index[(a * base + b) * base + c] = entry_ids[entry]
+
+    names = "\n".join(f"{make}\t{int(heavy)}" for make, heavy in entries).encode()
+    index_offset = TABLE_HEADER.size
+    names_offset = index_offset + len(index)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temp file: several processes may build the table at once
+    tmp_file = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with open(tmp_file, "wb") as f:
+        f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(entries), names_offset, index_offset))
+        f.write(index)
+        f.write(names)
+    tmp_file.replace(path)
+    return path
+
+
+@dataclass
+class DecodedVin:
+    """What a VIN says about a vehicle."""
+
+    vin: str
+    wmi: str
+    make: Optional[str]  # None for WMIs not in the table
+    model_year: Optional[int]
+    plant_code: str
+    serial: str
+    check_digit_valid: bool
+    heavy: bool = False
+    year_ambiguous: bool = False  # Heavy make with both 30-year cycles possible; model_year is the later one
+
+
+class VinDecoder:
+    """
+    Decode VINs against the memory-mapped WMI table.
+
+    decode() handles one VIN in plain Python; decode_batch() handles a
+    fleet with numpy and is what apply() uses.
+    """
+
+    _shared: Optional["VinDecoder"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, table_file: Optional[Path] = None, today: Optional[date] = None):
+        """
+        Initialize decoder, building the table file if it doesn't exist.
+
+        Args:
+            table_file: WMI table. Defaults to default_table_file(); if the
+                        cache directory isn't writable, the table is built
+                        in a private temp directory instead.
+            today: Reference date; model years after next year are never returned.
+        """
+        self.table_file = Path(table_file or default_table_file())
+        if not self.table_file.exists():
+            try:
+                build_table(self.table_file)
+            except OSError:
+                if table_file:
+                    raise
+                private_dir = Path(tempfile.mkdtemp(prefix="trucktech-vin-"))
+                self.table_file = build_table(private_dir / self.table_file.name)
+        self.max_year = (today or date.today()).year + 1
+
+        with open(self.table_file, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, names_offset, index_offset = TABLE_HEADER.unpack_from(self._mmap)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError(f"Not a version {TABLE_VERSION} VIN table: {self.table_file}")
+
+        # Zero-copy view of the index; entry 0 means unknown
+        self.index = np.frombuffer(self._mmap, dtype=np.uint8, count=len(VIN_ALPHABET) ** 3, offset=index_offset)
+        entries = self._mmap[names_offset:].decode().split("\n") if count else []
+        self.makes = [None] + [line.split("\t")[0] for line in entries]
+        self.heavy = np.array([False] + [line.split("\t")[1] == "1" for line in entries], dtype=bool)
+
+    @classmethod
+    def shared(cls) -> "VinDecoder":
+        """Get the process-wide decoder, loading the table on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _model_year(self, code: str, position7: str, heavy: bool) -> tuple[Optional[int], bool]:
+        """(Model year, whether the other 30-year cycle is just as possible)."""
+        base = YEAR_CODES.get(code)
+        if base is None:
+            return None, False
+        later = base + YEAR_CYCLE
+        if later > self.max_year:
+            return base, False
+        # Heavy trucks skip the position 7 rule, so nothing tells the cycles apart
+        if heavy:
+            return later, True
+        return (later if position7.isalpha() else base), False
+
+    def decode(self, vin: str) -> Optional[DecodedVin]:
+        """
+        Decode one VIN.
+
+        Returns:
+            DecodedVin, or None if it isn't 17 legal VIN characters.
+        """
+        vin = vin.strip().upper()
+        if len(vin) != VIN_LENGTH or any(c not in TRANSLITERATION for c in vin):
+            return None
+
+        base = len(VIN_ALPHABET)
+        a, b, c = (VIN_ALPHABET.index(ch) for ch in vin[:3])
+        entry = self.index[(a * base + b) * base + c]
+        heavy = bool(self.heavy[entry])
+        model_year, year_ambiguous = self._model_year(vin[9], vin[6], heavy)
+        return DecodedVin(
+            vin=vin,
+            wmi=vin[:3],
+            make=self.makes[entry],
+            model_year=model_year,
+            plant_code=vin[10],
+            serial=vin[11:],
+            check_digit_valid=check_digit(vin) == vin[8],
+            heavy=heavy,
+            year_ambiguous=year_ambiguous,
+        )
+
+    def decode_batch(self, vins: list[str]) -> dict:
+        """
+        Decode many VINs in one vectorized pass.
+
+        Args:
+            vins: VINs (any case; surrounding whitespace is ignored).
+
+        Returns:
+            Dict of numpy arrays aligned with `vins`: valid (17 legal
+            characters), check_digit_valid, make_id (index into `makes`,
+            0 = unknown), heavy, model_year (0 where unknown) and
+            year_ambiguous (heavy make, and the earlier 30-year cycle is
+            as possible as the later one reported in model_year).
+        """
+        raw = np.array([v.strip().upper().encode("ascii", "replace") for v in vins], dtype=f"S{VIN_LENGTH + 1}")
+        codes = raw.view(np.uint8).reshape(len(vins), VIN_LENGTH + 1)
+        index = CHAR_INDEX[codes[:, :VIN_LENGTH]]
+        valid = (codes[:, VIN_LENGTH] == 0) & (index >= 0).all(axis=1)
+
+        # Positions with a zero check digit weight don't affect the sum
+        remainder = (CHAR_VALUE[codes[:, :VIN_LENGTH]] @ WEIGHT_ARRAY) % 11
+        expected = np.where(remainder == 10, ord("X"), remainder + ord("0"))
+        check_ok = valid & (codes[:, 8] == expected)
+
+        base = len(VIN_ALPHABET)
+        wmi = (index[:, 0].astype(np.int32) * base + index[:, 1]) * base + index[:, 2]
+        make_id = np.where(valid, self.index[np.where(valid, wmi, 0)], 0)
+        heavy = self.heavy[make_id]
+
+        year = CHAR_YEAR[codes[:, 9]].astype(np.int32)
+        later = year + YEAR_CYCLE
+        position7_alpha = codes[:, 6] >= ord("A")
+        later_possible = later <= self.max_year
+        use_later = (heavy | position7_alpha) & later_possible
+        known = valid & (year > 0)
+        model_year = np.where(known, np.where(use_later, later, year), 0)
+
+        return {
+            "valid": valid,
+            "check_digit_valid": check_ok,
+            "make_id": make_id,
+            "heavy": heavy,
+            "model_year": model_year,
+            "year_ambiguous": known & heavy & later_possible,
+        }
+
+    def apply(self, vehicles: list[VehicleData]) -> int:
+        """
+        Fill or correct year/make from each vehicle's VIN.
+
+        Missing values are filled from any well-formed VIN. Values that
+        disagree with the VIN are only replaced when the check digit is
+        valid, and a year never is when the VIN can't tell the 30-year
+        cycles apart (heavy makes): a 1996 Kenworth stays 1996. A make like "Kenworth T680" (from a year-less table cell) is
+        split into make and model.
+
+        Args:
+            vehicles: Vehicles to update in place.
+
+        Returns:
+            Number of vehicles changed.
+        """
+        if not vehicles:
+            return 0
+        decoded = self.decode_batch([v.vin for v in vehicles])
+        changed = 0
+
+        for row in np.flatnonzero(decoded["valid"]):
+            vehicle = vehicles[row]
+            trusted = bool(decoded["check_digit_valid"][row])
+            before = (vehicle.year, vehicle.make, vehicle.model)
+
+            year = int(decoded["model_year"][row]) or None
+            correctable = trusted and not decoded["year_ambiguous"][row]
+            if year and (vehicle.year is None or (correctable and vehicle.year != year)):
+                vehicle.year = year
+
+            make = self.makes[decoded["make_id"][row]]
+            current = vehicle.make.strip()
+            if make and current.lower() != make.lower():
+                if not current:
+                    vehicle.make = make
+                elif current.lower().startswith(make.lower() + " "):
+                    vehicle.make = make
+                    vehicle.model = vehicle.model or current[len(make) + 1:].strip()
+                elif trusted:
+                    vehicle.make = make
+
+            if (vehicle.year, vehicle.make, vehicle.model) != before:
+                changed += 1
+        return changed
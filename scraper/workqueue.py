@@ -0,0 +1,609 @@
+"""
+Distributed VIN work queue for multi-node fleet sweeps.
+
+A coordinator enqueues a tenant's asset list as a sweep. Any number of
+workers (on any node that can reach the store) claim VIN leases, fetch
+faults, heartbeat while working and write results back. Leases that expire
+without a heartbeat are re-issued to another worker. The coordinator then
+assembles a single SyncResult.
+
+Usage:
+    queue = SQLiteWorkQueue(Path("sweeps.db"))
+
+    # Coordinator
+    sweep_id = SweepCoordinator(queue).start(scraper, "acme-trucking")
+
+    # Each worker node
+    SweepWorker(queue, scraper).run(sweep_id)
+
+    # Coordinator, once workers are done
+    result = SweepCoordinator(queue).assemble(sweep_id)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .errors import RateLimited, SessionExpired
+from .events import FAULT_APPEARED, FaultEventStream
+from .health import HealthScorer
+from .models import SyncResult, VehicleData
+from .scheduler import SyncScheduler
+from .vin import VinDecoder
+
+
+# Item states
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Lease:
+    """A worker's time-limited claim on one VIN of a sweep."""
+
+    sweep_id: str
+    vin: str
+    worker_id: str
+    token: str
+    expires_at: float
+    attempt: int
+    vehicle: VehicleData
+
+
+@dataclass
+class SweepProgress:
+    """Item counts of a sweep by state."""
+
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.leased + self.done + self.failed
+
+    @property
+    def finished(self) -> bool:
+        """True when no VIN is waiting or being worked on."""
+        return self.pending == 0 and self.leased == 0
+
+
+@dataclass
+class SweepItem:
+    """Final state of one VIN in a sweep."""
+
+    vin: str
+    status: str
+    vehicle: VehicleData
+    error: Optional[str] = None
+    attempts: int = 0
+    completed_at: Optional[datetime] = None
+
+
+class WorkQueue(ABC):
+    """
+    Storage interface for sweeps.
+
+    SQLiteWorkQueue covers a single node (or nodes sharing a local-disk
+    database through a single host). Implement this interface to back sweeps
+    with a networked store.
+    """
+
+    @abstractmethod
+    def enqueue(self, sweep_id: str, tenant_id: str, vehicles: list[VehicleData]):
+        """Create a sweep with VINs in visit order."""
+
+    @abstractmethod
+    def claim(self, sweep_id: str, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        """Lease the next pending (or expired) VIN, or None if there is none."""
+
+    @abstractmethod
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        """Extend a lease. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def complete(self, lease: Lease, vehicle: VehicleData) -> bool:
+        """Store the result for a leased VIN. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str) -> bool:
+        """Release a leased VIN after an error. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def release(self, lease: Lease) -> bool:
+        """Return a leased VIN to pending without counting the attempt. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def progress(self, sweep_id: str) -> SweepProgress:
+        """Get item counts by state."""
+
+    @abstractmethod
+    def sweep_info(self, sweep_id: str) -> tuple[str, datetime]:
+        """Get (tenant_id, created_at) of a sweep."""
+
+    @abstractmethod
+    def items(self, sweep_id: str) -> list[SweepItem]:
+        """Get all items of a sweep in visit order."""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a local SQLite database.
+
+    Every operation opens its own short-lived connection, so one instance can
+    be shared by worker threads and by heartbeat threads. Claims run in an
+    IMMEDIATE transaction, so concurrent workers never lease the same VIN.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sweeps (
+            sweep_id TEXT PRIMARY KEY,
+            tenant_id TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sweep_items (
+            sweep_id TEXT NOT NULL,
+            vin TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            worker_id TEXT,
+            lease_token TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            vehicle TEXT NOT NULL,
+            error TEXT,
+            completed_at TEXT,
+            PRIMARY KEY (sweep_id, vin)
+        );
+        CREATE INDEX IF NOT EXISTS idx_sweep_items_claim
+            ON sweep_items (sweep_id, status, position);
+    """
+
+    def __init__(self, db_path: Path = Path("sweeps.db"), max_attempts: int = 3):
+        """
+        Initialize queue.
+
+        Args:
+            db_path: SQLite database file.
+            max_attempts: Leases per VIN before it is marked failed.
+        """
+        self.db_path = Path(db_path)
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def enqueue(self, sweep_id: str, tenant_id: str, vehicles: list[VehicleData]):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO sweeps (sweep_id, tenant_id, created_at) VALUES (?, ?, ?)",
+                (sweep_id, tenant_id, datetime.now().isoformat()),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO sweep_items (sweep_id, vin, position, status, vehicle) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (sweep_id, v.vin, position, PENDING, json.dumps(v.to_dict()))
+                    for position, v in enumerate(vehicles)
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, sweep_id: str, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Expired leases that used up their attempts are given up on
+            conn.execute(
+                "UPDATE sweep_items SET status = ?, error = COALESCE(error, 'Lease expired'), "
+                "lease_token = NULL "
+                "WHERE sweep_id = ? AND status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, sweep_id, LEASED, now, self.max_attempts),
+            )
+
+            row = conn.execute(
+                "SELECT vin, attempts, vehicle FROM sweep_items "
+                "WHERE sweep_id = ? AND (status = ? OR (status = ? AND lease_expires < ?)) "
+                "ORDER BY position LIMIT 1",
+                (sweep_id, PENDING, LEASED, now),
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            vin, attempts, vehicle = row
+            token = uuid.uuid4().hex
+            expires_at = now + lease_seconds
+            conn.execute(
+                "UPDATE sweep_items SET status = ?, worker_id = ?, lease_token = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE sweep_id = ? AND vin = ?",
+                (LEASED, worker_id, token, expires_at, sweep_id, vin),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return Lease(
+            sweep_id=sweep_id,
+            vin=vin,
+            worker_id=worker_id,
+            token=token,
+            expires_at=expires_at,
+            attempt=attempts + 1,
+            vehicle=VehicleData.from_dict(json.loads(vehicle)),
+        )
+
+    def _update_leased(self, lease: Lease, assignments: str, params: tuple) -> bool:
+        """Update an item only while the caller still holds its lease."""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                f"UPDATE sweep_items SET {assignments} "
+                "WHERE sweep_id = ? AND vin = ? AND status = ? AND lease_token = ?",
+                (*params, lease.sweep_id, lease.vin, LEASED, lease.token),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        expires_at = time.time() + lease_seconds
+        if self._update_leased(lease, "lease_expires = ?", (expires_at,)):
+            lease.expires_at = expires_at
+            return True
+        return False
+
+    def complete(self, lease: Lease, vehicle: VehicleData) -> bool:
+        return self._update_leased(
+            lease,
+            "status = ?, vehicle = ?, error = NULL, lease_token = NULL, completed_at = ?",
+            (DONE, json.dumps(vehicle.to_dict()), datetime.now().isoformat()),
+        )
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        status = FAILED if lease.attempt >= self.max_attempts else PENDING
+        return self._update_leased(
+            lease,
+            "status = ?, error = ?, lease_token = NULL, lease_expires = NULL",
+            (status, error),
+        )
+
+    def release(self, lease: Lease) -> bool:
+        return self._update_leased(
+            lease,
+            "status = ?, attempts = attempts - 1, lease_token = NULL, lease_expires = NULL",
+            (PENDING,),
+        )
+
+    def progress(self, sweep_id: str) -> SweepProgress:
+        conn = self._connect()
+        try:
+            counts = dict(
+                conn.execute(
+                    "SELECT status, COUNT(*) FROM sweep_items WHERE sweep_id = ? GROUP BY status",
+                    (sweep_id,),
+                ).fetchall()
+            )
+        finally:
+            conn.close()
+        return SweepProgress(
+            pending=counts.get(PENDING, 0),
+            leased=counts.get(LEASED, 0),
+            done=counts.get(DONE, 0),
+            failed=counts.get(FAILED, 0),
+        )
+
+    def sweep_info(self, sweep_id: str) -> tuple[str, datetime]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT tenant_id, created_at FROM sweeps WHERE sweep_id = ?", (sweep_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise KeyError(f"Unknown sweep: {sweep_id}")
+        return row[0], datetime.fromisoformat(row[1])
+
+    def items(self, sweep_id: str) -> list[SweepItem]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT vin, status, vehicle, error, attempts, completed_at FROM sweep_items "
+                "WHERE sweep_id = ? ORDER BY position",
+                (sweep_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            SweepItem(
+                vin=vin,
+                status=status,
+                vehicle=VehicleData.from_dict(json.loads(vehicle)),
+                error=error,
+                attempts=attempts,
+                completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+            )
+            for vin, status, vehicle, error, attempts, completed_at in rows
+        ]
+
+
+class LeaseKeeper:
+    """
+    Heartbeat a lease from a background thread while a VIN is being fetched.
+
+    Usage:
+        with LeaseKeeper(queue, lease, lease_seconds=120) as keeper:
+            faults = scraper.get_faults(lease.vin)
+        if keeper.lost:
+            ...  # Another worker owns the VIN now
+    """
+
+    def __init__(self, queue: WorkQueue, lease: Lease, lease_seconds: float):
+        self.queue = queue
+        self.lease = lease
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        interval = max(self.lease_seconds / 3, 1.0)
+        while not self._stop.wait(interval):
+            try:
+                if not self.queue.heartbeat(self.lease, self.lease_seconds):
+                    self.lost = True
+                    return
+            except Exception as e:
+                print(f"  Heartbeat failed for {self.lease.vin}: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+
+class SweepWorker:
+    """
+    Claim VINs from a sweep and fetch their faults until the sweep is finished.
+
+    Errors that say nothing about the VIN don't use up its attempts: an
+    expired session is renewed and the VIN retried, and on a rate limit the
+    worker waits out Retry-After and hands the VIN back.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        scraper,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 5.0,
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            queue: Shared work queue.
+            scraper: Logged-in TruckTechPlusScraper.
+            worker_id: Identifier reported in leases. Defaults to host:pid.
+            lease_seconds: Lease length; heartbeats renew it every third of this.
+            poll_interval: Wait between claims while other workers hold leases.
+        """
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    def run(self, sweep_id: str, stop_event: Optional[threading.Event] = None) -> int:
+        """
+        Work on a sweep until no VIN is pending or leased.
+
+        Args:
+            sweep_id: Sweep to work on.
+            stop_event: Optional event that stops the worker between VINs.
+
+        Returns:
+            Number of VINs completed by this worker.
+        """
+        completed = 0
+        while not (stop_event and stop_event.is_set()):
+            lease = self.queue.claim(sweep_id, self.worker_id, self.lease_seconds)
+            if lease is None:
+                if self.queue.progress(sweep_id).finished:
+                    break
+                # Other workers hold leases; wait in case one of them expires
+                time.sleep(self.poll_interval)
+                continue
+
+            vehicle = lease.vehicle
+            try:
+                with LeaseKeeper(self.queue, lease, self.lease_seconds) as keeper:
+                    self._fetch(vehicle)
+            except RateLimited as e:
+                print(f"  [{self.worker_id}] Rate limited, releasing {lease.vin} in {e.retry_after}s")
+                with LeaseKeeper(self.queue, lease, self.lease_seconds):
+                    if stop_event:
+                        stop_event.wait(e.retry_after)
+                    else:
+                        time.sleep(e.retry_after)
+                self.queue.release(lease)
+                continue
+            except Exception as e:
+                print(f"  [{self.worker_id}] {lease.vin} failed (attempt {lease.attempt}): {e}")
+                self.queue.fail(lease, f"{type(e).__name__}: {e}")
+                continue
+
+            if keeper.lost or not self.queue.complete(lease, vehicle):
+                print(f"  [{self.worker_id}] Lost lease on {lease.vin}, result discarded")
+                continue
+            completed += 1
+
+        print(f"  [{self.worker_id}] Completed {completed} vehicles")
+        return completed
+
+    def _fetch(self, vehicle: VehicleData):
+        """
+        Fetch a vehicle's faults, logging in again once if the session expired.
+
+        Raises:
+            LoginError: If logging in again fails; the worker can't continue.
+        """
+        try:
+            self.scraper.get_diagnostics(vehicle)
+        except SessionExpired:
+            print(f"  [{self.worker_id}] Session expired, logging in again")
+            self.scraper.reset_session()
+            self.scraper.ensure_logged_in()
+            self.scraper.get_diagnostics(vehicle)
+
+
+class SweepCoordinator:
+    """Enqueue a tenant's fleet as a sweep and assemble the final SyncResult."""
+
+    def __init__(self, queue: WorkQueue):
+        self.queue = queue
+
+    def start(
+        self,
+        scraper,
+        tenant_id: str = "default",
+        scheduler: Optional[SyncScheduler] = None,
+    ) -> str:
+        """
+        Fetch the asset list and enqueue it in priority order.
+
+        Args:
+            scraper: Logged-in TruckTechPlusScraper.
+            tenant_id: Tenant being swept.
+            scheduler: VIN scheduler. Defaults to the tenant's state file.
+
+        Returns:
+            New sweep ID.
+        """
+        scheduler = scheduler or SyncScheduler.for_tenant(tenant_id)
+        vehicles = scheduler.order(scraper.get_vehicles())
+
+        sweep_id = f"{tenant_id}-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.queue.enqueue(sweep_id, tenant_id, vehicles)
+        print(f"Sweep {sweep_id}: {len(vehicles)} vehicles enqueued")
+        return sweep_id
+
+    def wait(self, sweep_id: str, timeout: Optional[float] = None, poll_interval: float = 5.0) -> bool:
+        """
+        Wait for workers to finish a sweep.
+
+        Returns:
+            True if the sweep finished before the timeout.
+        """
+        deadline = time.time() + timeout if timeout else None
+        while not self.queue.progress(sweep_id).finished:
+            if deadline and time.time() >= deadline:
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def assemble(
+        self,
+        sweep_id: str,
+        scheduler: Optional[SyncScheduler] = None,
+        events: Optional[FaultEventStream] = None,
+        health: Optional[HealthScorer] = None,
+    ) -> SyncResult:
+        """
+        Build the SyncResult of a sweep.
+
+        Unfinished VINs are reported as skipped, so assembling before every
+        worker is done gives a partial but valid result. Scheduler state,
+        fault events, VIN decoding and health scores are done here, on the
+        coordinator only, as export_all_data() does for a single-node sync.
+
+        Args:
+            sweep_id: Sweep to assemble.
+            scheduler: VIN scheduler. Defaults to the tenant's state file.
+            events: Fault event stream. Defaults to the tenant's snapshot file.
+            health: Health scorer. Defaults to a new one (full scoring).
+
+        Returns:
+            SyncResult covering the completed VINs.
+        """
+        tenant_id, created_at = self.queue.sweep_info(sweep_id)
+        scheduler = scheduler or SyncScheduler.for_tenant(tenant_id)
+        events = events or FaultEventStream.for_tenant(tenant_id)
+        health = health or HealthScorer()
+        changed: set[str] = set()
+
+        result = SyncResult(tenant_id=tenant_id, started_at=created_at)
+        items = self.queue.items(sweep_id)
+        result.vehicles_found = len(items)
+        decoded = VinDecoder.shared().apply([item.vehicle for item in items])
+        if decoded:
+            print(f"  Filled or corrected year/make of {decoded} vehicles from their VINs")
+
+        for item in items:
+            if item.status == DONE:
+                vehicle = item.vehicle
+                result.vehicles.append(vehicle)
+                result.vehicles_synced += 1
+                result.faults_found += len(vehicle.faults)
+                result.critical_faults += sum(1 for f in vehicle.faults if f.is_critical)
+                scheduler.record(vehicle, when=item.completed_at)
+                vehicle_events = events.process(tenant_id, vehicle)
+                if vehicle_events:
+                    changed.add(vehicle.vin)
+                result.new_faults += sum(1 for event in vehicle_events if event.event_type == FAULT_APPEARED)
+            elif item.status == FAILED:
+                result.add_error(f"Failed to get faults for {item.vin}: {item.error}")
+            else:
+                result.vehicles_skipped += 1
+
+        result.deadline_reached = result.vehicles_skipped > 0
+
+        health.update(result.vehicles, changed=changed if events.has_baseline else None)
+        health.prune(item.vin for item in items)
+        result.fleet_health = health.summary()
+        result.success = True
+
+        try:
+            scheduler.save()
+            events.save()
+        except OSError as e:
+            result.add_error(f"Failed to save sweep state: {e}", e)
+
+        completed = [item.completed_at for item in items if item.completed_at]
+        result.completed_at = max(completed) if completed else datetime.now()
+        return result